@@ -5,6 +5,7 @@ from django.conf import settings
 from rest_framework import authentication, exceptions
 
 from .models import User, BlackList
+from .tokens import TokenService
 
 
 """Configure JWT Here"""
@@ -66,7 +67,7 @@ class JWTAuthentication(authentication.BaseAuthentication):
         error.
         """
         try:
-            payload = jwt.decode(token, settings.SECRET_KEY)
+            payload = TokenService.decode(token)
 
         except jwt.ExpiredSignatureError:
             msg = 'Your token has expired, please log in again.'
@@ -86,9 +87,14 @@ class JWTAuthentication(authentication.BaseAuthentication):
             msg = 'Forbidden! This user has been deactivated.'
             raise exceptions.AuthenticationFailed(msg)
 
-        token = BlackList.objects.filter(token=token).first()
+        # Tokens issued before the user's last logout carry an older
+        # version. The user row is already loaded, so this check is free.
+        if payload.get('ver', 0) != user.token_version:
+            msg = 'Session Expired.'
+            raise exceptions.AuthenticationFailed(msg)
 
-        if token:
+        if settings.JWT_REVOCATION_MODE == 'blacklist' and \
+                BlackList.objects.filter(token=token).exists():
             msg = 'Session Expired.'
             raise exceptions.AuthenticationFailed(msg)
 
@@ -0,0 +1,42 @@
+"""
+Password hashers whose work factor is read from `PASSWORD_HASHER_COST`.
+
+Django rehashes a password on login whenever the stored hash was made by a
+different algorithm or with a different work factor than the preferred
+hasher, so switching `PASSWORD_HASHER_PROFILE` or tuning a cost upgrades
+users transparently the next time they log in.
+"""
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """PBKDF2-SHA256 with a configurable number of iterations"""
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_HASHER_COST['pbkdf2_iterations']
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    """Argon2 with configurable time and memory costs"""
+
+    @property
+    def time_cost(self):
+        return settings.PASSWORD_HASHER_COST['argon2_time_cost']
+
+    @property
+    def memory_cost(self):
+        return settings.PASSWORD_HASHER_COST['argon2_memory_cost']
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_HASHER_COST['argon2_parallelism']
+
+
+class BCryptSHA256PasswordHasher(hashers.BCryptSHA256PasswordHasher):
+    """BCrypt-SHA256 with a configurable number of rounds"""
+
+    @property
+    def rounds(self):
+        return settings.PASSWORD_HASHER_COST['bcrypt_rounds']
@@ -0,0 +1,69 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+
+from authentication.models import User
+from authentication.serializers import LoginSerializer
+from utils.benchmark import summarise, time_calls
+
+
+class Command(BaseCommand):
+    """
+    Time the login path once per password hasher profile and print the
+    latency summary as JSON. Use it to size workers against login storms
+    and to pick a work factor, eg:
+        python manage.py benchmark_login --iterations 50 --hashers argon2
+    Nothing is persisted, every profile runs inside a rolled back
+    transaction.
+    """
+    help = 'Report login latency percentiles for each password hasher'
+
+    email = 'login-benchmark@landville.test'
+    password = 'Benchmark~!Z123'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument(
+            '--hashers', nargs='+',
+            default=list(settings.PASSWORD_HASHER_PROFILES),
+            choices=list(settings.PASSWORD_HASHER_PROFILES))
+
+    def handle(self, *args, **options):
+        report = {}
+        for profile in options['hashers']:
+            try:
+                report[profile] = self.benchmark_profile(
+                    profile, options['iterations'])
+            except ValueError as e:
+                # Django raises a ValueError when the library backing a
+                # hasher (argon2-cffi, bcrypt) is not installed.
+                report[profile] = {'error': str(e)}
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def benchmark_profile(self, profile, iterations):
+        """Return the latency summary of logging in under `profile`"""
+        preferred = settings.PASSWORD_HASHER_PROFILES[profile]
+        hashers = [preferred] + [
+            hasher for hasher in settings.PASSWORD_HASHERS
+            if hasher != preferred]
+
+        with override_settings(PASSWORD_HASHERS=hashers), \
+                transaction.atomic():
+            user = User.objects.create_user(
+                first_name='Login', last_name='Benchmark',
+                email=self.email, password=self.password)
+            user.is_verified = True
+            user.save()
+
+            def login():
+                serializer = LoginSerializer(data={
+                    'email': self.email, 'password': self.password})
+                serializer.is_valid(raise_exception=True)
+
+            samples = time_calls(login, iterations)
+            transaction.set_rollback(True)
+
+        return summarise(samples)
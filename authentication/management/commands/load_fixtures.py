@@ -0,0 +1,123 @@
+import os
+from collections import defaultdict
+
+from django.apps import apps
+from django.core import serializers
+from django.core.management.base import BaseCommand
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connection, transaction
+from django.db.models.signals import post_save
+
+
+class Command(BaseCommand):
+    """
+    Load the fixtures of the Landville apps in one process and one
+    transaction, eg to reset a staging or CI database:
+        python manage.py load_fixtures
+    Each model is loaded with one bulk insert, after the models it has
+    foreign keys to. Rows that already exist are updated in bulk instead,
+    so the command can be run again, but users keep their token version.
+    Like loaddata, timestamps are kept as they are in the fixtures and
+    `post_save` is sent with `raw=True` for every object, so profiles are
+    created and cached responses dropped.
+    """
+    help = 'Load the fixtures of the Landville apps'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'app_labels', nargs='*',
+            default=['authentication', 'property', 'pages'])
+
+    def handle(self, *args, **options):
+        files = self.fixture_files(options['app_labels'])
+        objects = defaultdict(list)
+        for path in files:
+            with open(path) as stream:
+                for obj in serializers.deserialize('json', stream):
+                    objects[type(obj.object)].append(obj)
+
+        with transaction.atomic():
+            for model in dependency_order(objects):
+                self.load(model, objects[model])
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sequence_reset_sql(
+                        no_style(), list(objects)):
+                    cursor.execute(sql)
+
+        count = sum(len(model_objects) for model_objects in objects.values())
+        self.stdout.write(
+            f'Installed {count} object(s) from {len(files)} fixture(s)')
+
+    def fixture_files(self, app_labels):
+        """Return the JSON fixtures of the apps, in the order of the apps"""
+        files = []
+        for label in app_labels:
+            directory = os.path.join(
+                apps.get_app_config(label).path, 'fixtures')
+            if not os.path.isdir(directory):
+                continue
+            files.extend(
+                os.path.join(directory, name)
+                for name in sorted(os.listdir(directory))
+                if name.endswith('.json') and name != 'initial_data.json')
+        return files
+
+    def load(self, model, deserialized):
+        """Insert or update the objects of one model"""
+        instances = [obj.object for obj in deserialized]
+        existing = set(model._base_manager.filter(
+            pk__in=[instance.pk for instance in instances]
+        ).values_list('pk', flat=True))
+        new = [obj for obj in instances if obj.pk not in existing]
+        old = [obj for obj in instances if obj.pk in existing]
+        # a user's token version only goes up, putting the fixture's back
+        # would make the tokens revoked since valid again
+        fields = [
+            field.name for field in model._meta.concrete_fields
+            if not field.primary_key and field.name != 'token_version']
+
+        # the insert stamps auto_now fields, we put the fixture values back
+        timestamps = [
+            field.attname for field in model._meta.concrete_fields
+            if getattr(field, 'auto_now', False) or
+            getattr(field, 'auto_now_add', False)]
+        fixture_values = [
+            [getattr(obj, name) for name in timestamps] for obj in new]
+        model._base_manager.bulk_create(new)
+        if new and timestamps:
+            for obj, values in zip(new, fixture_values):
+                for name, value in zip(timestamps, values):
+                    setattr(obj, name, value)
+            model._base_manager.bulk_update(new, timestamps)
+        if old:
+            model._base_manager.bulk_update(old, fields)
+
+        for obj in deserialized:
+            for name, values in (obj.m2m_data or {}).items():
+                getattr(obj.object, name).set(values)
+            post_save.send(
+                sender=model, instance=obj.object,
+                created=obj.object.pk not in existing, update_fields=None,
+                raw=True, using=DEFAULT_DB_ALIAS)
+
+
+def dependency_order(models):
+    """
+    Order models so each comes after the models its foreign keys point to.
+    Cycles are left to Postgres, which checks foreign keys at commit.
+    """
+    ordered = []
+    visiting = set()
+
+    def visit(model):
+        if model in ordered or model in visiting:
+            return
+        visiting.add(model)
+        for field in model._meta.concrete_fields:
+            if field.related_model in models:
+                visit(field.related_model)
+        ordered.append(model)
+
+    for model in sorted(models, key=lambda model: model._meta.label):
+        visit(model)
+    return ordered
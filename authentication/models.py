@@ -1,15 +1,15 @@
 
 from django.db import models
+from django.db.models import F
 from django.contrib.auth.models import (
     AbstractUser, BaseUserManager)
 from django.contrib.postgres.fields import JSONField
 from django.core.serializers.json import DjangoJSONEncoder
 from datetime import datetime, timedelta
-import jwt
 from utils.models import BaseAbstractModel
 from utils.managers import CustomQuerySet
-from django.conf import settings
 from fernet_fields import EncryptedTextField
+from authentication.tokens import TokenService
 
 
 class UserManager(BaseUserManager):
@@ -24,11 +24,15 @@ class UserManager(BaseUserManager):
             last_name=None,
             email=None,
             password=None,
-            role='BY'
+            role='BY',
+            profile=None,
+            **extra_fields
     ):
         """
         Create and return a `User` with an email, first name, last name and
-        password.
+        password. `profile` holds initial values for the user's profile,
+        which is created in the same pipeline by the `create_profile`
+        signal, and `extra_fields` are set on the user before it is saved.
         """
 
         if not first_name:
@@ -47,9 +51,11 @@ class UserManager(BaseUserManager):
             first_name=first_name,
             last_name=last_name,
             email=self.normalize_email(email),
-            username=self.normalize_email(email))
+            username=self.normalize_email(email),
+            **extra_fields)
         user.set_password(password)
         user.role = role
+        user._profile_fields = profile or {}
         user.save()
         return user
 
@@ -100,6 +106,9 @@ class User(AbstractUser, BaseAbstractModel):
         default='BY'
     )
     is_verified = models.BooleanField(default=False)
+    # Every token carries the version it was issued under. Bumping this
+    # counter revokes all tokens issued before the bump.
+    token_version = models.PositiveIntegerField(default=0)
 
     USERNAME_FIELD = 'email'
 
@@ -135,15 +144,36 @@ class User(AbstractUser, BaseAbstractModel):
         We generate JWT token and add the user id, username and expiration
         as an integer.
         """
-        token_expiry = datetime.now() + timedelta(hours=24)
-
-        token = jwt.encode({
+        return TokenService.encode({
             'id': self.pk,
             'email': self.get_email,
-            'exp': int(token_expiry.strftime('%s'))
-        }, settings.SECRET_KEY, algorithm='HS256')
+            'ver': self.token_version,
+        }, timedelta(hours=24))
 
-        return token.decode('utf-8')
+    def save(self, force_insert=False, force_update=False, using=None,
+             update_fields=None):
+        """
+        Save an existing user without its token version, which only
+        `revoke_tokens` writes, so saving a user loaded before a revocation
+        doesn't bring the revoked tokens back.
+        """
+        if not self._state.adding and not force_insert and \
+                update_fields is None:
+            update_fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'token_version']
+        super().save(force_insert=force_insert, force_update=force_update,
+                     using=using, update_fields=update_fields)
+
+    def revoke_tokens(self):
+        """
+        Invalidate every token issued to this user so far by bumping
+        their token version. The increment happens in the database so
+        concurrent logouts cannot overwrite each other.
+        """
+        User.objects.filter(pk=self.pk).update(
+            token_version=F('token_version') + 1)
+        self.refresh_from_db(fields=['token_version'])
 
 
 class BlackList(BaseAbstractModel):
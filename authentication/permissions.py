@@ -1,11 +1,14 @@
 from rest_framework.permissions import BasePermission
 
+from utils.lookups import CLIENT_ADMIN, LANDVILLE_ADMIN
+
 
 class IsClientAdmin(BasePermission):
     """Grants client admins full access"""
 
     def has_permission(self, request, view):
-        return request.user.is_authenticated and request.user.role == 'CA'
+        return request.user.is_authenticated and \
+            request.user.role == CLIENT_ADMIN
 
 
 class IsOwnerOrAdmin(BasePermission):
@@ -13,7 +16,7 @@ class IsOwnerOrAdmin(BasePermission):
 
     def has_object_permission(self, request, view, obj):
         user = request.user
-        return user.role == 'LA' or request.user == obj.client_admin
+        return user.role == LANDVILLE_ADMIN or request.user == obj.client_admin
 
 
 class IsProfileOwner(BasePermission):
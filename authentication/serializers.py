@@ -2,6 +2,7 @@ import cloudinary.uploader as uploader
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
+from django.db.models import Prefetch
 from rest_framework import serializers
 
 from authentication.models import (
@@ -100,11 +101,6 @@ class GoogleAuthSerializer(serializers.Serializer):
         if not id_info:
             raise serializers.ValidationError('token is not valid')
 
-        # check if a user exists after decoding the token in the payload
-        # the user_id confirms user existence since its a unique identifier
-
-        user_id = id_info['sub']
-
         # query database to check if a user with the same email exists
         user = User.objects.filter(email=id_info.get('email'))
 
@@ -119,10 +115,6 @@ class GoogleAuthSerializer(serializers.Serializer):
         if id_info.get('picture'):
             id_info['user_profile_picture'] = id_info['picture']
 
-        # pass user information to signal to be added to profile
-        # after user is created
-        SocialAuthProfileUpdate.get_user_info(id_info)
-
         # create a new user if no new user exists
         first_and_second_name = id_info.get('name').split()
         first_name = first_and_second_name[0]
@@ -131,14 +123,13 @@ class GoogleAuthSerializer(serializers.Serializer):
             'email': id_info.get('email'),
             'first_name': first_name,
             'last_name': second_name,
-            'password': randomStringwithDigitsAndSymbols()
+            'password': randomStringwithDigitsAndSymbols(),
+            'is_verified': True,
+            # the profile picture is saved with the new user's profile
+            'profile': SocialAuthProfileUpdate.profile_fields(id_info)
         }
 
         new_user = User.objects.create_user(**payload)
-        new_user.is_verified = True
-
-        new_user.social_id = user_id
-        new_user.save()
 
         return {
             'token': new_user.token,
@@ -169,13 +160,6 @@ class FacebookAuthAPISerializer(serializers.Serializer):
         if not id_info:
             raise serializers.ValidationError('Token is not valid.')
 
-        # Checks to see if there is a user id associated with
-        # the payload after decoding the token
-        # this user_id confirms that the user exists on twitter
-        # because its a unique identifier.
-
-        user_id = id_info['id']
-
         # Query database to check if there is an existing
         # user with the save email.
         user = User.objects.filter(email=id_info.get('email'))
@@ -192,14 +176,10 @@ class FacebookAuthAPISerializer(serializers.Serializer):
         # Creates a new user because email is not associated
         # with any existing account in our app
 
-        # Sends user information to signal to be updated into
-        # profile after saving
         if id_info.get('picture'):
             id_info['user_profile_picture'] = id_info[
                 'picture']['data']['url']
 
-        SocialAuthProfileUpdate.get_user_info(id_info)
-
         # first_and_second_name = id_info.get('name').split()
         first_name = id_info.get('first_name')
         second_name = id_info.get('last_name')
@@ -207,13 +187,13 @@ class FacebookAuthAPISerializer(serializers.Serializer):
             'email': id_info.get('email'),
             'first_name': first_name,
             'last_name': second_name,
-            'password': randomStringwithDigitsAndSymbols()
+            'password': randomStringwithDigitsAndSymbols(),
+            'is_verified': True,
+            # the profile picture is saved with the new user's profile
+            'profile': SocialAuthProfileUpdate.profile_fields(id_info)
         }
 
         new_user = User.objects.create_user(**payload)
-        new_user.is_verified = True
-        new_user.social_id = user_id
-        new_user.save()
 
         return {
             'token': new_user.token,
@@ -247,13 +227,6 @@ class TwitterAuthAPISerializer(serializers.Serializer):
             raise serializers.ValidationError(
                 id_info.get('errors')[0]['message'])
 
-        # Checks to see if there is a user id associated with
-        # the payload after decoding the token
-        # this user_id confirms that the user exists on twitter
-        # because its a unique identifier.
-
-        user_id = id_info['id_str']
-
         # Query database to check if there is an existing
         # user with the save email.
         user = User.objects.filter(email=id_info.get('email'))
@@ -271,8 +244,6 @@ class TwitterAuthAPISerializer(serializers.Serializer):
             profile_url_key = 'profile_image_url_https'
             id_info['user_profile_picture'] = id_info[profile_url_key]
 
-        SocialAuthProfileUpdate.get_user_info(id_info)
-
         # Creates a new user because email is not associated
         # with any existing account in our app
         first_and_second_name = id_info.get('name').split()
@@ -282,14 +253,14 @@ class TwitterAuthAPISerializer(serializers.Serializer):
             'email': id_info.get('email'),
             'first_name': first_name,
             'last_name': second_name,
-            'password': randomStringwithDigitsAndSymbols()
+            'password': randomStringwithDigitsAndSymbols(),
+            'is_verified': True,
+            # the profile picture is saved with the new user's profile
+            'profile': SocialAuthProfileUpdate.profile_fields(id_info)
         }
 
         try:
             new_user = User.objects.create_user(**payload)
-            new_user.is_verified = True
-            new_user.social_id = user_id
-            new_user.save()
         except ValidationError:
             raise serializers.ValidationError('Error While creating User.')
 
@@ -589,11 +560,26 @@ class ClientReviewSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'createdAt', 'reviewer',
                             'replies', 'is_deleted')
 
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """
+        Load the reviewers and the replies that are not soft deleted with
+        the reviews, so listing reviews costs the same number of queries
+        however many there are
+        """
+        replies = ReplyReview.active_objects.all_objects().select_related(
+            'reviewer__userprofile')
+        return queryset.select_related(
+            'reviewer__userprofile').prefetch_related(
+            Prefetch('replies', queryset=replies, to_attr='active_replies'))
+
     def get_replies(self, obj):
         """ returns all replies that are not soft deleted """
 
-        replies = ReplyReview.active_objects.all_objects().filter(
-            review__pk=obj.pk)
+        replies = getattr(obj, 'active_replies', None)
+        if replies is None:
+            replies = ReplyReview.active_objects.all_objects().filter(
+                review__pk=obj.pk)
         data = ReviewReplySerializer(replies, many=True)
         return data.data
 
@@ -1,56 +1,48 @@
-from django.db.models.signals import post_save
-from authentication.models import User, UserProfile
+from django.db.models.signals import post_delete, post_save
+from authentication.models import Client, User, UserProfile
 from django.dispatch import receiver
+from utils.cache import Snapshot
+
+
+# the approved clients served by ClientListView
+client_directory = Snapshot('client-directory')
 
 
 @receiver(post_save, sender=User)
 def create_profile(sender, instance, created, **kwargs):
+    """
+    Create the profile of a new user. Initial profile values passed to
+    `User.objects.create_user` are written in the same INSERT.
+    """
     if created:
-        UserProfile.objects.create(user=instance)
+        UserProfile.objects.create(
+            user=instance, **getattr(instance, '_profile_fields', {}))
 
 
-@receiver(post_save, sender=User)
-def save_profile(sender, instance, **kwargs):
-    instance.userprofile.save()
+@receiver(post_save, sender=Client)
+@receiver(post_delete, sender=Client)
+def invalidate_client_directory(sender, instance, **kwargs):
+    """
+    Rebuild the client directory after a client changes. This covers
+    approval status changes made through the admin and AddReasonView as
+    well as soft deletes and profile edits.
+    """
+    client_directory.invalidate()
 
 
 class SocialAuthProfileUpdate:
     """
-    This class holds the signals responsible for extracting the 
-    user information from the token and updating the user's profile
+    This class extracts the profile information from a social auth token
+    so that it is saved together with the new user's profile
     """
     @staticmethod
-    def profile(user_info):
+    def profile_fields(user_info):
         """
-        Uses information from the facebook token to update a usersprofile
+        Get the profile values found in a social auth token
         params: user info(a dictionary with user information from a token)
-        returns: function that implements profile update
-        """
-        def update_profile(sender, instance, **kwargs):
-            """
-            Updates profile of the current user basing on information
-            from the user token
-            params: sender - object that is sending a signal
-                    instance - the current object
-            returns: n/a
-            """
-            # get the generated profile of the current facebook user
-            profile = UserProfile.objects.get(user=instance)
-
-            social_pic = user_info.get('user_profile_picture')
-            # check if the user has a profile
-
-            if social_pic:
-                # update profile image(avator)
-                profile.image = social_pic
-                profile.save()
-
-        return update_profile
-
-    @staticmethod
-    def get_user_info(user_info):
-        """
-        Get the current url
+        returns: dictionary of profile fields to pass to `create_user`
         """
-        post_save.connect(SocialAuthProfileUpdate.profile(
-            user_info), sender=User, weak=False)
+        social_pic = user_info.get('user_profile_picture')
+        if social_pic:
+            return {'image': social_pic}
+        return {}
@@ -1,15 +1,90 @@
 import json
 import os
+import re
 
+import requests
+from django.conf import settings
+from django.core.cache import cache
 from facebook import GraphAPI, GraphAPIError
-from google.auth.transport import requests
+from google.auth import exceptions as google_exceptions
+from google.auth import transport
+from google.auth.transport import requests as google_requests
 from google.oauth2 import id_token
 from requests_oauthlib import OAuth1Session
 
 
+# one connection pool shared by every call to the social providers
+session = requests.Session()
+
+
+class CachedResponse(transport.Response):
+    """A provider response kept in the cache"""
+
+    def __init__(self, status, headers, data):
+        self._status = status
+        self._headers = headers
+        self._data = data
+
+    @property
+    def status(self):
+        return self._status
+
+    @property
+    def headers(self):
+        return self._headers
+
+    @property
+    def data(self):
+        return self._data
+
+
+class CachedCertsRequest(google_requests.Request):
+    """
+    google-auth transport which reuses our session and timeout. Successful
+    GET responses, which is how Google's signing certificates are fetched,
+    are cached for as long as Google's `Cache-Control` header allows.
+    """
+
+    def __init__(self):
+        super().__init__(session=session)
+
+    def __call__(self, url, method='GET', body=None, headers=None,
+                 timeout=None, **kwargs):
+        if timeout is None:
+            timeout = settings.SOCIAL_AUTH_TIMEOUT
+        if method != 'GET':
+            return super().__call__(
+                url, method, body, headers, timeout, **kwargs)
+
+        key = f'social-auth:{url}'
+        response = cache.get(key)
+        if response is None:
+            response = super().__call__(
+                url, method, body, headers, timeout, **kwargs)
+            if response.status != 200:
+                return response
+            response = CachedResponse(
+                response.status, dict(response.headers), response.data)
+            cache.set(key, response, certs_ttl(response.headers))
+        return response
+
+
+def certs_ttl(headers):
+    """Return how long a provider response may be cached for"""
+    cache_control = headers.get('Cache-Control') or \
+        headers.get('cache-control', '')
+    max_age = re.search(r'max-age=(\d+)', cache_control)
+    if max_age:
+        return int(max_age.group(1))
+    return settings.SOCIAL_AUTH_CERTS_TTL
+
+
 class SocialValidation:
     """Social validation"""
 
+    TWITTER_VERIFY_URL = \
+        'https://api.twitter.com/1.1/account/verify_credentials.json'
+
     @staticmethod
     def google_auth_validation(access_token):
         """
@@ -20,7 +95,7 @@ class SocialValidation:
         Args:
             id_token (Union[str, bytes]): The encoded token.
             request (google.auth.transport.Request): The object used to make
-                HTTP requests.
+                HTTP requests. We pass one that caches Google's certs.
             audience (str): The audience that this token is intended for.
             This is typically your application's OAuth 2.0 client ID.
             If None then the audience is not verified.
@@ -29,11 +104,10 @@ class SocialValidation:
         :return: Mapping[str, Any]: The decoded token
         """
         try:
-            id_info = id_token.verify_oauth2_token(id_token=access_token,
-                                                   request=requests.Request(),
-                                                   )
+            id_info = id_token.verify_oauth2_token(
+                id_token=access_token, request=CachedCertsRequest())
 
-        except ValueError:
+        except (ValueError, google_exceptions.TransportError):
             id_info = None
         return id_info
 
@@ -54,11 +128,13 @@ class SocialValidation:
         :return: Mapping[str, Any]: The decoded token
         """
         try:
-            graph = GraphAPI(access_token=access_token, version="3.1")
+            graph = GraphAPI(
+                access_token=access_token, version="3.1",
+                timeout=settings.SOCIAL_AUTH_TIMEOUT, session=session)
             path = '/me?fields=id,'
             path += 'first_name,last_name,email,picture.type(large),address'
             id_info = graph.request(path)
-        except GraphAPIError:
+        except (GraphAPIError, requests.RequestException):
             id_info = None
 
         return id_info
@@ -68,19 +144,15 @@ class SocialValidation:
         """
         Request signing and convenience methods for the oauth dance.
 
-        What is the difference between OAuth1Session and OAuth1?
-
-        OAuth1Session actually uses OAuth1 internally and its purpose is
-        to assist in the OAuth workflow through convenience methods to prepare
-        authorization URLs and parse the various token and redirection
-        responses. It also provide
-        rudimentary validation of responses.
+        OAuth1Session signs the request for us. It is a requests session
+        of its own, so we mount the adapters of our shared session on it
+        to reuse the same connection pool.
 
         :param access_token:
         :param access_token_secret:
         :return:
         """
-        url = 'https://api.twitter.com/1.1/account/verify_credentials.json'
+        url = SocialValidation.TWITTER_VERIFY_URL
         try:
             twitter = OAuth1Session(
                 client_key=os.environ.get('SOCIAL_AUTH_TWITTER_KEY'),
@@ -88,7 +160,11 @@ class SocialValidation:
                 resource_owner_key=access_token,
                 resource_owner_secret=access_token_secret
             )
-            response = twitter.get(f'{url}?include_email=true')
+            for prefix, adapter in session.adapters.items():
+                twitter.mount(prefix, adapter)
+            response = twitter.get(
+                f'{url}?include_email=true',
+                timeout=settings.SOCIAL_AUTH_TIMEOUT)
             id_info = json.loads(response.text)
         except Exception:
             id_info = None
@@ -0,0 +1,89 @@
+import threading
+import time
+from collections import OrderedDict
+
+import jwt
+from django.conf import settings
+from django.utils import timezone
+
+
+class TokenService:
+    """
+    The one place where LandVille tokens are signed and verified.
+
+    Tokens are always signed with `ALGORITHM` and only that algorithm is
+    accepted when decoding, so a token can't pick its own verification
+    scheme. Expiry is computed from an aware UTC datetime, which makes the
+    `exp` claim independent of the server's local time zone.
+
+    Verifying a token is the same work every time the same client calls
+    us, so recently verified tokens are kept in a small LRU together with
+    their decoded payload. A cached payload is only served while its
+    `exp` claim is still in the future.
+    """
+
+    ALGORITHM = 'HS256'
+
+    _verified = OrderedDict()
+    _lock = threading.Lock()
+
+    @classmethod
+    def encode(cls, payload, lifetime):
+        """
+        Sign `payload` and return the token as a string.
+        params:
+            payload - dictionary of claims to sign
+            lifetime - timedelta after which the token expires
+        """
+        expiry = timezone.now() + lifetime
+        claims = dict(payload, exp=int(expiry.timestamp()))
+        token = jwt.encode(
+            claims, settings.SECRET_KEY, algorithm=cls.ALGORITHM)
+        return token.decode('utf-8')
+
+    @classmethod
+    def decode(cls, token):
+        """
+        Verify `token` and return its payload. Raises the same `jwt`
+        exceptions as `jwt.decode`, eg `jwt.ExpiredSignatureError`.
+        """
+        key = (settings.SECRET_KEY, token)
+        payload = cls._cached_payload(key)
+        if payload is not None:
+            return payload
+
+        payload = jwt.decode(
+            token, settings.SECRET_KEY, algorithms=[cls.ALGORITHM],
+            leeway=settings.JWT_LEEWAY)
+        cls._remember(key, payload)
+        return dict(payload)
+
+    @classmethod
+    def clear_cache(cls):
+        """Forget every verified token"""
+        with cls._lock:
+            cls._verified.clear()
+
+    @classmethod
+    def _cached_payload(cls, key):
+        with cls._lock:
+            payload = cls._verified.get(key)
+            if payload is None:
+                return None
+            if payload.get('exp', 0) + settings.JWT_LEEWAY <= time.time():
+                # let jwt raise the usual expiry error
+                del cls._verified[key]
+                return None
+            cls._verified.move_to_end(key)
+            return dict(payload)
+
+    @classmethod
+    def _remember(cls, key, payload):
+        if 'exp' not in payload:
+            # without an expiry we could never evict it safely
+            return
+        with cls._lock:
+            cls._verified[key] = payload
+            cls._verified.move_to_end(key)
+            while len(cls._verified) > settings.JWT_VERIFIED_CACHE_SIZE:
+                cls._verified.popitem(last=False)
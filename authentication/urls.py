@@ -6,7 +6,7 @@ from authentication.views import (
     FacebookAuthAPIView, TwitterAuthAPIView,
     LoginAPIView, PasswordResetView, ProfileView,
     AddReasonView, ClientReviewsView, ReviewDetailView,
-    ReplyView, UserReviewsView, LogoutView,
+    ReplyView, UserReviewsView, LogoutView, LogoutAllView,
     RetrieveUpdateDeleteClientView, ClientListView)
 
 app_name = 'authentication'
@@ -40,4 +40,5 @@ urlpatterns = [
     path('reviewer/<int:reviewer_id>/',
          UserReviewsView.as_view(), name='user-reviews'),
     path('logout/', LogoutView.as_view(), name='logout'),
+    path('logout/all/', LogoutAllView.as_view(), name='logout-all'),
 ]
@@ -6,7 +6,7 @@ from django.conf import settings
 from django.contrib import messages
 from django.forms.models import model_to_dict
 from django.http import Http404
-from django.http import HttpResponseRedirect
+from django.http import HttpResponseBadRequest, HttpResponseRedirect
 from django.shortcuts import render, get_object_or_404
 from django.views import View
 from rest_framework import authentication
@@ -28,6 +28,8 @@ from authentication.permissions import (
     IsProfileOwner,
     IsOwnerOrAdmin)
 from authentication.renderer import UserJSONRenderer, ClientJSONRenderer
+from authentication.signals import client_directory
+from authentication.tokens import TokenService
 from authentication.serializers import (
     GoogleAuthSerializer, FacebookAuthAPISerializer, PasswordResetSerializer,
     ProfileSerializer, TwitterAuthAPISerializer, RegistrationSerializer,
@@ -35,6 +37,8 @@ from authentication.serializers import (
     ClientReviewSerializer, ReviewReplySerializer, BlackListSerializer)
 from property.validators import validate_image
 from utils import BaseUtils
+from utils.cache import not_modified, set_validators
+from utils.lookups import APPROVAL_STATUS_LABELS, REJECTED, REVOKED
 from utils.media_handlers import CloudinaryResourceHandler
 from utils.permissions import IsBuyerOrReadOnly, IsReviewer, IsAdmin
 from utils.tasks import send_email_notification
@@ -56,7 +60,8 @@ class RegistrationAPIView(generics.GenericAPIView):
             request,
             user_data["email"]
         ]
-        url = generate_validation_url(message)
+        url = generate_validation_url(
+            message, user_id=serializer.instance.id)
 
         payload = {
             "subject": "Welcome to Landville, Verify your Account",
@@ -84,6 +89,8 @@ class LoginAPIView(generics.GenericAPIView):
     """login a user via email"""
     serializer_class = LoginSerializer
     renderer_classes = (UserJSONRenderer,)
+    # failed logins are answered with a 401, see custom_exception_handler
+    error_status_code = status.HTTP_401_UNAUTHORIZED
 
     def post(self, request):
         serializer = self.serializer_class(data=request.data)
@@ -106,10 +113,7 @@ class EmailVerificationView(generics.GenericAPIView):
         domain = os.environ.get('FRONT_END_LOGIN_URL')
         token, user_id = request.GET.get("token").split("~")
         try:
-            payload = jwt.decode(token, settings.SECRET_KEY)
-        except jwt.exceptions.DecodeError:
-            return HttpResponseRedirect(
-                domain + '?verified_status=invalid_link')  # noqa
+            payload = TokenService.decode(token)
         except jwt.ExpiredSignatureError:
             url = generate_validation_url([request], user_id=user_id)
             user = User.objects.filter(id=user_id).first()
@@ -128,13 +132,16 @@ class EmailVerificationView(generics.GenericAPIView):
             message = "verification link is expired, we have " \
                       "sent you a new one."
             return self.sendResponse(message, status.HTTP_400_BAD_REQUEST)
+        except jwt.InvalidTokenError:
+            return HttpResponseRedirect(
+                domain + '?verified_status=invalid_link')  # noqa
 
         user = User.objects.filter(email=payload.get("email")).first()
         if user.is_verified:
             return self.sendResponse("Account is already activated")
 
         user.is_verified = True
-        user.save()
+        user.save(update_fields=['is_verified', 'updated_at'])
         return HttpResponseRedirect(domain)
 
     def sendResponse(self, message, status=status.HTTP_200_OK):
@@ -346,22 +353,40 @@ class ClientListView(generics.GenericAPIView):
 
         return Client.active_objects.all_approved()
 
-    def get(self, request):
-        """ Handles retrieving all existing client companies """
+    def build_directory(self):
+        """ Serialize the approved clients for the directory snapshot """
 
         serializer = self.serializer_class(self.get_queryset(), many=True)
-        if not serializer.data:
+        return list(serializer.data)
+
+    def get(self, request):
+        """
+        Handles retrieving all existing client companies. The directory is
+        served from a cached snapshot, so clients that already have it get
+        a 304 without us touching the database.
+        """
+
+        directory = client_directory.get(self.build_directory)
+        not_modified_response = not_modified(request, directory)
+        if not_modified_response is not None:
+            return not_modified_response
+
+        if not directory['data']:
             response = {
                 "message": "There are no clients at the moment."
             }
-            status_code = status.HTTP_404_NOT_FOUND
-        else:
-            response = {
-                "client_companies": serializer.data,
-                "message": "You have retrieved all clients",
-            }
-            status_code = status.HTTP_200_OK
-        return Response(response, status=status_code)
+            return Response(response, status=status.HTTP_404_NOT_FOUND)
+
+        page = self.paginate_queryset(directory['data'])
+        response = {
+            "client_companies": page,
+            "count": self.paginator.count,
+            "next": self.paginator.get_next_link(),
+            "previous": self.paginator.get_previous_link(),
+            "message": "You have retrieved all clients",
+        }
+        return set_validators(
+            Response(response, status=status.HTTP_200_OK), directory)
 
 
 class RetrieveUpdateDeleteClientView(APIView):
@@ -565,13 +590,16 @@ class AddReasonView(View):
         notes = request.POST['notes']
         client = request.POST['client'],
         status = request.POST['status']
-        messages.info(request, 'Client record has been updated')
+        if status not in APPROVAL_STATUS_LABELS:
+            return HttpResponseBadRequest('Unknown approval status')
+        messages.info(request, 'Client record has been updated to {}'.format(
+            APPROVAL_STATUS_LABELS[status]))
         message = ''
-        if status == "revoked":
+        if status == REVOKED:
             message = 'Hey there,\n\nyour approval for LandVille was revoked'\
                 ',for the following reason \n\n{}'                                                                                     .format(
                     notes)
-        elif status == 'rejected':
+        elif status == REJECTED:
             message = 'Hey there,\n\nyour application for LandVille was not '\
                       'accepted\
             ,for the following reason \n\n{}'                                                                                                                                                                                    .format(notes)
@@ -608,10 +636,17 @@ class ClientReviewsView(generics.ListCreateAPIView):
         client = get_object_or_404(Client, pk=self.kwargs.get('client_id'))
         queryset = ClientReview.active_objects.all_objects().filter(
             client=client)
-        if queryset:
-            return queryset
-        else:
+        return self.serializer_class.setup_eager_loading(queryset)
+
+    def list(self, request, *args, **kwargs):
+        """ responds with a 404 when the client has no reviews """
+
+        queryset = self.filter_queryset(self.get_queryset())
+        if not queryset.exists():
             raise Http404
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
     def create(self, request, *args, **kwargs):
         """ allows buyers to add reviews to a client """
@@ -646,7 +681,8 @@ class ReviewDetailView(generics.RetrieveUpdateDestroyAPIView):
     def get_queryset(self):
         """ returns different results depending on who is making a request """
 
-        return ClientReview.active_objects.all_objects()
+        return self.serializer_class.setup_eager_loading(
+            ClientReview.active_objects.all_objects())
 
     def destroy(self, request, pk):
         """
@@ -755,32 +791,39 @@ class UserReviewsView(generics.GenericAPIView):
     permission_classes = (IsAuthenticated, IsReviewer)
 
     def get(self, request, **kwargs):
-        reviews = ClientReview.active_objects.all_objects().filter(
-            reviewer__pk=kwargs.get('reviewer_id'))
+        reviews = self.serializer_class.setup_eager_loading(
+            ClientReview.active_objects.all_objects().filter(
+                reviewer__pk=kwargs.get('reviewer_id')))
         serializer = self.serializer_class(reviews, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 class LogoutView(generics.CreateAPIView):
     """
-    This class deals with logging out a user by
-    creating blacklist tokens
+    This class deals with logging out a user either by bumping their
+    token version or by creating blacklist tokens, depending on the
+    `JWT_REVOCATION_MODE` setting
     """
     serializer_class = BlackListSerializer
     permission_classes = (IsAuthenticated,)
 
     def post(self, request, **args):
         """
-        This method creates a blacklist token
+        This method revokes the token used to make the request
         """
 
-        auth_header = authentication.get_authorization_header(request).split()
-        token = auth_header[1].decode('utf-8')
-        data = {'token': token}
+        if settings.JWT_REVOCATION_MODE == 'blacklist':
+            auth_header = authentication.get_authorization_header(
+                request).split()
+            token = auth_header[1].decode('utf-8')
+            data = {'token': token}
+
+            serializer = self.serializer_class(data=data)
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+        else:
+            request.user.revoke_tokens()
 
-        serializer = self.serializer_class(data=data)
-        serializer.is_valid(raise_exception=True)
-        serializer.save()
         return Response(
             {
                 'data':
@@ -788,3 +831,21 @@ class LogoutView(generics.CreateAPIView):
             },
             status=status.HTTP_200_OK
         )
+
+
+class LogoutAllView(generics.GenericAPIView):
+    """
+    Log a user out of every device by revoking all the tokens
+    issued to them so far
+    """
+    permission_classes = (IsAuthenticated,)
+
+    def post(self, request):
+        request.user.revoke_tokens()
+        return Response(
+            {
+                'data':
+                    {"message": "Successfully logged out of all devices"}
+            },
+            status=status.HTTP_200_OK
+        )
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class BenchmarksConfig(AppConfig):
+    """
+    Development tools that seed throwaway data and time the API. Nothing
+    else depends on this app, which has no models.
+    """
+    name = 'benchmarks'
@@ -0,0 +1,185 @@
+import json
+import random
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from authentication.models import Client, ClientReview, User, UserProfile
+from property.models import Property
+from transactions.models import Deposit, Transaction
+from utils.benchmark import (
+    address, build_user, fake, location, requests_per_second, summarise,
+    time_calls)
+
+DUMMY_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    }
+}
+
+
+class Command(BaseCommand):
+    """
+    Seed a realistic data set, drive the main endpoints in process and
+    print, per endpoint, the latency percentiles, the throughput and the
+    number of queries a request runs as JSON, eg:
+        python manage.py benchmark_endpoints --iterations 100 > v1.json
+    Diff two reports to compare releases. The rows are bulk inserted a
+    batch at a time and everything runs inside a rolled back transaction,
+    so nothing is persisted. Caches are disabled unless `--with-cache` is
+    passed, so the numbers reflect the work a cache miss costs.
+
+    A tenth as many transactions as deposits are made, at most one per
+    buyer and property.
+    """
+    help = 'Report latency, throughput and queries of the main endpoints'
+
+    batch_size = 5000
+
+    def add_arguments(self, parser):
+        parser.add_argument('--properties', type=int, default=100000)
+        parser.add_argument('--clients', type=int, default=10000)
+        parser.add_argument('--deposits', type=int, default=1000000)
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--with-cache', action='store_true')
+
+    def handle(self, *args, **options):
+        # the first ten properties hold a published one from the second on
+        if options['properties'] < 2:
+            raise CommandError('--properties must be at least 2')
+        for name in ('clients', 'iterations'):
+            if options[name] < 1:
+                raise CommandError(f'--{name} must be at least 1')
+        if options['deposits'] < 0:
+            raise CommandError('--deposits must not be negative')
+        caches = settings.CACHES if options['with_cache'] else DUMMY_CACHES
+        hosts = settings.ALLOWED_HOSTS + ['testserver']
+        with override_settings(CACHES=caches, ALLOWED_HOSTS=hosts), \
+                transaction.atomic():
+            start = time.perf_counter()
+            seeded = self.seed(
+                options['properties'], options['clients'],
+                options['deposits'])
+            report = {
+                'seed': dict(
+                    seeded, seconds=round(time.perf_counter() - start, 1)),
+                'endpoints': self.benchmark(options['iterations']),
+            }
+            transaction.set_rollback(True)
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def bulk_insert(self, model, count, build):
+        """
+        Bulk insert `count` rows built by `build(i)` a batch at a time and
+        yield their primary keys. Only one batch of instances is held.
+        """
+        for offset in range(0, count, self.batch_size):
+            for row in model.objects.bulk_create([build(i) for i in range(
+                    offset, min(offset + self.batch_size, count))]):
+                yield row.pk
+
+    def seed(self, properties, clients, deposits):
+        """Bulk insert the benchmark data set and return the row counts"""
+        now = timezone.now()
+        admin_ids = list(self.bulk_insert(
+            User, clients, lambda i: build_user('CA', f'-{i}')))
+        buyer_ids = list(self.bulk_insert(
+            User, max(clients // 10, 1),
+            lambda i: build_user('BY', f'-{i}')))
+        user_ids = admin_ids + buyer_ids
+        # users are bulk inserted, so their profiles aren't made for them
+        list(self.bulk_insert(UserProfile, len(user_ids), lambda i: (
+            UserProfile(user_id=user_ids[i], address=address()))))
+        company_ids = list(self.bulk_insert(Client, clients, lambda i: (
+            Client(
+                client_admin_id=admin_ids[i],
+                client_name=f'{fake.company()} {i}', phone=str(i),
+                email=f'benchmark-client-{i}@landville.test',
+                address=address(), approval_status='approved'))))
+        list(self.bulk_insert(ClientReview, clients * 5, lambda i: (
+            ClientReview(
+                client_id=company_ids[i % clients],
+                reviewer_id=random.choice(buyer_ids),
+                review=fake.sentence()))))
+        listing_ids = list(self.bulk_insert(Property, properties, lambda i: (
+            Property(
+                client_id=company_ids[i % clients], title=fake.sentence(),
+                slug=f'benchmark-property-{i}', description=fake.text(),
+                address=address(), list_date=now.date(),
+                **location(),
+                price=random.randint(10000, 10000000), lot_size=2345.435,
+                image_main=fake.url(), image_others=[fake.url()],
+                purchase_plan='I', is_published=i % 10 != 0,
+                view_count=random.randint(0, 500),
+                last_viewed=now - timedelta(days=random.randint(0, 60))))))
+        transactions = min(
+            max(deposits // 10, 1), len(listing_ids) * len(buyer_ids))
+        transaction_ids = list(self.bulk_insert(
+            Transaction, transactions, lambda i: (
+                # one transaction per buyer and property
+                Transaction(
+                    target_property_id=listing_ids[i % len(listing_ids)],
+                    buyer_id=buyer_ids[
+                        i // len(listing_ids) % len(buyer_ids)],
+                    amount_paid=200000))))
+        for _ in self.bulk_insert(Deposit, deposits, lambda i: Deposit(
+                transaction_id=transaction_ids[i % len(transaction_ids)],
+                references={'txRef': f'BENCHMARK_LAND{i}'},
+                tx_ref=f'BENCHMARK_LAND{i}', amount=2453534.54,
+                description=fake.sentence())):
+            pass
+
+        self.buyer = User.objects.get(pk=buyer_ids[0])
+        self.listing = Property.objects.filter(
+            pk__in=listing_ids[:10], is_published=True).first()
+        self.company = Client.objects.get(pk=company_ids[0])
+        return {
+            'users': len(user_ids),
+            'clients': clients,
+            'properties': properties,
+            'transactions': len(transaction_ids),
+            'deposits': deposits,
+        }
+
+    def endpoints(self):
+        """Return the requests to benchmark, keyed by name"""
+        properties_url = reverse('property:create_and_list_property')
+        return {
+            'properties-list': (properties_url, {}),
+            'properties-search': (properties_url, {'search': fake.word()}),
+            'properties-filter': (properties_url, {
+                'city': self.listing.address['City'],
+                'price_min': 100000, 'price_max': 5000000}),
+            'trending': (reverse('property:trending_property'), {}),
+            'property-detail': (reverse(
+                'property:single_property', args=[self.listing.slug]), {}),
+            'transactions': (reverse('transactions:transactions'), {}),
+            'my-deposit': (reverse('transactions:my_deposit'), {}),
+            'client-reviews': (reverse(
+                'auth:add-reviews', args=[self.company.pk]), {}),
+        }
+
+    def benchmark(self, iterations):
+        """Return the report of every endpoint, requested as a buyer"""
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.buyer.token}')
+        report = {}
+        for name, (url, params) in self.endpoints().items():
+            # a first request warms up and tells us how many queries run
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(url, params)
+            # the next request resets the query log, count them now
+            query_count = len(queries)
+            samples = time_calls(lambda: client.get(url, params), iterations)
+            report[name] = dict(
+                summarise(samples), status=response.status_code,
+                queries=query_count,
+                requests_per_second=requests_per_second(samples))
+        return report
@@ -0,0 +1,89 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from property.models import Property
+from property.renderers import PropertyJSONRenderer
+from property.serializers import PropertyValuesSerializer
+from transactions.models import Deposit, Transaction
+from transactions.serializers import DepositSerializer
+from utils.benchmark import (
+    build_property, build_user, create_client, fake, summarise, time_calls)
+from utils.renderers import FastJSONRenderer
+
+
+def page(results):
+    """Wrap results the way LimitOffsetPagination does"""
+    return {'count': len(results), 'next': None, 'previous': None,
+            'results': results}
+
+
+class Command(BaseCommand):
+    """
+    Time encoding a page of property and a page of deposits with the
+    stdlib `json`, DRF's `JSONRenderer` and our `FastJSONRenderer`, and
+    print the latency summaries as JSON, eg:
+        python manage.py benchmark_renderers --iterations 50
+    The pages are serialized once, only encoding them is timed. The rows
+    are created inside a rolled back transaction.
+    """
+    help = 'Compare the JSON encoders used to render responses'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--properties', type=int, default=1000)
+        parser.add_argument('--deposits', type=int, default=10000)
+        parser.add_argument('--iterations', type=int, default=20)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            client = create_client()
+            pages = {
+                'properties': self.property_page(
+                    client, options['properties']),
+                'deposits': self.deposit_page(client, options['deposits']),
+            }
+            transaction.set_rollback(True)
+
+        renderers = {
+            'json': json.dumps,
+            'drf': JSONRenderer().render,
+            'fast': FastJSONRenderer().render,
+        }
+        report = {
+            name: {
+                renderer: summarise(time_calls(
+                    lambda: render(data), options['iterations']))
+                for renderer, render in renderers.items()}
+            for name, data in pages.items()}
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def property_page(self, client, count):
+        """Return a page of listed property, formatted for rendering"""
+        Property.objects.bulk_create([
+            build_property(client, i) for i in range(count)])
+        results = PropertyValuesSerializer(PropertyValuesSerializer.values(
+            Property.objects.filter(client=client))).data
+        PropertyJSONRenderer().property_list_format(results)
+        return {'data': {'properties': page(results)}}
+
+    def deposit_page(self, client, count):
+        """Return a page of serialized deposits"""
+        listing = build_property(client, 'deposits')
+        listing.save()
+        buyer = build_user('BY')
+        buyer.save()
+        deposit_transaction = Transaction.objects.create(
+            target_property=listing, buyer=buyer, amount_paid=200000)
+        Deposit.objects.bulk_create([
+            Deposit(
+                transaction=deposit_transaction,
+                references={'txRef': f'BENCHMARK_LAND{i}'},
+                tx_ref=f'BENCHMARK_LAND{i}', amount=2453534.54,
+                description=fake.sentence())
+            for i in range(count)])
+        deposits = Deposit.objects.filter(
+            transaction=deposit_transaction).select_related(
+                'account', 'transaction')
+        return page(DepositSerializer(deposits, many=True).data)
@@ -0,0 +1,29 @@
+"""
+Gunicorn settings, used by the web process in the Procfile.
+
+Prometheus metrics live in the memory of the process that records them,
+so with several workers /metrics/ would only report the worker answering
+the scrape. prometheus_client writes them to files in
+`prometheus_multiproc_dir` instead when it is set before the workers
+start, and `utils.views.metrics` adds the files up.
+"""
+import os
+import shutil
+import tempfile
+
+os.environ.setdefault(
+    'prometheus_multiproc_dir',
+    os.path.join(tempfile.gettempdir(), 'landville-metrics'))
+
+
+def on_starting(server):
+    """Start from no metrics rather than those of a previous run"""
+    directory = os.environ['prometheus_multiproc_dir']
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory)
+
+
+def child_exit(server, worker):
+    """Drop the live metrics of a worker that exited"""
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -52,10 +52,14 @@ INSTALLED_APPS = [
     'authentication.apps.AuthenticationConfig',
     'property.apps.PropertyConfig',
     'transactions.apps.TransactionsConfig',
-    'pages.apps.PagesConfig'
+    'pages.apps.PagesConfig',
+
+    # development tools
+    'benchmarks.apps.BenchmarksConfig',
 ]
 
 MIDDLEWARE = [
+    'utils.middleware.RequestMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -93,6 +97,34 @@ REST_FRAMEWORK = {
 }
 
 
+# How logged out tokens are revoked. `token_version` bumps a counter on the
+# user so that every token issued before the logout is rejected, while
+# `blacklist` stores each logged out token in the BlackList table.
+JWT_REVOCATION_MODE = os.environ.get('JWT_REVOCATION_MODE', 'token_version')
+
+# Seconds of clock skew tolerated when checking a token's expiry, and how
+# many verified tokens `authentication.tokens.TokenService` keeps decoded.
+JWT_LEEWAY = int(os.environ.get('JWT_LEEWAY', 30))
+JWT_VERIFIED_CACHE_SIZE = int(os.environ.get('JWT_VERIFIED_CACHE_SIZE', 1024))
+
+# Seconds to wait for Google, Facebook and Twitter when validating a social
+# login, and how long Google's certs are cached when they don't say.
+SOCIAL_AUTH_TIMEOUT = float(os.environ.get('SOCIAL_AUTH_TIMEOUT', 5))
+SOCIAL_AUTH_CERTS_TTL = int(os.environ.get('SOCIAL_AUTH_CERTS_TTL', 3600))
+
+# Share of requests whose query count, DB, render and external HTTP time
+# are recorded by `utils.middleware.RequestMetricsMiddleware`, whether they
+# are also sent back in a Server-Timing header (off unless an environment
+# opts in, since it shows any client our internal timings), and the bearer
+# token that Prometheus must send to scrape /metrics/ (the endpoint is off
+# without one)
+# Metrics are added up across gunicorn workers, see landville/gunicorn.py
+REQUEST_METRICS_SAMPLE_RATE = float(
+    os.environ.get('REQUEST_METRICS_SAMPLE_RATE', 1.0))
+REQUEST_METRICS_SERVER_TIMING = os.environ.get(
+    'REQUEST_METRICS_SERVER_TIMING', 'False') == 'True'
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
 # for all scheduled tasks
 SCHEDULER_AUTOSTART = True
 
@@ -160,6 +192,28 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing
+# The hasher named by PASSWORD_HASHER_PROFILE hashes new passwords. The
+# others stay installed so that existing hashes still verify and are
+# upgraded to the preferred profile when their owner next logs in.
+PASSWORD_HASHER_PROFILES = {
+    'pbkdf2': 'authentication.hashers.PBKDF2PasswordHasher',
+    'argon2': 'authentication.hashers.Argon2PasswordHasher',
+    'bcrypt': 'authentication.hashers.BCryptSHA256PasswordHasher',
+}
+PASSWORD_HASHER_PROFILE = os.environ.get('PASSWORD_HASHER_PROFILE', 'pbkdf2')
+PASSWORD_HASHERS = [PASSWORD_HASHER_PROFILES[PASSWORD_HASHER_PROFILE]] + [
+    hasher for profile, hasher in PASSWORD_HASHER_PROFILES.items()
+    if profile != PASSWORD_HASHER_PROFILE
+] + ['django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher']
+PASSWORD_HASHER_COST = {
+    'pbkdf2_iterations': int(os.environ.get('PBKDF2_ITERATIONS', 150000)),
+    'argon2_time_cost': int(os.environ.get('ARGON2_TIME_COST', 2)),
+    'argon2_memory_cost': int(os.environ.get('ARGON2_MEMORY_COST', 512)),
+    'argon2_parallelism': int(os.environ.get('ARGON2_PARALLELISM', 2)),
+    'bcrypt_rounds': int(os.environ.get('BCRYPT_ROUNDS', 12)),
+}
+
 # Email Configurations
 DOMAIN = os.environ.get('DOMAIN', '')
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
@@ -179,6 +233,26 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'UTC'
 
+# Cache settings
+# Cached responses are invalidated by signals in the process that made the
+# change, so all processes (web workers, Celery, management commands) must
+# share one cache. Without Redis, eg in local development, Django's default
+# per-process cache is used.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': os.environ.get('REDIS_URL'),
+            'KEY_PREFIX': 'landville',
+        }
+    }
+
+# Whether card payments are validated and verified with Rave by a Celery
+# worker, see `transactions.tasks.verify_payment_attempt`. Clients then get
+# a payment attempt id to poll instead of waiting for Rave.
+PAYMENT_VERIFICATION_ASYNC = os.environ.get(
+    'PAYMENT_VERIFICATION_ASYNC', 'False') == 'True'
+
 # Internationalization
 # https://docs.djangoproject.com/en/2.1/topics/i18n/
 
@@ -20,6 +20,7 @@ from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 from rest_framework.permissions import AllowAny
 from django.views.generic.base import RedirectView
+from utils.views import metrics
 
 schema_view = get_schema_view(
     openapi.Info(
@@ -72,6 +73,7 @@ urlpatterns = [
     path('api/v1/transactions/',
          include('transactions.urls', namespace='transactions')),
     path('api/v1/terms/', include(('pages.urls', 'terms'), namespace='terms')),
+    path('metrics/', metrics, name='metrics'),
 ]
 
 handler404 = 'landville.views.error_404'
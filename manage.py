@@ -16,6 +16,13 @@ if __name__ == '__main__':
             settings.PASSWORD_HASHERS = [
                 'django.contrib.auth.hashers.MD5PasswordHasher',
             ]
+            # the database is reset between tests but a cache isn't, so
+            # tests that exercise caching opt in with `override_settings`
+            settings.CACHES = {
+                'default': {
+                    'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+                }
+            }
 
     except ImportError as exc:
         raise ImportError(
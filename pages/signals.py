@@ -0,0 +1,16 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from pages.models import Term
+from utils.cache import CompressedSnapshot
+
+
+# the latest terms served by TermsView
+terms_snapshot = CompressedSnapshot('terms')
+
+
+@receiver(post_save, sender=Term)
+@receiver(post_delete, sender=Term)
+def invalidate_terms(sender, instance, **kwargs):
+    """Serve the new terms as soon as they are saved"""
+    terms_snapshot.invalidate()
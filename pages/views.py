@@ -1,8 +1,11 @@
+from django.utils.cache import patch_vary_headers
 from rest_framework.views import APIView
 from pages.models import Term
 from pages.serializers import PagesSerializer
+from pages.signals import terms_snapshot
 from rest_framework.response import Response
 from rest_framework import status
+from utils.cache import not_modified, set_validators
 
 
 class TermsView(APIView):
@@ -11,7 +14,25 @@ class TermsView(APIView):
     serializer_class = PagesSerializer
 
     def get(self, request):
-        """Query for terms of use and serve them over http."""
+        """
+        Serve the terms of use over http. The latest terms are kept in the
+        cache until they change, and clients that already have them or
+        accept gzip are answered without rendering anything.
+        """
+        terms = terms_snapshot.get(self.latest_terms)
+        compressed = request.accepted_renderer.format == 'json' \
+            and terms_snapshot.accepts_gzip(request)
+        response = not_modified(
+            request, terms['gzip'] if compressed else terms)
+        if response is None and compressed:
+            response = terms_snapshot.gzip_response(terms)
+        if response is None:
+            response = set_validators(
+                Response(terms['data'], status=status.HTTP_200_OK), terms)
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+    def latest_terms(self):
+        """Query for the latest terms of use"""
         terms = Term.objects.latest('last_updated_at')
-        serializer = PagesSerializer(terms)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return PagesSerializer(terms).data
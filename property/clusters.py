@@ -0,0 +1,161 @@
+"""
+Map clusters.
+
+At zoom level `z` the world is cut into a grid of square cells,
+`CELLS_PER_TILE` to the side of a map tile. Each cell reports how many
+published property it holds, their centroid and price range, so zoomed
+out maps draw a bounded number of clusters instead of every pin. Clusters
+are cached per (zoom, cell) until property changes, and the cells a
+viewport misses are aggregated with one grouped query. Only viewports
+missing a few cells are cached, so a zoomed out map can't evict the rest
+of the cache.
+"""
+import math
+
+from django.core.cache import cache
+from django.db.models import Avg, Count, F, IntegerField, Max, Min, Value
+from django.db.models.functions import Cast, Floor, Least
+
+from property import geo
+from property.signals import property_responses
+
+
+CELLS_PER_TILE = 4
+MAX_ZOOM = 20
+# the most clusters a viewport returns, we zoom out to stay under it
+MAX_CELLS = 1024
+# the most cells a request caches, larger viewports are aggregated every
+# time rather than flooding the cache with keys
+MAX_CACHED_CELLS = 64
+CLUSTER_TIMEOUT = 60 * 60
+
+
+def cell_size(zoom):
+    """Return the side of the cells at a zoom level, in degrees"""
+    return 360 / (2 ** zoom * CELLS_PER_TILE)
+
+
+def grid(zoom):
+    """Return the number of columns and rows of the grid at a zoom level"""
+    columns = 2 ** zoom * CELLS_PER_TILE
+    return columns, max(columns // 2, 1)
+
+
+def cell_of(longitude, latitude, zoom):
+    """Return the (column, row) of the cell holding a point"""
+    size = cell_size(zoom)
+    column_count, row_count = grid(zoom)
+    return (min(math.floor((longitude + 180) / size), column_count - 1),
+            min(math.floor((latitude + 90) / size), row_count - 1))
+
+
+def viewport_span(box, zoom):
+    """Return the number of columns and rows a bounding box spans"""
+    min_column, min_row = cell_of(box[0], box[1], zoom)
+    max_column, max_row = cell_of(box[2], box[3], zoom)
+    columns = max_column - min_column + 1
+    if min_column > max_column:
+        # the box crosses the antimeridian
+        columns += grid(zoom)[0]
+    return columns, max_row - min_row + 1
+
+
+def viewport_columns(box, zoom):
+    """Return the columns a bounding box spans, west to east"""
+    min_column, _ = cell_of(box[0], 0, zoom)
+    max_column, _ = cell_of(box[2], 0, zoom)
+    if min_column <= max_column:
+        return list(range(min_column, max_column + 1))
+    # the box crosses the antimeridian
+    column_count, _ = grid(zoom)
+    return list(range(min_column, column_count)) + \
+        list(range(max_column + 1))
+
+
+def viewport_cells(box, zoom):
+    """Return the cells covering a bounding box"""
+    _, min_row = cell_of(0, box[1], zoom)
+    _, max_row = cell_of(0, box[3], zoom)
+    return [(column, row)
+            for column in viewport_columns(box, zoom)
+            for row in range(min_row, max_row + 1)]
+
+
+def fitting_zoom(box, zoom):
+    """Return the closest zoom level at which a box spans few enough cells"""
+    while zoom > 0:
+        columns, rows = viewport_span(box, zoom)
+        if columns * rows <= MAX_CELLS:
+            break
+        zoom -= 1
+    return zoom
+
+
+def aggregate(queryset, cells, zoom):
+    """
+    Return the clusters of `cells`, keyed by cell, aggregated with one
+    grouped query. Empty cells are left out.
+    """
+    size = cell_size(zoom)
+    column_count, row_count = grid(zoom)
+    column_numbers = {column for column, _ in cells}
+    row_numbers = {row for _, row in cells}
+    # the box around the cells lets the location index narrow the rows
+    box = geo.bounding_box(
+        -180 + min(column_numbers) * size, -90 + min(row_numbers) * size,
+        -180 + (max(column_numbers) + 1) * size,
+        -90 + (max(row_numbers) + 1) * size)
+
+    results = queryset.filter(
+        box, latitude__isnull=False
+    ).annotate(
+        column=Least(Cast(Floor((F('longitude') + 180) / size),
+                          IntegerField()), Value(column_count - 1)),
+        row=Least(Cast(Floor((F('latitude') + 90) / size),
+                       IntegerField()), Value(row_count - 1)),
+    ).filter(
+        column__in=column_numbers, row__in=row_numbers
+    ).order_by().values('column', 'row').annotate(
+        count=Count('id'),
+        centroid_latitude=Avg('latitude'),
+        centroid_longitude=Avg('longitude'),
+        min_price=Min('price'),
+        max_price=Max('price'),
+        average_price=Avg('price'),
+    )
+    wanted = set(cells)
+    return {
+        (row['column'], row['row']): {
+            'cell': [zoom, row['column'], row['row']],
+            'count': row['count'],
+            'latitude': row['centroid_latitude'],
+            'longitude': row['centroid_longitude'],
+            'min_price': float(row['min_price']),
+            'max_price': float(row['max_price']),
+            'average_price': round(float(row['average_price']), 2),
+        }
+        for row in results if (row['column'], row['row']) in wanted}
+
+
+def clusters(queryset, box, zoom):
+    """
+    Return the zoom level used and the clusters of the property of
+    `queryset` in a bounding box, from the cache where possible
+    """
+    zoom = fitting_zoom(box, min(zoom, MAX_ZOOM))
+    cells = viewport_cells(box, zoom)
+    generation = property_responses.value()
+    keys = {
+        cell: f'property-cluster:{generation}:{zoom}:{cell[0]}:{cell[1]}'
+        for cell in cells}
+    cached = cache.get_many(keys.values())
+
+    missing = [cell for cell in cells if keys[cell] not in cached]
+    if missing:
+        built = aggregate(queryset, missing, zoom)
+        # empty cells are cached too, as an empty cluster
+        fresh = {keys[cell]: built.get(cell, {}) for cell in missing}
+        if len(fresh) <= MAX_CACHED_CELLS:
+            cache.set_many(fresh, CLUSTER_TIMEOUT)
+        cached.update(fresh)
+    return zoom, [cached[keys[cell]] for cell in cells if cached[keys[cell]]]
@@ -0,0 +1,135 @@
+"""
+Facet counts for property searches.
+
+`facet_counts` tells, for the property a search matches, how many have
+each property type, purchase plan, number of rooms, price range and city,
+so the filters can show counts next to their options. Every facet is
+counted in one pass over the matching rows with `GROUPING SETS`, and the
+counts are cached per filter until property changes.
+"""
+import hashlib
+import json
+
+from django.contrib.postgres.fields.jsonb import KeyTextTransform
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import CharField, Case, Value, When
+from django.db.models.functions import Cast
+
+from property.signals import property_responses
+
+
+# query params that page or shape a search without changing what it matches
+NON_FILTER_PARAMS = frozenset(('limit', 'offset', 'facets'))
+
+# price ranges, as `<price_min>-<price_max>` values of the price filter
+PRICE_BOUNDS = (0, 1000000, 5000000, 10000000, 50000000)
+PRICE_RANGES = tuple(
+    f'{low}-{high}' for low, high in zip(PRICE_BOUNDS, PRICE_BOUNDS[1:])
+) + (f'{PRICE_BOUNDS[-1]}-',)
+# rooms are counted one by one up to this many, then together
+MAX_ROOMS = 5
+# the cities listed, the ones with most property first
+MAX_CITIES = 20
+
+
+def room_buckets(field):
+    return Case(
+        When(**{f'{field}__gte': MAX_ROOMS}, then=Value(f'{MAX_ROOMS}+')),
+        default=Cast(field, CharField()), output_field=CharField())
+
+
+def price_ranges():
+    return Case(*[
+        When(price__gte=low, price__lt=high, then=Value(label))
+        for low, high, label in zip(PRICE_BOUNDS, PRICE_BOUNDS[1:],
+                                    PRICE_RANGES)
+    ], When(price__gte=PRICE_BOUNDS[-1], then=Value(PRICE_RANGES[-1])),
+        output_field=CharField())
+
+
+def facet_expressions():
+    """Return the value each facet counts property by, keyed by facet"""
+    return {
+        'property_type': Cast('property_type', CharField()),
+        'purchase_plan': Cast('purchase_plan', CharField()),
+        'bedrooms': room_buckets('bedrooms'),
+        'bathrooms': room_buckets('bathrooms'),
+        'garages': room_buckets('garages'),
+        'price': price_ranges(),
+        'city': KeyTextTransform('City', 'address'),
+    }
+
+
+def facet_counts(queryset):
+    """
+    Return the number of property of `queryset` per value of each facet,
+    eg `{'property_type': {'B': 12, 'E': 3}, ...}`, counted with one query
+    """
+    expressions = facet_expressions()
+    facets = list(expressions)
+    # annotations can't be named like the fields they bucket
+    rows = queryset.order_by().values(**{
+        f'facet_{facet}': expression
+        for facet, expression in expressions.items()})
+    inner_sql, params = rows.query.sql_with_params()
+
+    columns = [connection.ops.quote_name(f'facet_{facet}')
+               for facet in facets]
+    sql = (
+        'SELECT {columns}, GROUPING({columns}), COUNT(*) '
+        'FROM ({inner_sql}) AS facets GROUP BY GROUPING SETS ({sets})'
+    ).format(
+        columns=', '.join(columns), inner_sql=inner_sql,
+        sets=', '.join(f'({column})' for column in columns))
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        results = cursor.fetchall()
+
+    counts = {facet: {} for facet in facets}
+    for row in results:
+        values, grouping, count = row[:-2], row[-2], row[-1]
+        # GROUPING sets the bit of each column left out of the set, the
+        # first column being the highest bit
+        index = next(
+            index for index in range(len(facets))
+            if not grouping & (1 << (len(facets) - 1 - index)))
+        if values[index] is not None:
+            counts[facets[index]][values[index]] = count
+    return ordered(counts)
+
+
+def ordered(counts):
+    """Order the values of each facet the way the filters list them"""
+    counts['price'] = {
+        label: counts['price'][label]
+        for label in PRICE_RANGES if label in counts['price']}
+    for facet in ('property_type', 'purchase_plan', 'bedrooms', 'bathrooms',
+                  'garages'):
+        counts[facet] = dict(sorted(counts[facet].items()))
+    counts['city'] = dict(sorted(
+        counts['city'].items(), key=lambda item: (-item[1], item[0])
+    )[:MAX_CITIES])
+    return counts
+
+
+def filter_signature(scope, query_params):
+    """
+    Return a digest of the property a search matches: the scope of the
+    user and the query params, apart from paging
+    """
+    params = sorted(
+        (name, values) for name, values in query_params.lists()
+        if name not in NON_FILTER_PARAMS)
+    return hashlib.md5(
+        json.dumps([scope, params]).encode('utf-8')).hexdigest()
+
+
+def cached_facet_counts(queryset, signature):
+    """Return the facet counts of a search, from the cache where possible"""
+    key = f'property-facets:{property_responses.value()}:{signature}'
+    counts = cache.get(key)
+    if counts is None:
+        counts = facet_counts(queryset)
+        cache.set(key, counts)
+    return counts
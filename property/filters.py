@@ -1,12 +1,28 @@
 from django_filters import FilterSet
 from django_filters import rest_framework as filters
+from rest_framework.exceptions import ValidationError
+
+from property import geo
 from property.models import Property
 
 
+# the radius of a `near` search when none is given, in kilometres
+DEFAULT_SEARCH_RADIUS_KM = 5
+
+
+class NumberCSVFilter(filters.BaseCSVFilter, filters.NumberFilter):
+    """Filter on comma separated numbers, eg `near=6.45,3.39`"""
+
+
 class PropertyFilter(FilterSet):
     """
     Create a filter class that inherits from FilterSet. This class will help
     us search for properties using specified fields.
+    Property can also be searched by location, with the other filters:
+        near=<lat>,<lon>&radius=<km> - within `radius` of a point, closest
+            first
+        bbox=<min lon>,<min lat>,<max lon>,<max lat> - inside a box, eg
+            the area a map shows
     """
     city = filters.CharFilter('address__City', lookup_expr='icontains')
     street = filters.CharFilter('address__Street', lookup_expr='icontains')
@@ -18,6 +34,10 @@ class PropertyFilter(FilterSet):
     property_type = filters.CharFilter(lookup_expr='icontains')
     purchase_plan = filters.CharFilter(lookup_expr='icontains')
     price = filters.RangeFilter()
+    near = NumberCSVFilter(method='filter_near')
+    # read by `filter_near`
+    radius = filters.NumberFilter(method='filter_radius', min_value=0)
+    bbox = NumberCSVFilter(method='filter_bbox')
 
     class Meta:
         model = Property
@@ -36,3 +56,36 @@ class PropertyFilter(FilterSet):
             'lot_size',
             'price',
         )
+
+    def filter_near(self, queryset, name, value):
+        """Filter property within the radius of a point, closest first"""
+        latitude, longitude = self.location(name, value)
+        radius = self.form.cleaned_data.get('radius')
+        radius = DEFAULT_SEARCH_RADIUS_KM if radius is None else float(radius)
+        return queryset.filter(
+            geo.within_radius(latitude, longitude, radius)
+        ).annotate(
+            distance=geo.distance_km(latitude, longitude)
+        ).filter(distance__lte=radius).order_by('distance', '-created_at')
+
+    def filter_radius(self, queryset, name, value):
+        return queryset
+
+    def filter_bbox(self, queryset, name, value):
+        """
+        Filter property inside a bounding box, which crosses the
+        antimeridian when its min longitude is the larger
+        """
+        box = geo.parse_bounding_box(value)
+        if box is None:
+            raise ValidationError({name: geo.BOUNDING_BOX_ERROR})
+        return queryset.filter(geo.bounding_box(*box))
+
+    def location(self, name, value):
+        """Return a valid `[<lat>, <lon>]` pair as floats"""
+        latitude, longitude = geo.parse_location(
+            {'lat': value[0], 'lon': value[1]} if len(value) == 2 else None)
+        if latitude is None:
+            raise ValidationError(
+                {name: 'Give a valid latitude and longitude.'})
+        return latitude, longitude
@@ -0,0 +1,118 @@
+"""
+Spatial search helpers.
+
+Property coordinates are kept as entered in `Property.coordinates` and
+copied to the typed, indexed `latitude` and `longitude` columns, which is
+what we search on. A radius search first narrows the rows to the bounding
+box of the circle, which the index serves, and then measures the great
+circle distance of what is left.
+"""
+import json
+import math
+
+from django.db.models import FloatField, Q, Value
+from django.db.models.functions import ACos, Cos, Greatest, Least, Radians, Sin
+
+
+EARTH_RADIUS_KM = 6371.0088
+# the length of one degree of latitude
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+BOUNDING_BOX_ERROR = 'Give the box as min lon,min lat,max lon,max lat.'
+
+
+def parse_location(coordinates):
+    """
+    Return the (latitude, longitude) of `{'lat': ..., 'lon': ...}`
+    coordinates, which may be numbers or strings, or (None, None) when
+    they aren't a valid location.
+    """
+    if isinstance(coordinates, str):
+        try:
+            coordinates = json.loads(coordinates)
+        except ValueError:
+            return None, None
+    if not isinstance(coordinates, dict):
+        return None, None
+    try:
+        latitude = float(coordinates.get('lat'))
+        longitude = float(coordinates.get('lon'))
+    except (TypeError, ValueError):
+        return None, None
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return None, None
+    return latitude, longitude
+
+
+def parse_bounding_box(values):
+    """
+    Return `[<min lon>, <min lat>, <max lon>, <max lat>]` as a tuple of
+    floats, or None when it isn't a valid bounding box. The box crosses the
+    antimeridian when its min longitude is the larger.
+    """
+    if len(values) != 4:
+        return None
+    min_latitude, min_longitude = parse_location(
+        {'lat': values[1], 'lon': values[0]})
+    max_latitude, max_longitude = parse_location(
+        {'lat': values[3], 'lon': values[2]})
+    if min_latitude is None or max_latitude is None or \
+            min_latitude > max_latitude:
+        return None
+    return min_longitude, min_latitude, max_longitude, max_latitude
+
+
+def wrap_longitude(longitude):
+    """Bring a longitude back between -180 and 180"""
+    return (longitude + 180) % 360 - 180
+
+
+def longitude_range(min_longitude, max_longitude):
+    """
+    Return the filter of a longitude range, which crosses the
+    antimeridian when `min_longitude` is the larger
+    """
+    if min_longitude <= max_longitude:
+        return Q(longitude__range=(min_longitude, max_longitude))
+    return Q(longitude__gte=min_longitude) | Q(longitude__lte=max_longitude)
+
+
+def bounding_box(min_longitude, min_latitude, max_longitude, max_latitude):
+    """Return the filter of the property inside a bounding box"""
+    return Q(latitude__range=(min_latitude, max_latitude)) & \
+        longitude_range(min_longitude, max_longitude)
+
+
+def within_radius(latitude, longitude, radius_km):
+    """
+    Return the filter of the bounding box of a circle, which holds every
+    property within `radius_km` of the centre, and some just outside it.
+    """
+    delta_latitude = radius_km / KM_PER_DEGREE
+    min_latitude = latitude - delta_latitude
+    max_latitude = latitude + delta_latitude
+    cos_latitude = math.cos(math.radians(latitude))
+    if min_latitude <= -90 or max_latitude >= 90 or \
+            radius_km >= KM_PER_DEGREE * 180 * cos_latitude:
+        # the circle covers a pole or wraps around the globe
+        return Q(latitude__range=(max(min_latitude, -90),
+                                  min(max_latitude, 90)))
+    delta_longitude = delta_latitude / cos_latitude
+    return bounding_box(
+        wrap_longitude(longitude - delta_longitude), min_latitude,
+        wrap_longitude(longitude + delta_longitude), max_latitude)
+
+
+def distance_km(latitude, longitude):
+    """
+    Return the expression of the great circle distance in kilometres from
+    a point to each property, by the spherical law of cosines
+    """
+    latitude = math.radians(latitude)
+    cosine = (
+        Value(math.cos(latitude)) * Cos(Radians('latitude')) *
+        Cos(Radians('longitude') - Value(math.radians(longitude))) +
+        Value(math.sin(latitude)) * Sin(Radians('latitude')))
+    # rounding can take the cosine just outside [-1, 1]
+    cosine = Greatest(Value(-1.0), Least(Value(1.0), cosine))
+    return Value(EARTH_RADIUS_KM) * ACos(cosine, output_field=FloatField())
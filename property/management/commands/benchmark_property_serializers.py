@@ -0,0 +1,48 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from property.models import Property
+from property.serializers import PropertySerializer, PropertyValuesSerializer
+from utils.benchmark import (
+    build_property, create_client, summarise, time_calls)
+
+
+class Command(BaseCommand):
+    """
+    Compare what listing property costs with `PropertySerializer` and with
+    `PropertyValuesSerializer`, fetching the rows included, and print the
+    latency summaries and the mean cost per 1,000 rows as JSON, eg:
+        python manage.py benchmark_property_serializers --rows 5000
+    The rows are created inside a rolled back transaction.
+    """
+    help = 'Compare the property serializers used for listings'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000)
+        parser.add_argument('--iterations', type=int, default=20)
+
+    def handle(self, *args, **options):
+        rows, iterations = options['rows'], options['iterations']
+        with transaction.atomic():
+            client = create_client()
+            Property.objects.bulk_create([
+                build_property(client, i) for i in range(rows)])
+            queryset = Property.objects.filter(client=client)
+
+            serializers = {
+                'model': lambda: PropertySerializer(
+                    list(queryset), many=True).data,
+                'values': lambda: PropertyValuesSerializer(
+                    PropertyValuesSerializer.values(queryset)).data,
+            }
+            report = {}
+            for name, serialize in serializers.items():
+                samples = time_calls(serialize, iterations)
+                report[name] = dict(
+                    summarise(samples),
+                    ms_per_1000_rows=round(
+                        sum(samples) / len(samples) * 1000 / rows, 3))
+            transaction.set_rollback(True)
+        self.stdout.write(json.dumps(report, indent=2))
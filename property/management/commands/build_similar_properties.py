@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from property.recommendations import build_similar_properties
+
+
+class Command(BaseCommand):
+    """
+    Rebuild the similar property of every published property now, instead
+    of waiting for the nightly task, eg after loading fixtures:
+        python manage.py build_similar_properties
+    """
+    help = 'Rebuild the similar property of every published property'
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        count = build_similar_properties()
+        if count is None:
+            self.stdout.write('Another rebuild is running, nothing done')
+            return
+        self.stdout.write(
+            f'Wrote {count} similar property in '
+            f'{time.perf_counter() - start:.1f}s')
@@ -0,0 +1,34 @@
+# Generated by Django 2.2.1 on 2026-10-19 13:02
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def remove_duplicates(apps, schema_editor):
+    """
+    Keep the oldest entry of each property in a buyer's list. Entries are
+    removed from lists with a hard delete, so soft deleted ones are dropped
+    too, they would stop the property from being added again.
+    """
+    BuyerPropertyList = apps.get_model('property', 'BuyerPropertyList')
+    BuyerPropertyList.objects.filter(is_deleted=True).delete()
+    kept = BuyerPropertyList.objects.values(
+        'buyer', 'listed_property').annotate(keep=Min('id')).values('keep')
+    BuyerPropertyList.objects.exclude(id__in=kept).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('property', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='buyerpropertylist',
+            constraint=models.UniqueConstraint(
+                fields=('buyer', 'listed_property'),
+                name='unique_buyer_listed_property'),
+        ),
+    ]
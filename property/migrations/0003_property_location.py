@@ -0,0 +1,71 @@
+# Generated by Django 2.2.1 on 2026-10-19 13:05
+
+import json
+
+from django.db import migrations, models
+
+
+def parse_location(coordinates):
+    """
+    Return the (latitude, longitude) of `{'lat': ..., 'lon': ...}`
+    coordinates, which may be numbers or strings, or (None, None) when
+    they aren't a valid location. A copy of `property.geo.parse_location`
+    as it was when this migration was written.
+    """
+    if isinstance(coordinates, str):
+        try:
+            coordinates = json.loads(coordinates)
+        except ValueError:
+            return None, None
+    if not isinstance(coordinates, dict):
+        return None, None
+    try:
+        latitude = float(coordinates.get('lat'))
+        longitude = float(coordinates.get('lon'))
+    except (TypeError, ValueError):
+        return None, None
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return None, None
+    return latitude, longitude
+
+
+def backfill_location(apps, schema_editor):
+    """Copy the location of every property from its JSON coordinates"""
+    Property = apps.get_model('property', 'Property')
+    batch = []
+    for instance in Property.objects.only('coordinates').iterator(
+            chunk_size=2000):
+        instance.latitude, instance.longitude = parse_location(
+            instance.coordinates)
+        if instance.latitude is not None:
+            batch.append(instance)
+        if len(batch) == 2000:
+            Property.objects.bulk_update(batch, ['latitude', 'longitude'])
+            batch = []
+    Property.objects.bulk_update(batch, ['latitude', 'longitude'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('property', '0002_buyerpropertylist_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='latitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='longitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_location, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['latitude', 'longitude'],
+                               name='property_location_idx'),
+        ),
+    ]
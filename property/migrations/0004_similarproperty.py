@@ -0,0 +1,31 @@
+# Generated by Django 2.2.1 on 2026-10-19 13:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('property', '0003_property_location'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarProperty',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('similar_property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_to', to='property.Property')),
+                ('target_property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_properties', to='property.Property')),
+            ],
+            options={
+                'ordering': ['target_property', 'rank'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='similarproperty',
+            constraint=models.UniqueConstraint(fields=('target_property', 'rank'), name='unique_similar_property_rank'),
+        ),
+    ]
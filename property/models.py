@@ -6,6 +6,7 @@ from utils.models import BaseAbstractModel
 from utils.managers import CustomQuerySet, PropertyQuery, PropertyEnquiryQuery
 from authentication.models import User, Client
 from utils.slug_generator import generate_unique_slug
+from property.geo import parse_location
 import uuid
 
 
@@ -13,6 +14,8 @@ import uuid
 # and use it for validators in other areas. There is now only one place
 # to change if you want to alter this attribute.
 MAX_PROPERTY_IMAGE_COUNT = 15
+# how many property a buyer can add to or remove from their list at once
+MAX_BUYER_LIST_BULK_SLUGS = 100
 
 
 class Property(BaseAbstractModel):
@@ -53,10 +56,20 @@ class Property(BaseAbstractModel):
     last_viewed = models.DateTimeField(null=True, blank=True)
     purchase_plan = models.CharField(max_length=1, choices=PURCHASE_CHOICES)
     slug = models.SlugField(max_length=250, unique=True)
+    # `coordinates` as typed columns we can search on, None when the
+    # coordinates aren't a valid location. They are kept in sync on save
+    latitude = models.FloatField(null=True, blank=True, editable=False)
+    longitude = models.FloatField(null=True, blank=True, editable=False)
 
     objects = models.Manager()
     active_objects = PropertyQuery.as_manager()
 
+    class Meta(BaseAbstractModel.Meta):
+        indexes = [
+            models.Index(fields=['latitude', 'longitude'],
+                         name='property_location_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -65,6 +78,7 @@ class Property(BaseAbstractModel):
         if not self.slug:
             self.slug = generate_unique_slug(
                 self, 'slug')
+        self.latitude, self.longitude = parse_location(self.coordinates)
         super().save(*args, **kwargs)
 
 
@@ -146,5 +160,41 @@ class BuyerPropertyList(BaseAbstractModel):
     objects = models.Manager()
     active_objects = CustomQuerySet.as_manager()
 
+    class Meta(BaseAbstractModel.Meta):
+        # a property is in a buyer's list at most once, so many can be
+        # added at once, ignoring the ones already there
+        constraints = [
+            models.UniqueConstraint(
+                fields=['buyer', 'listed_property'],
+                name='unique_buyer_listed_property'),
+        ]
+
     def __str__(self):
         return 'Buyer list for: ' + str(self.buyer.email)
+
+
+class SimilarProperty(models.Model):
+    """
+    The property most similar to a published property, best first. The
+    table is rebuilt every night, see `property.recommendations`, so it
+    has none of the timestamps and soft deletes of the other models.
+    """
+
+    target_property = models.ForeignKey(
+        Property, on_delete=models.CASCADE,
+        related_name='similar_properties')
+    similar_property = models.ForeignKey(
+        Property, on_delete=models.CASCADE, related_name='similar_to')
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ['target_property', 'rank']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['target_property', 'rank'],
+                name='unique_similar_property_rank'),
+        ]
+
+    def __str__(self):
+        return f'{self.similar_property} is like {self.target_property}'
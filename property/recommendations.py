@@ -0,0 +1,198 @@
+"""
+Similar property.
+
+Every published property is compared with its candidates: the published
+property of the same type in the same city closest to it in price. Two
+property are similar when their features (price, lot size, rooms) are
+close, and when the same buyers listed or enquired about both. The
+features make a dense matrix and the buyers a sparse one, so a block of
+property is scored against its candidates with a couple of matrix
+products, and the best `TOP_K` are kept in the `SimilarProperty` table,
+which is loaded with `COPY` as it holds `TOP_K` rows per property. One
+rebuild runs at a time, under a Postgres advisory lock.
+"""
+import io
+from collections import defaultdict
+from itertools import islice
+
+import numpy as np
+from django.contrib.postgres.fields.jsonb import KeyTextTransform
+from django.db import connection, transaction
+from scipy import sparse
+
+from property.models import (
+    BuyerPropertyList, Property, PropertyEnquiry, SimilarProperty)
+from property.signals import property_responses
+
+
+TOP_K = 10
+# the share of the score the features make, co-occurrence makes the rest
+FEATURE_WEIGHT = 0.5
+# bounds the work per property, whatever the size of a city
+MAX_CANDIDATES = 5000
+# the property scored at once, bounds the memory of the score matrices
+BLOCK_SIZE = 256
+NUMERIC_FIELDS = ('price', 'lot_size', 'bedrooms', 'bathrooms', 'garages')
+# the numeric fields compared on a log scale
+LOG_FIELDS = 2
+# the advisory lock held while the table is rebuilt
+REBUILD_LOCK = 470015
+
+
+def listings():
+    """
+    Return the ids, groups (type and city) and numeric fields of the
+    published property. Unknown numbers are NaN.
+    """
+    rows = Property.active_objects.all_published().annotate(
+        city=KeyTextTransform('City', 'address')
+    ).order_by('id').values_list(
+        'id', 'property_type', 'city', *NUMERIC_FIELDS)
+    ids, groups, numbers = [], [], []
+    for row in rows.iterator():
+        ids.append(row[0])
+        groups.append((row[1], (row[2] or '').strip().lower()))
+        numbers.append(row[3:])
+    numbers = np.array(numbers, dtype=np.float64)
+    return (np.array(ids, dtype=np.int64), groups,
+            numbers.reshape(-1, len(NUMERIC_FIELDS)))
+
+
+def feature_matrix(numbers):
+    """
+    Return the numeric fields standardized, unknown numbers taking the
+    mean of their field
+    """
+    features = numbers.copy()
+    features[:, :LOG_FIELDS] = np.log1p(
+        np.clip(features[:, :LOG_FIELDS], 0, None))
+    known = ~np.isnan(features)
+    means = np.where(known, features, 0).sum(axis=0) / \
+        np.maximum(known.sum(axis=0), 1)
+    features = np.where(known, features, means)
+    deviations = features.std(axis=0)
+    deviations[deviations == 0] = 1
+    return ((features - means) / deviations).astype(np.float32)
+
+
+def interaction_matrix(ids):
+    """
+    Return the sparse property x buyer matrix of who listed or enquired
+    about which property, with rows scaled to unit length so their
+    products are cosine similarities
+    """
+    published = Property.active_objects.all_published()
+    pairs = list(BuyerPropertyList.active_objects.all_objects().filter(
+        listed_property__in=published
+    ).values_list('listed_property_id', 'buyer_id')) + list(
+        PropertyEnquiry.active_objects.all_objects().filter(
+            target_property__in=published
+        ).values_list('target_property_id', 'requester_id'))
+    property_ids, buyer_ids = np.array(
+        pairs, dtype=np.int64).reshape(-1, 2).T
+    # property published since we read `ids` are left out
+    known = np.isin(property_ids, ids)
+    rows = np.searchsorted(ids, property_ids[known])
+    buyer_ids = buyer_ids[known]
+    if not len(rows):
+        return sparse.csr_matrix((len(ids), 1), dtype=np.float32)
+
+    buyers, columns = np.unique(buyer_ids, return_inverse=True)
+    matrix = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, columns)),
+        shape=(len(ids), len(buyers)))
+    # a buyer who both listed and enquired counts once
+    matrix.data[:] = 1
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    scale = np.divide(1, norms, out=np.zeros_like(norms), where=norms > 0)
+    return sparse.diags(scale) @ matrix
+
+
+def scores(features, interactions, block, candidates):
+    """Return the similarity of each property of a block to its candidates"""
+    left, right = features[block], features[candidates]
+    distances = (left * left).sum(axis=1)[:, None] + \
+        (right * right).sum(axis=1)[None, :] - 2 * left @ right.T
+    closeness = np.exp(-np.maximum(distances, 0) / (2 * features.shape[1]))
+    cooccurrence = (
+        interactions[block] @ interactions[candidates].T).toarray()
+    return FEATURE_WEIGHT * closeness + (1 - FEATURE_WEIGHT) * cooccurrence
+
+
+def similar_pairs(ids, groups, features, interactions):
+    """
+    Yield `(property id, similar property id, rank, score)` for the
+    `TOP_K` most similar property of each property
+    """
+    members_of = defaultdict(list)
+    for index, group in enumerate(groups):
+        members_of[group].append(index)
+
+    for members in members_of.values():
+        # neighbours in price are neighbours in the group
+        members = np.array(members)
+        members = members[np.argsort(features[members, 0], kind='stable')]
+        for start in range(0, len(members), BLOCK_SIZE):
+            block = members[start:start + BLOCK_SIZE]
+            low = min(start + len(block) // 2 - MAX_CANDIDATES // 2,
+                      len(members) - MAX_CANDIDATES)
+            candidates = members[max(low, 0):max(low, 0) + MAX_CANDIDATES]
+            top_k = min(TOP_K, len(candidates) - 1)
+            if top_k < 1:
+                continue
+
+            block_scores = scores(features, interactions, block, candidates)
+            # a property isn't similar to itself
+            block_scores[block[:, None] == candidates[None, :]] = -np.inf
+            top = np.argpartition(
+                -block_scores, top_k - 1, axis=1)[:, :top_k]
+            top_scores = np.take_along_axis(block_scores, top, axis=1)
+            order = np.argsort(-top_scores, axis=1, kind='stable')
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+            for row, index in enumerate(block):
+                for rank in range(top_k):
+                    yield (ids[index], ids[candidates[top[row, rank]]],
+                           rank + 1, float(top_scores[row, rank]))
+
+
+def copy_pairs(pairs, batch_size):
+    """Load similar property pairs into their table, a batch at a time"""
+    table = connection.ops.quote_name(SimilarProperty._meta.db_table)
+    fields = SimilarProperty._meta
+    columns = ', '.join(
+        connection.ops.quote_name(fields.get_field(name).column)
+        for name in ('target_property', 'similar_property', 'rank', 'score'))
+    count = 0
+    with connection.cursor() as cursor:
+        while True:
+            batch = list(islice(pairs, batch_size))
+            if not batch:
+                return count
+            stream = io.StringIO(''.join(
+                f'{target_id}\t{similar_id}\t{rank}\t{score!r}\n'
+                for target_id, similar_id, rank, score in batch))
+            cursor.copy_expert(
+                f'COPY {table} ({columns}) FROM STDIN', stream)
+            count += len(batch)
+
+
+def build_similar_properties(batch_size=100000):
+    """
+    Rebuild the `SimilarProperty` table in one transaction, so readers
+    see the old table until the new one is complete. Return the number of
+    rows written, or None when another rebuild is running.
+    """
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT pg_try_advisory_xact_lock(%s)', [REBUILD_LOCK])
+            if not cursor.fetchone()[0]:
+                return None
+        ids, groups, numbers = listings()
+        pairs = similar_pairs(
+            ids, groups, feature_matrix(numbers), interaction_matrix(ids))
+        SimilarProperty.objects.all().delete()
+        count = copy_pairs(pairs, batch_size)
+        transaction.on_commit(property_responses.bump)
+    return count
@@ -2,51 +2,79 @@ from property.models import Property, PropertyEnquiry
 from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
 from property.models import Property
 from rest_framework.utils.serializer_helpers import ReturnDict
-import json
+from authentication.models import Client
+from utils.lookups import PROPERTY_TYPE_LABELS, PURCHASE_PLAN_LABELS, display
+from utils.renderers import FastJSONRenderer
 
-from rest_framework.renderers import JSONRenderer
 
-
-class PropertyJSONRenderer(JSONRenderer):
+class PropertyJSONRenderer(FastJSONRenderer):
     """Properly render the responses for property views.
     Note that errors are not handled by the renderer but instead
     handled by default DRF exception handlers."""
-    charset = 'utf-8'
 
     def single_property_format(self, data):
-        """When returning property, fields choices should be returned
-        as human readable values.
-        For example, instead or returning `purchase_plan` as `I`,
-        we should return `Installments`"""
+        """Format a single serialized property. Serialized property carry
+        their codes and client id, so only the client is fetched, and the
+        property itself only when the payload lacks those fields"""
 
         # We should only format responses. Because reqeusts don't have
         # the `id` we skip all requests
-        if data.get('id'):
-            instance = Property.objects.get(pk=data.get('id'))
-            data['property_type'] = instance.get_property_type_display(
-            ).title()
-            data['purchase_plan'] = instance.get_purchase_plan_display(
-            ).title()
+        if not data.get('id'):
+            return
+        if self.is_listed(data):
+            client = Client.objects.select_related('client_admin').get(
+                pk=data['client'])
+        else:
+            instance = Property.objects.select_related(
+                'client__client_admin').get(pk=data.get('id'))
+            data['property_type'] = instance.property_type
+            data['purchase_plan'] = instance.purchase_plan
             client = instance.client
-            client_data = {
-                'id': client.id,
-                'client_name': client.client_name,
-                'phone': client.phone,
-                'email': client.email,
-                'address': client.address,
-                'admin_email': client.client_admin.email,
-                'admin_id': client.client_admin.id
-            }
-            data['client'] = client_data
+        self.format_fields(data, client)
+
+    @staticmethod
+    def is_listed(item):
+        """Tell if a serialized property carries its codes and client id"""
+        return all(item.get(key) for key in (
+            'id', 'client', 'property_type', 'purchase_plan'))
+
+    def property_list_format(self, items):
+        """Format a list of serialized property. Listed property carry
+        their codes and client id, so only their clients are fetched, in
+        one query"""
+        clients = Client.objects.select_related('client_admin').in_bulk(
+            {item['client'] for item in items if self.is_listed(item)})
+        for item in items:
+            if self.is_listed(item):
+                self.format_fields(item, clients[item['client']])
+            else:
+                self.single_property_format(item)
+
+    def format_fields(self, data, client):
+        """When returning property, fields choices should be returned
+        as human readable values.
+        For example, instead or returning `purchase_plan` as `I`,
+        we should return `Installments`"""
+        data['property_type'] = display(
+            PROPERTY_TYPE_LABELS, data['property_type'])
+        data['purchase_plan'] = display(
+            PURCHASE_PLAN_LABELS, data['purchase_plan'])
+        client_data = {
+            'id': client.id,
+            'client_name': client.client_name,
+            'phone': client.phone,
+            'email': client.email,
+            'address': client.address,
+            'admin_email': client.client_admin.email,
+            'admin_id': client.client_admin.id
+        }
+        data['client'] = client_data
 
     def render(self, data, media_type=None, renderer_context=None):
-        if isinstance(data, dict):
-
-            errors = data.get('errors')
-
-            if errors:
-                return super().render(data)
+        if self.is_error(data, renderer_context):
+            return self.render_error(data)
 
+        if isinstance(data, dict):
             if type(data) == ReturnDict or type(data) == dict:
                 # if the response has a `data` key, we pass the actual
                 # payload to be rendered as the values in the `property`.
@@ -55,44 +83,33 @@ class PropertyJSONRenderer(JSONRenderer):
                     if payload:
                         self.single_property_format(payload)
 
-                    return json.dumps(data)
-                except TypeError:
-                    return json.dumps(data)
+                    return self.dumps(data)
+                except (KeyError, TypeError):
+                    return self.dumps(data)
 
             results = data.get('results')
 
             # when getting multiple items, the actual payload is contained
             # in the `results` key because they will be paginated
             if isinstance(results, list):
-                for item in results:
-                    self.single_property_format(item)
-                return json.dumps({
+                self.property_list_format(results)
+                return self.dumps({
                     'data': {'properties': data}
                 })
 
-        return json.dumps({
+        return self.dumps({
             'data': {'property': data}
         })
 
 
-class PropertyEnquiryJSONRenderer(JSONRenderer):
+class PropertyEnquiryJSONRenderer(FastJSONRenderer):
     """
     renderer for property enquiry for properly handling responses and 
     data that is returned
     """
-    charset = "utf-8"
 
     def render(self, data, media_type=None, renderer_context=None):
+        if self.is_error(data, renderer_context):
+            return self.render_error(data)
 
-        if isinstance(data, dict):
-            errors = data.get('errors', None)
-
-            if errors:
-                return super().render(data)
-
-            if 'ErrorDetail' in str(data):
-                return json.dumps({
-                    'errors': data}
-                )
-
-        return json.dumps({"data": {"enquiry": data}})
+        return self.dumps({"data": {"enquiry": data}})
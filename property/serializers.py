@@ -6,8 +6,10 @@ import pytz
 import datetime
 from django.core.validators import ValidationError
 
-from property.models import Property, BuyerPropertyList, PropertyEnquiry
+from property.models import (
+    MAX_BUYER_LIST_BULK_SLUGS, Property, PropertyEnquiry)
 
+from property import clusters, geo
 from property.validators import (
     validate_address, validate_coordinates, validate_image_list, validate_visit_date)
 from utils.media_handlers import CloudinaryResourceHandler
@@ -26,7 +28,7 @@ class PropertySerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Property
-        exclude = ('is_deleted',)
+        exclude = ('is_deleted', 'latitude', 'longitude')
         read_only_fields = ('view_count', 'slug', 'is_deleted',
                             'is_published', 'is_sold', 'sold_at', 'list_date')
 
@@ -90,17 +92,94 @@ class PropertySerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
-class BuyerPropertyListSerializer(serializers.ModelSerializer):
+def value_converter(field):
     """
-    Class handling serialization and deserialization
-    of BuyerPropertyList objects.
+    Return the function that turns a database value into what `field`
+    represents it as. Common field types get a builtin, the others fall
+    back to the field's own `to_representation`.
+    """
+    if isinstance(field, serializers.BooleanField):
+        return bool
+    if isinstance(field, serializers.IntegerField):
+        return int
+    if isinstance(field, serializers.FloatField):
+        return float
+    if isinstance(field, serializers.CharField):
+        return str
+    if isinstance(field, (serializers.JSONField,
+                          serializers.PrimaryKeyRelatedField)):
+        # `.values()` already gives us the decoded JSON and the pk
+        return lambda value: value
+    if isinstance(field, serializers.ListField):
+        child = value_converter(field.child)
+        return lambda value: [
+            None if item is None else child(item) for item in value]
+    return field.to_representation
+
+
+class PropertyValuesSerializer:
+    """
+    Read only serializer for property listings. It gives the same output as
+    `PropertySerializer`, but from `.values()` rows with a converter per
+    field worked out once, instead of building a Property per row and
+    running every serializer field on it.
     """
 
-    property_of_interest = serializers.PrimaryKeyRelatedField(read_only=True)
+    _converters = None
 
-    class Meta:
-        model = BuyerPropertyList
-        exclude = ('created_at', 'updated_at', 'is_deleted', 'id')
+    def __init__(self, rows):
+        self.rows = rows
+
+    @classmethod
+    def converters(cls):
+        """Return (name, source, converter) for each serialized field"""
+        if cls._converters is None:
+            cls._converters = [
+                (name, field.source, value_converter(field))
+                for name, field in PropertySerializer().fields.items()]
+        return cls._converters
+
+    @classmethod
+    def values(cls, queryset):
+        """Return the `.values()` rows of `queryset` this serializer reads"""
+        return queryset.values(
+            *[source for _, source, _ in cls.converters()])
+
+    @property
+    def data(self):
+        converters = self.converters()
+        return [
+            {name: None if row[source] is None else convert(row[source])
+             for name, source, convert in converters}
+            for row in self.rows]
+
+
+class BuyerPropertyListBulkSerializer(serializers.Serializer):
+    """
+    Validate the slugs of the property added to or removed from a buyer's
+    list in one request.
+    """
+
+    slugs = serializers.ListField(
+        child=serializers.SlugField(max_length=255), allow_empty=False,
+        max_length=MAX_BUYER_LIST_BULK_SLUGS)
+
+    def validate_slugs(self, slugs):
+        """Drop repeated slugs, keeping their order"""
+        return list(dict.fromkeys(slugs))
+
+
+class PropertyClusterQuerySerializer(serializers.Serializer):
+    """Validate the viewport and zoom level of a map cluster request"""
+
+    bbox = serializers.CharField()
+    zoom = serializers.IntegerField(min_value=0, max_value=clusters.MAX_ZOOM)
+
+    def validate_bbox(self, bbox):
+        box = geo.parse_bounding_box(bbox.split(','))
+        if box is None:
+            raise serializers.ValidationError(geo.BOUNDING_BOX_ERROR)
+        return box
 
 
 class PropertyEnquirySerializer(serializers.ModelSerializer):
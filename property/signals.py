@@ -0,0 +1,22 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from authentication.models import Client
+from property.models import Property
+from utils.cache import Generation
+
+
+# namespaces the cached property detail, listing and trending responses
+property_responses = Generation('property-responses')
+
+
+@receiver(post_save, sender=Property)
+@receiver(post_delete, sender=Property)
+@receiver(post_save, sender=Client)
+def invalidate_property_responses(sender, instance, **kwargs):
+    """
+    Drop every cached property response when a property is saved, soft
+    deleted or deleted. Property responses embed the client's details, so
+    client changes count too.
+    """
+    property_responses.bump()
@@ -0,0 +1,11 @@
+from celery import shared_task
+
+
+@shared_task
+def build_similar_properties():
+    """
+    Rebuild the similar property of every published property, nightly.
+    NumPy is only imported by the workers that run this.
+    """
+    from property.recommendations import build_similar_properties as build
+    return build()
@@ -1,7 +1,8 @@
 from django.urls import path
 from property.views import (
     CreateAndListPropertyView, PropertyDetailView, BuyerPropertyListView,
-    TrendingPropertyView, DeleteCloudinaryResourceView, PropertyEnquiryDetailView, ListCreateEnquiryAPIView)
+    TrendingPropertyView, DeleteCloudinaryResourceView, PropertyEnquiryDetailView, ListCreateEnquiryAPIView,
+    PropertyClusterView, SimilarPropertyView)
 
 
 urlpatterns = [
@@ -12,8 +13,11 @@ urlpatterns = [
     path('buyer-list/<slug:slug>/', BuyerPropertyListView.as_view(),
          name='modify_buyer_list'),
     path('trending/', TrendingPropertyView.as_view(), name='trending_property'),
+    path('clusters/', PropertyClusterView.as_view(), name='property_clusters'),
     path('<slug:slug>/resource', DeleteCloudinaryResourceView.as_view(),
          name='delete_cloudinary_resource'),
+    path('<slug:slug>/similar/', SimilarPropertyView.as_view(),
+         name='similar_property'),
     path('<slug:slug>/', PropertyDetailView.as_view(), name='single_property'),
     path('enquiries/<property_slug>/create/',
          ListCreateEnquiryAPIView.as_view(), name='post_enquiry'),
@@ -2,6 +2,8 @@ import datetime
 from datetime import datetime as dt
 from django.utils.timezone import now
 
+from django.db import IntegrityError, transaction
+from django.db.models import F
 from django.utils.datastructures import MultiValueDictKeyError
 from rest_framework import (
     generics,
@@ -17,6 +19,8 @@ from rest_framework.permissions import (
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
+from property.clusters import clusters
+from property.facets import cached_facet_counts, filter_signature
 from property.filters import PropertyFilter
 from property.models import (
     BuyerPropertyList,
@@ -28,10 +32,14 @@ from property.renderers import (
     PropertyJSONRenderer,
 )
 from property.serializers import (
-    BuyerPropertyListSerializer,
+    BuyerPropertyListBulkSerializer,
+    PropertyClusterQuerySerializer,
     PropertyEnquirySerializer,
     PropertySerializer,
+    PropertyValuesSerializer,
 )
+from property.signals import property_responses
+from utils.cache import CachedResponseMixin
 from utils.media_handlers import CloudinaryResourceHandler
 from utils.permissions import (
     CanEditProperty,
@@ -40,9 +48,33 @@ from utils.permissions import (
     IsOwner,
     ReadOnly,
 )
+from utils.renderers import FastJSONRenderer
 from utils.tasks import send_email_notification
 
 
+def property_scope(user):
+    """
+    Return which property a user can see, matching the querysets of the
+    property views, so cached responses are shared within a scope only.
+    """
+    if user.is_authenticated and user.role == 'LA':
+        return 'all'
+    if user.is_authenticated:
+        client = user.employer.first()
+        if client:
+            return f'client:{client.pk}'
+    return 'published'
+
+
+class CachedPropertyResponseMixin(CachedResponseMixin):
+    """Cache GET responses per property scope until property changes"""
+
+    response_cache = property_responses
+
+    def get_cache_scope(self, request):
+        return property_scope(request.user)
+
+
 class ListCreateEnquiryAPIView(generics.ListCreateAPIView):
     """
     handle creation of a property enquiry where we
@@ -139,7 +171,8 @@ class ListCreateEnquiryAPIView(generics.ListCreateAPIView):
 Uploader = CloudinaryResourceHandler()
 
 
-class CreateAndListPropertyView(generics.ListCreateAPIView):
+class CreateAndListPropertyView(CachedPropertyResponseMixin,
+                                generics.ListCreateAPIView):
     """Handle requests for creation of property"""
 
     serializer_class = PropertySerializer
@@ -173,6 +206,25 @@ class CreateAndListPropertyView(generics.ListCreateAPIView):
         # other users only see published property
         return Property.active_objects.all_published()
 
+    def list(self, request, *args, **kwargs):
+        """
+        List property from `.values()` rows, see PropertyValuesSerializer.
+        With `?facets=true` the page also carries the facet counts of the
+        search, see `property.facets`.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = PropertyValuesSerializer.values(queryset)
+        page = self.paginate_queryset(rows)
+        if page is None:
+            return Response(PropertyValuesSerializer(rows).data)
+        response = self.get_paginated_response(
+            PropertyValuesSerializer(page).data)
+        if request.query_params.get('facets', '').lower() in ('true', '1'):
+            response.data['facets'] = cached_facet_counts(
+                queryset, filter_signature(
+                    property_scope(request.user), request.query_params))
+        return response
+
     def create(self, request, *args, **kwargs):
         """Create a property listing and save it to the database.
         We pass image and video files to be uploaded to Cloudinary
@@ -261,7 +313,8 @@ class PropertyEnquiryDetailView(generics.RetrieveUpdateDestroyAPIView):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class PropertyDetailView(generics.RetrieveUpdateDestroyAPIView):
+class PropertyDetailView(CachedPropertyResponseMixin,
+                         generics.RetrieveUpdateDestroyAPIView):
     """Handles request to view, update or delete a specific property"""
 
     serializer_class = PropertySerializer
@@ -286,15 +339,28 @@ class PropertyDetailView(generics.RetrieveUpdateDestroyAPIView):
 
         return Property.active_objects.all_published()
 
+    def record_view(self, slug):
+        """
+        Count a view of the property. We update the counters in the
+        database so that views don't count as changes to the property,
+        which would invalidate its cached responses.
+        """
+        last_viewed = now()
+        Property.objects.filter(slug=slug).update(
+            view_count=F('view_count') + 1, last_viewed=last_viewed)
+        return last_viewed
+
+    def cache_hit(self, request, slug):
+        self.record_view(slug)
+
     def retrieve(self, request, slug):
         """we increase the viewcount whenever property
         is successfully retrieved"""
 
         found_property = self.get_object()
 
+        found_property.last_viewed = self.record_view(slug)
         found_property.view_count += 1
-        found_property.last_viewed = now()
-        found_property.save()
         serializer = self.get_serializer(found_property)
         response = {
             'data': {"property": serializer.data}
@@ -395,105 +461,132 @@ class BuyerPropertyListView(generics.ListCreateAPIView):
     """
     Class defining views for retrieving and deleting
     properties inside a buyer's list of properties.
+    Without a slug, POST and DELETE add or remove the property of many
+    slugs at once, eg `{"slugs": ["a-house", "a-flat"]}`.
     """
     permission_classes = (IsBuyer,)
-    serializer_class = BuyerPropertyListSerializer
+    serializer_class = BuyerPropertyListBulkSerializer
     renderer_classes = (PropertyJSONRenderer,)
     lookup_field = 'slug'
 
     def get(self, request):
         """
-        Retrieves a list of properties in current user's list.
-        since we already have the property serializer,
-        we first convert the list to instances of Property
-        model before we can pass it to the PropertySerializer
+        Retrieves a list of properties in current user's list,
+        most recently added first, with one query.
         """
         user = request.user
-        properties = []
-        properties_of_interest = user.property_of_interest.all()
-        for property_of_interest in properties_of_interest:
-            properties.append(property_of_interest.listed_property)
-        serializer = PropertySerializer(properties, many=True)
-        return Response(serializer.data)
-
-    def _get_current_property(self, request, slug):
-        """
-        check if property exists given a slug
-        then return the object and title
-        """
-        try:
-            current_property = Property.active_objects.all_published().get(
-                slug=slug)
-            property_of_interest = BuyerPropertyList.active_objects.filter(
-                buyer=request.user, listed_property=current_property)
-            title = current_property.title
-
-            return {
-                'current_property': current_property,
-                'property': property_of_interest,
-                'title': title
-            }
-
-        except Property.DoesNotExist:
-            return None
+        properties = Property.objects.filter(
+            property__buyer=user).order_by('-property__created_at')
+        rows = PropertyValuesSerializer.values(properties)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(
+                PropertyValuesSerializer(page).data)
+        return Response(PropertyValuesSerializer(rows).data)
+
+    def _get_current_property(self, slug):
+        """Return the published property of a slug, or None"""
+        return Property.active_objects.all_published().filter(
+            slug=slug).first()
+
+    def _get_slugs(self, request):
+        """Return the validated slugs of a bulk request"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data['slugs']
 
-    def create(self, request, slug):
+    def create(self, request, slug=None):
         """
-        Add property to the current buyer's list
-        we first check if the property exists in
-        the current user's list
+        Add property to the current buyer's list. The unique
+        (buyer, listed_property) constraint tells us if it is already there
         """
+        if slug is None:
+            return self._bulk_create(request)
 
-        result = self._get_current_property(request, slug)
-
-        if not result:
+        current_property = self._get_current_property(slug)
+        if current_property is None:
             return Response({
                 "errors": "Property not found"
             }, status=status.HTTP_404_NOT_FOUND)
-        if result['property'].exists():
+        try:
+            with transaction.atomic():
+                BuyerPropertyList.objects.create(
+                    buyer=request.user, listed_property=current_property)
+        except IntegrityError:
             return Response({
-                'errors': result['title'] + ' is already in your buy list'
+                'errors': current_property.title +
+                ' is already in your buy list'
             }, status=status.HTTP_400_BAD_REQUEST)
-        data = {
-            'buyer': request.user.id,
-            'listed_property': result['current_property'].id
-        }
-        serializer = self.get_serializer(data=data)
-        serializer.is_valid(raise_exception=True)
-        serializer.save()
 
-        message = result['title'] + \
+        message = current_property.title + \
             ' has been successfully added to your buy list'
         return Response({
             'data': message
         })
 
-    def delete(self, request, slug):
+    def _bulk_create(self, request):
         """
-        remove a property from current user list
-        this works by first checking whether the
-        property in question does exist in the
-        current user's list
+        Add the property of many slugs to the current buyer's list with one
+        insert, skipping the property already there
         """
-        result = self._get_current_property(request, slug)
-        if not result:
+        slugs = self._get_slugs(request)
+        found = dict(Property.active_objects.all_published().filter(
+            slug__in=slugs).values_list('slug', 'id'))
+        BuyerPropertyList.objects.bulk_create([
+            BuyerPropertyList(buyer=request.user, listed_property_id=pk)
+            for pk in found.values()], ignore_conflicts=True)
+        return Response({
+            'data': {
+                'slugs': [slug for slug in slugs if slug in found],
+                'not_found': [slug for slug in slugs if slug not in found],
+            },
+            'message': 'Your buy list has been successfully updated'
+        })
+
+    def delete(self, request, slug=None):
+        """
+        remove a property from current user list,
+        telling from the deleted rows whether it was there
+        """
+        if slug is None:
+            return self._bulk_delete(request)
+
+        current_property = self._get_current_property(slug)
+        if current_property is None:
             return Response({
                 "errors": "Property not found"
             }, status=status.HTTP_404_NOT_FOUND)
-        if not result['property'].exists():
+        deleted, _ = BuyerPropertyList.objects.filter(
+            buyer=request.user, listed_property=current_property).delete()
+        if not deleted:
             return Response({
-                'errors': result['title'] + ' is not in your buy list'
+                'errors': current_property.title + ' is not in your buy list'
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        result['property'].delete()
-        message = result['title'] + \
+        message = current_property.title + \
             ' has been successfully removed from your buy list'
         return Response({
             'data': message
         })
 
+    def _bulk_delete(self, request):
+        """Remove the property of many slugs from the current buyer's list"""
+        slugs = self._get_slugs(request)
+        listed = dict(BuyerPropertyList.objects.filter(
+            buyer=request.user, listed_property__slug__in=slugs
+        ).values_list('listed_property__slug', 'id'))
+        BuyerPropertyList.objects.filter(id__in=listed.values()).delete()
+        return Response({
+            'data': {
+                'slugs': [slug for slug in slugs if slug in listed],
+                'not_found': [slug for slug in slugs if slug not in listed],
+            },
+            'message': 'Your buy list has been successfully updated'
+        })
+
 
-class TrendingPropertyView(generics.ListAPIView):
+class TrendingPropertyView(CachedPropertyResponseMixin,
+                           generics.ListAPIView):
     """
     Holds getting trending properties based
     on most views and last_viewed time
@@ -501,6 +594,9 @@ class TrendingPropertyView(generics.ListAPIView):
     serializer_class = PropertySerializer
     renderer_classes = (PropertyJSONRenderer,)
     pagination_class = None
+    # views are counted without bumping the generation and the window
+    # moves with the date, so trending is only cached briefly
+    cache_timeout = 5 * 60
 
     def get_queryset(self):
         """
@@ -533,6 +629,55 @@ class TrendingPropertyView(generics.ListAPIView):
         """
         This list method lists the data
         """
-        queryset = self.get_queryset()
-        serializer = self.serializer_class(queryset, many=True)
-        return Response(serializer.data)
+        rows = PropertyValuesSerializer.values(self.get_queryset())
+        return Response(PropertyValuesSerializer(rows).data)
+
+
+class PropertyClusterView(generics.GenericAPIView):
+    """
+    Cluster the published property in a map viewport, eg
+        GET clusters/?bbox=2.6,6.3,4.1,7.0&zoom=9
+    Each cluster holds the count, centroid and price range of the property
+    in one grid cell. Viewports spanning too many cells are answered at a
+    lower zoom level, so the payload stays bounded.
+    """
+    serializer_class = PropertyClusterQuerySerializer
+    renderer_classes = (FastJSONRenderer,)
+
+    def get(self, request):
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        zoom, cells = clusters(
+            Property.active_objects.all_published(),
+            serializer.validated_data['bbox'],
+            serializer.validated_data['zoom'])
+        return Response({
+            'data': {'zoom': zoom, 'clusters': cells}
+        })
+
+
+class SimilarPropertyView(CachedPropertyResponseMixin, generics.ListAPIView):
+    """
+    List the published property most similar to a published property,
+    best first, eg
+        GET <slug>/similar/
+    The similar property are rebuilt nightly, see
+    `property.recommendations`, so this only reads them.
+    """
+    renderer_classes = (PropertyJSONRenderer,)
+    pagination_class = None
+
+    def get_cache_scope(self, request):
+        # only published property are listed, whoever asks
+        return 'published'
+
+    def list(self, request, slug):
+        published = Property.active_objects.all_published()
+        if not published.filter(slug=slug).exists():
+            return Response({
+                "errors": "Property not found"
+            }, status=status.HTTP_404_NOT_FOUND)
+        rows = PropertyValuesSerializer.values(published.filter(
+            similar_to__target_property__slug=slug
+        ).order_by('similar_to__rank'))
+        return Response(PropertyValuesSerializer(rows).data)
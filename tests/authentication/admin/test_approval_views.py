@@ -57,6 +57,18 @@ class TestApprovalStatusChange(TestCase):
         }, format="text/html")
         self.assertEqual(res.status_code, status.HTTP_302_FOUND)
 
+    @patch('utils.tasks.send_email_notification.delay')
+    def test_submit_notes_with_an_unknown_status(self, mock_email):
+        """Test an unknown approval status is not saved."""
+        res = self.client.post(self.approvals_url, {
+            "notes": 'notes is here', "client": 'test@gmail.com',
+            "status": 'archived',
+        }, format="text/html")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.client1.refresh_from_db()
+        self.assertNotEqual(self.client1.approval_status, 'archived')
+        mock_email.assert_not_called()
+
     def test_AddReasonView_status_code(self):
         self.factory = APIRequestFactory()
         url = self.approvals_url+'?client=2&status=approved'
@@ -1,16 +1,21 @@
 """User registration tests."""
-from unittest.mock import patch
+from unittest.mock import ANY, patch
 
+from django.core.cache import cache
+from django.test import override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import force_authenticate
 
 from authentication.models import Client
-from authentication.views import (ClientReviewsView, ReplyView,
-                                  ReviewDetailView, UserReviewsView)
-from tests.factories.authentication_factory import (ClientReviewsFactory,
+from authentication.views import (ClientListView, ClientReviewsView,
+                                  ReplyView, ReviewDetailView,
+                                  UserReviewsView)
+from tests.factories.authentication_factory import (ClientFactory,
+                                                    ClientReviewsFactory,
                                                     ReplyReviewsFactory)
-from tests.utils.utils import TestUtils
+from tests.utils.utils import LOCMEM_CACHES, QueryBudgetMixin, TestUtils
+from utils.cache import SNAPSHOT_TIMEOUT
 
 
 def client_review_url(client_id):
@@ -465,3 +470,158 @@ class ClientCompanyTest(TestUtils):
         force_authenticate(response, user=self.user1)
         res = view(response, client_id=client_id)
         self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_listing_reviews_costs_a_constant_number_of_queries(self):
+        """ reviewers and replies are loaded with the page of reviews """
+
+        reviews = ClientReviewsFactory.create_batch(
+            100, client=self.company1, reviewer=self.user1)
+        for review in reviews:
+            ReplyReviewsFactory.create(review=review, reviewer=self.n_user)
+            ReplyReviewsFactory.create(
+                review=review, reviewer=self.n_user, is_deleted=True)
+        view = ClientReviewsView.as_view()
+        request = self.factory.get(client_review_url(self.company1.pk))
+        force_authenticate(request, user=self.user1)
+        # the client, whether it has reviews, the count, the page and the
+        # replies of the page
+        with self.assertNumQueries(5):
+            res = view(request, client_id=self.company1.pk)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['count'], 100)
+        for review in res.data['results']:
+            self.assertEqual(len(review['replies']), 1)
+
+    def test_reviews_can_be_ordered_and_paged_past_the_end(self):
+        """ the listing filters and pages reviews like any list view """
+
+        first, second = ClientReviewsFactory.create_batch(
+            2, client=self.company1, reviewer=self.user1)
+        view = ClientReviewsView.as_view()
+        request = self.factory.get(
+            client_review_url(self.company1.pk), {'ordering': '-id'})
+        force_authenticate(request, user=self.user1)
+        res = view(request, client_id=self.company1.pk)
+        self.assertEqual(
+            [review['id'] for review in res.data['results']],
+            [second.pk, first.pk])
+
+        request = self.factory.get(
+            client_review_url(self.company1.pk), {'offset': 10})
+        force_authenticate(request, user=self.user1)
+        res = view(request, client_id=self.company1.pk)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'], [])
+
+    def test_listing_a_users_reviews_costs_a_constant_number_of_queries(self):
+        """ a reviewer's history is loaded with its replies in two queries """
+
+        reviews = ClientReviewsFactory.create_batch(20, reviewer=self.user1)
+        for review in reviews:
+            ReplyReviewsFactory.create(review=review, reviewer=self.n_user)
+        view = UserReviewsView.as_view()
+        request = self.factory.get(
+            reverse('auth:user-reviews', args=[self.user1.pk]))
+        force_authenticate(request, user=self.user1)
+        with self.assertNumQueries(2):
+            res = view(request, reviewer_id=self.user1.pk)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data), 21)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ClientDirectoryTest(TestUtils):
+    """Test the cached client directory"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.view = ClientListView.as_view()
+
+    def get_directory(self, **headers):
+        request = self.factory.get(self.clients_list_url, **headers)
+        force_authenticate(request, user=self.user1)
+        return self.view(request)
+
+    def test_directory_is_served_from_the_cache(self):
+        """ the approved clients are only queried once """
+
+        with self.assertNumQueries(1):
+            first = self.get_directory()
+        with self.assertNumQueries(0):
+            second = self.get_directory()
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(first['ETag'], second['ETag'])
+        self.assertIn('Last-Modified', first)
+
+    def test_conditional_get_is_not_modified(self):
+        """ a client with the current ETag gets a 304 """
+
+        etag = self.get_directory()['ETag']
+        with self.assertNumQueries(0):
+            response = self.get_directory(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_approving_a_client_refreshes_the_directory(self):
+        """ approval status transitions invalidate the directory """
+
+        etag = self.get_directory()['ETag']
+        self.company.approval_status = 'approved'
+        self.company.save()
+        response = self.get_directory(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data['count'], 2)
+
+    def test_directory_expires(self):
+        """ a missed invalidation is served for a bounded time only """
+
+        with patch.object(cache, 'set', wraps=cache.set) as cache_set:
+            self.get_directory()
+        cache_set.assert_called_once_with(
+            'client-directory', ANY, SNAPSHOT_TIMEOUT)
+
+    def test_directory_is_paginated(self):
+        """ the directory is split in pages of PAGE_SIZE clients """
+
+        ClientFactory.create_batch(12, approval_status='approved')
+        response = self.get_directory()
+        self.assertEqual(response.data['count'], 13)
+        self.assertEqual(len(response.data['client_companies']), 10)
+        self.assertIsNotNone(response.data['next'])
+
+
+class ClientQueryBudgetTest(QueryBudgetMixin, TestUtils):
+    """Test that client reads don't run queries per client or review"""
+
+    def get(self, view, url, **kwargs):
+        request = self.factory.get(url)
+        force_authenticate(request, user=self.user1)
+        return view.as_view()(request, **kwargs)
+
+    def add_reviews(self, count):
+        for review in ClientReviewsFactory.create_batch(
+                count, client=self.company1, reviewer=self.user1):
+            ReplyReviewsFactory.create(review=review, reviewer=self.n_user)
+
+    def test_client_directory_query_budget(self):
+        self.assertQueryBudget(
+            1, lambda count: ClientFactory.create_batch(
+                count, approval_status='approved'),
+            lambda: self.get(ClientListView, self.clients_list_url))
+
+    def test_client_reviews_query_budget(self):
+        self.assertQueryBudget(
+            4, self.add_reviews,
+            lambda: self.get(
+                ClientReviewsView, client_review_url(self.company1.pk),
+                client_id=self.company1.pk))
+
+    def test_user_reviews_query_budget(self):
+        self.assertQueryBudget(
+            2, self.add_reviews,
+            lambda: self.get(
+                UserReviewsView,
+                reverse('auth:user-reviews', args=[self.user1.pk]),
+                reviewer_id=self.user1.pk))
@@ -1,6 +1,6 @@
 from utils.exception_handler import custom_exception_handler
 from django.test import TestCase
-from rest_framework.exceptions import NotAuthenticated
+from rest_framework.exceptions import NotAuthenticated, PermissionDenied
 from authentication.views import LoginAPIView
 
 
@@ -12,3 +12,11 @@ class AuthResponseTestCase(TestCase):
         response = custom_exception_handler(
             NotAuthenticated({'invalid': 'invalid email and password combination'}), context)
         self.assertEqual(response.status_code, 401)
+
+    def test_error_responses_are_marked(self):
+        context = {"view": None}
+        response = custom_exception_handler(
+            PermissionDenied('Not allowed'), context)
+        self.assertTrue(response.exception)
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.data, {'errors': {'detail': 'Not allowed'}})
@@ -1,7 +1,14 @@
 """Contains user logout tests"""
 
+from datetime import datetime, timedelta
+
+import jwt
+from django.conf import settings
+from django.test import override_settings
+from django.urls import reverse
+
 from .test_base import BaseTest
-from authentication.models import User
+from authentication.models import BlackList, User
 from rest_framework import status
 
 
@@ -45,3 +52,94 @@ class LogoutTest(BaseTest):
             response.data["errors"]['detail'],
             "Session Expired."
         )
+
+    def test_logout_revokes_token_without_blacklisting_it(self):
+        """
+        In the default revocation mode, logging out bumps the user's
+        token version instead of storing the token
+        """
+        token = self.user.token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        self.client.post(self.logout_url)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.token_version, 1)
+        self.assertFalse(BlackList.objects.exists())
+
+        response = self.client.get(self.client_profile)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_user_can_log_in_again_after_logout(self):
+        """
+        Tokens issued after a logout carry the new version and are valid
+        """
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {self.user.token}')
+        self.client.post(self.logout_url)
+
+        self.user.refresh_from_db()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {self.user.token}')
+        response = self.client.get(self.client_profile)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_logout_all_revokes_every_token(self):
+        """
+        Logging out of all devices invalidates every token issued so far
+        """
+        first_token = self.user.token
+        second_token = self.user.token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {first_token}')
+
+        response = self.client.post(reverse('auth:logout-all'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {second_token}')
+        response = self.client.get(self.client_profile)
+        self.assertEqual(
+            response.data["errors"]['detail'],
+            "Session Expired."
+        )
+
+    def test_saving_a_stale_user_keeps_tokens_revoked(self):
+        """
+        Saving a user loaded before a logout doesn't restore the token
+        version the logout bumped
+        """
+        token = self.user.token
+        stale_user = User.objects.get(pk=self.user.pk)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.client.post(reverse('auth:logout-all'))
+
+        stale_user.first_name = 'Renamed'
+        stale_user.save()
+
+        stale_user.refresh_from_db()
+        self.assertEqual(stale_user.first_name, 'Renamed')
+        self.assertEqual(stale_user.token_version, 1)
+        response = self.client.get(self.client_profile)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(JWT_REVOCATION_MODE='blacklist')
+    def test_logout_in_blacklist_mode_only_revokes_current_token(self):
+        """
+        In blacklist mode, only the token used to log out is revoked
+        """
+        first_token = self.user.token
+        token_expiry = datetime.now() + timedelta(hours=1)
+        second_token = jwt.encode({
+            'id': self.user.id,
+            'email': self.user.email,
+            'exp': int(token_expiry.strftime('%s'))
+        }, settings.SECRET_KEY, algorithm='HS256').decode('utf-8')
+
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {first_token}')
+        self.client.post(self.logout_url)
+        self.assertTrue(BlackList.objects.filter(token=first_token).exists())
+
+        response = self.client.get(self.client_profile)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {second_token}')
+        response = self.client.get(self.client_profile)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -97,3 +97,13 @@ class UserRegistrationTest(BaseTest):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn('"LA" is not a valid choice.', str(
             response.data['errors'].get('role')[0]))
+
+    @patch('utils.tasks.send_email_notification.delay')
+    def test_registration_writes_the_user_and_profile_once(self, mock_email):
+        """Registering only inserts the user and their profile."""
+        mock_email.return_value = True
+        # email uniqueness check, user insert and profile insert
+        with self.assertNumQueries(3):
+            response = self.client.post(
+                self.registration_url, self.new_user, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
@@ -67,3 +67,18 @@ class UserEmailVerificationTest(BaseTest):
         response = self.client.get(
             self.verify_url+"?token="+invalid_token, format="json")
         self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+
+    def test_verifying_a_user_does_not_write_their_profile(self):
+        """Verification only updates the user row."""
+        self.user.is_verified = False
+        self.user.save()
+        token = jwt.encode(
+            {"email": self.user.email}, settings.SECRET_KEY,
+            algorithm="HS256").decode("utf-8")
+        # user lookup and the is_verified update
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                self.verify_url + "?token={}~{}".format(token, self.user.id))
+        self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.is_verified)
@@ -0,0 +1,80 @@
+import json
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from authentication.models import User
+
+
+COST = dict(settings.PASSWORD_HASHER_COST, pbkdf2_iterations=1000,
+            argon2_memory_cost=256, argon2_time_cost=1, bcrypt_rounds=4)
+
+
+def hashers_preferring(profile):
+    """
+    Return the hashers setting with `profile` preferred. manage.py swaps in
+    MD5 for speed when testing, so these tests set the hashers explicitly.
+    """
+    preferred = settings.PASSWORD_HASHER_PROFILES[profile]
+    return [preferred] + [
+        hasher for hasher in settings.PASSWORD_HASHER_PROFILES.values()
+        if hasher != preferred]
+
+
+@override_settings(PASSWORD_HASHER_COST=COST,
+                   PASSWORD_HASHERS=hashers_preferring('pbkdf2'))
+class PasswordHasherProfileTest(APITestCase):
+    """Test the configurable password hasher profiles"""
+
+    def setUp(self):
+        self.login_url = reverse('auth:login')
+        self.credentials = {
+            'email': 'hasher@test.com', 'password': 'Password~!Z'}
+        self.user = User.objects.create_user(
+            first_name='Hash', last_name='Er', **self.credentials)
+        self.user.is_verified = True
+        self.user.save()
+
+    def login(self):
+        response = self.client.post(
+            self.login_url, self.credentials, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+
+    def test_new_passwords_use_the_configured_cost(self):
+        """Passwords are hashed with the tuned iteration count"""
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$1000$'))
+
+    def test_login_rehashes_password_when_cost_changes(self):
+        """Logging in upgrades a hash made with an outdated work factor"""
+        with self.settings(
+                PASSWORD_HASHER_COST=dict(COST, pbkdf2_iterations=2000)):
+            self.login()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$2000$'))
+
+    @override_settings(PASSWORD_HASHERS=hashers_preferring('argon2'))
+    def test_login_rehashes_password_when_profile_changes(self):
+        """Logging in upgrades a hash made by a non preferred hasher"""
+        self.login()
+        self.assertTrue(self.user.password.startswith('argon2$'))
+
+        # the upgraded hash is still accepted on the next login
+        self.login()
+
+    def test_login_benchmark_reports_percentiles(self):
+        """The login benchmark reports p50 and p99 per hasher"""
+        out = StringIO()
+        call_command('benchmark_login', iterations=3,
+                     hashers=['pbkdf2', 'bcrypt'], stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual(set(report), {'pbkdf2', 'bcrypt'})
+        self.assertEqual(report['pbkdf2']['count'], 3)
+        self.assertLessEqual(report['pbkdf2']['p50'], report['pbkdf2']['p99'])
+        self.assertFalse(
+            User.objects.filter(email='login-benchmark@landville.test'
+                                ).exists())
@@ -0,0 +1,66 @@
+import datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from authentication.models import Client, User, UserProfile
+from pages.models import Term
+from property.models import Property, PropertyReview
+from tests.factories.property_factory import PropertyFactory
+
+
+class LoadFixturesTest(TestCase):
+    """Test the fixture loading command"""
+
+    def load(self):
+        out = StringIO()
+        call_command('load_fixtures', stdout=out)
+        return out.getvalue()
+
+    def test_fixtures_of_every_app_are_loaded(self):
+        self.assertIn('Installed 15 object(s) from 5 fixture(s)', self.load())
+        self.assertEqual(User.objects.count(), 3)
+        self.assertEqual(Client.objects.count(), 1)
+        self.assertEqual(Property.objects.count(), 5)
+        self.assertEqual(PropertyReview.objects.count(), 5)
+        self.assertEqual(Term.objects.count(), 1)
+
+    def test_loading_is_done_in_bulk(self):
+        # a lookup and an insert or update per model, the timestamps of
+        # the inserted rows, a profile per user, the sequence resets and
+        # the savepoint of the transaction
+        with self.assertNumQueries(24):
+            self.load()
+
+    def test_fixture_values_are_kept(self):
+        self.load()
+        self.assertEqual(Term.objects.get().last_updated_at,
+                         datetime.date(2019, 8, 12))
+        review = PropertyReview.objects.get(pk=1)
+        self.assertEqual(review.created_at.date(), datetime.date(2019, 8, 14))
+
+    def test_post_save_is_sent_for_every_object(self):
+        self.load()
+        self.assertEqual(UserProfile.objects.count(), 3)
+
+    def test_fixtures_can_be_loaded_again(self):
+        self.load()
+        Property.objects.filter(pk=1).update(title='Changed')
+        self.load()
+        self.assertEqual(Property.objects.count(), 5)
+        self.assertNotEqual(Property.objects.get(pk=1).title, 'Changed')
+        self.assertEqual(UserProfile.objects.count(), 3)
+
+    def test_loading_again_keeps_revoked_tokens_revoked(self):
+        self.load()
+        user = User.objects.first()
+        user.revoke_tokens()
+        self.load()
+        user.refresh_from_db()
+        self.assertEqual(user.token_version, 1)
+
+    def test_sequences_are_reset(self):
+        self.load()
+        self.assertGreater(
+            PropertyFactory.create(client=Client.objects.get()).pk, 5)
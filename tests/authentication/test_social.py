@@ -1,6 +1,7 @@
 from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save
 from django.test import TestCase
 from django.urls import reverse
 from rest_framework import status
@@ -135,3 +136,25 @@ class SocialAuthTest(TestCase):
                 format='json')
             self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
             self.assertIn('Invalid or expired token.', str(res.data))
+
+    def test_social_login_creates_the_profile_in_one_write(self):
+        with patch(GOOGLE_VALIDATION) as mock_google_api:
+            mock_google_api.return_value = {
+                "name": "Kelvin Onkundi",
+                "email": "ndemokelvinonkundi@gmail.com",
+                "sub": "102723377587866",
+                "picture": "https://example.com/kelvin.png"
+            }
+            User = get_user_model()
+            receivers = len(post_save._live_receivers(User))
+            # user lookup, user insert and profile insert
+            with self.assertNumQueries(3):
+                res = self.client.post(
+                    GOOGLE_URL, self.google_payload, format='json')
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertEqual(
+                len(post_save._live_receivers(User)), receivers)
+            user = User.objects.get(email="ndemokelvinonkundi@gmail.com")
+            self.assertTrue(user.is_verified)
+            self.assertEqual(
+                user.userprofile.image, "https://example.com/kelvin.png")
@@ -0,0 +1,154 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest.mock import patch
+
+from cryptography import x509
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from google.auth import crypt, jwt
+
+from authentication.socialvalidators import SocialValidation
+from tests.utils.utils import LOCMEM_CACHES
+
+
+KEY_ID = 'stub-key'
+
+
+def signing_material():
+    """Return a private key in PEM and a self signed certificate for it"""
+    key = rsa.generate_private_key(
+        public_exponent=65537, key_size=2048, backend=default_backend())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'stub')])
+    cert = x509.CertificateBuilder().subject_name(name).issuer_name(
+        name).public_key(key.public_key()).serial_number(1).not_valid_before(
+        datetime.utcnow() - timedelta(days=1)).not_valid_after(
+        datetime.utcnow() + timedelta(days=1)).sign(
+        key, hashes.SHA256(), default_backend())
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption())
+    return private_pem, cert.public_bytes(serialization.Encoding.PEM)
+
+
+PRIVATE_KEY, CERTIFICATE = signing_material()
+
+
+class StubProvider(BaseHTTPRequestHandler):
+    """Serves the few provider endpoints our validators call"""
+
+    hits = []
+
+    def do_GET(self):
+        self.hits.append(self.path)
+        if self.path.startswith('/certs'):
+            body = {KEY_ID: CERTIFICATE.decode('utf-8')}
+            self.respond(body, {'Cache-Control': 'public, max-age=600'})
+        elif self.path.startswith('/slow'):
+            time.sleep(0.5)
+            self.respond({})
+        elif '/me' in self.path:
+            self.respond({'id': '1', 'first_name': 'Stub',
+                          'email': 'stub@facebook.test'})
+        elif self.path.startswith('/verify_credentials.json'):
+            self.respond({'id_str': '1', 'name': 'Stub Twitter',
+                          'email': 'stub@twitter.test'})
+        else:
+            self.send_error(404)
+
+    def respond(self, body, headers=None):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        try:
+            self.wfile.write(data)
+        except BrokenPipeError:
+            # the client timed out before we answered
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SocialValidationStubTest(SimpleTestCase):
+    """Test the social validators against local stub providers"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = HTTPServer(('127.0.0.1', 0), StubProvider)
+        cls.url = 'http://127.0.0.1:{}'.format(cls.server.server_port)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        StubProvider.hits.clear()
+
+    def google_token(self):
+        now = int(time.time())
+        signer = crypt.RSASigner.from_string(PRIVATE_KEY, KEY_ID)
+        return jwt.encode(signer, {
+            'iss': 'accounts.google.com', 'sub': '1',
+            'email': 'stub@google.test', 'iat': now, 'exp': now + 600})
+
+    def test_google_certs_are_fetched_once(self):
+        certs_url = self.url + '/certs'
+        with patch('google.oauth2.id_token._GOOGLE_OAUTH2_CERTS_URL',
+                   certs_url):
+            for _ in range(3):
+                id_info = SocialValidation.google_auth_validation(
+                    self.google_token())
+                self.assertEqual(id_info['email'], 'stub@google.test')
+        self.assertEqual(StubProvider.hits, ['/certs'])
+
+    def test_google_token_with_a_bad_signature_is_rejected(self):
+        token = self.google_token()[:-4] + b'AAAA'
+        with patch('google.oauth2.id_token._GOOGLE_OAUTH2_CERTS_URL',
+                   self.url + '/certs'):
+            self.assertIsNone(SocialValidation.google_auth_validation(token))
+
+    @override_settings(SOCIAL_AUTH_TIMEOUT=0.1)
+    def test_unresponsive_google_certs_endpoint_times_out(self):
+        with patch('google.oauth2.id_token._GOOGLE_OAUTH2_CERTS_URL',
+                   self.url + '/slow'):
+            self.assertIsNone(SocialValidation.google_auth_validation(
+                self.google_token()))
+
+    def test_facebook_validation(self):
+        with patch('facebook.FACEBOOK_GRAPH_URL', self.url + '/'):
+            id_info = SocialValidation.facebook_auth_validation('token')
+        self.assertEqual(id_info['email'], 'stub@facebook.test')
+
+    @override_settings(SOCIAL_AUTH_TIMEOUT=0.1)
+    def test_unresponsive_facebook_times_out(self):
+        with patch('facebook.FACEBOOK_GRAPH_URL', self.url + '/slow/'):
+            self.assertIsNone(
+                SocialValidation.facebook_auth_validation('token'))
+
+    def test_twitter_validation(self):
+        url = self.url + '/verify_credentials.json'
+        keys = {'SOCIAL_AUTH_TWITTER_KEY': 'key',
+                'SOCIAL_AUTH_TWITTER_SECRET': 'secret'}
+        with patch.dict(os.environ, keys), \
+                patch.object(SocialValidation, 'TWITTER_VERIFY_URL', url):
+            id_info = SocialValidation.twitter_auth_validation(
+                'token', 'secret')
+        self.assertEqual(id_info['email'], 'stub@twitter.test')
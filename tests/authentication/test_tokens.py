@@ -0,0 +1,70 @@
+import time
+from datetime import timedelta
+from unittest import mock
+
+import jwt
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+
+from authentication.tokens import TokenService
+
+
+class TokenServiceTest(SimpleTestCase):
+    """Test signing and verifying tokens through the token service"""
+
+    def setUp(self):
+        TokenService.clear_cache()
+        self.addCleanup(TokenService.clear_cache)
+
+    def test_expiry_is_a_utc_epoch(self):
+        before = int(time.time())
+        token = TokenService.encode({'email': 'a@b.com'}, timedelta(hours=1))
+        payload = TokenService.decode(token)
+        self.assertEqual(payload['email'], 'a@b.com')
+        self.assertGreaterEqual(payload['exp'], before + 3600)
+        self.assertLessEqual(payload['exp'], int(time.time()) + 3600)
+
+    def test_tokens_signed_with_another_algorithm_are_rejected(self):
+        token = jwt.encode(
+            {'email': 'a@b.com', 'exp': int(time.time()) + 60},
+            settings.SECRET_KEY, algorithm='HS512').decode('utf-8')
+        with self.assertRaises(jwt.InvalidAlgorithmError):
+            TokenService.decode(token)
+
+    def test_verified_tokens_are_not_decoded_again(self):
+        token = TokenService.encode({'id': 1}, timedelta(hours=1))
+        with mock.patch('authentication.tokens.jwt.decode',
+                        wraps=jwt.decode) as decode:
+            first = TokenService.decode(token)
+            second = TokenService.decode(token)
+        self.assertEqual(decode.call_count, 1)
+        self.assertEqual(first, second)
+
+    def test_mutating_a_payload_does_not_change_the_cache(self):
+        token = TokenService.encode({'id': 1}, timedelta(hours=1))
+        TokenService.decode(token)['id'] = 2
+        self.assertEqual(TokenService.decode(token)['id'], 1)
+
+    @override_settings(JWT_LEEWAY=0)
+    def test_cached_tokens_still_expire(self):
+        token = TokenService.encode({'id': 1}, timedelta(seconds=-1))
+        TokenService._remember(
+            (settings.SECRET_KEY, token), jwt.decode(token, verify=False))
+        with self.assertRaises(jwt.ExpiredSignatureError):
+            TokenService.decode(token)
+        self.assertEqual(len(TokenService._verified), 0)
+
+    @override_settings(JWT_LEEWAY=30)
+    def test_small_clock_skew_is_tolerated(self):
+        token = TokenService.encode({'id': 1}, timedelta(seconds=-10))
+        self.assertEqual(TokenService.decode(token)['id'], 1)
+
+    @override_settings(JWT_VERIFIED_CACHE_SIZE=2)
+    def test_cache_evicts_least_recently_used_tokens(self):
+        tokens = [TokenService.encode({'id': pk}, timedelta(hours=1))
+                  for pk in range(3)]
+        for token in tokens:
+            TokenService.decode(token)
+        self.assertEqual(len(TokenService._verified), 2)
+        self.assertNotIn(
+            (settings.SECRET_KEY, tokens[0]), TokenService._verified)
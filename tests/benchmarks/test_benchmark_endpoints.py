@@ -0,0 +1,45 @@
+import json
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from property.models import Property
+from transactions.models import Deposit
+
+
+class BenchmarkEndpointsTest(TestCase):
+    """Test the endpoint benchmark command"""
+
+    def test_benchmark_reports_every_endpoint(self):
+        out = StringIO()
+        call_command('benchmark_endpoints', properties=30, clients=3,
+                     deposits=40, iterations=2, stdout=out)
+        report = json.loads(out.getvalue())
+
+        self.assertEqual(report['seed']['properties'], 30)
+        self.assertEqual(report['seed']['transactions'], 4)
+        self.assertIn('property-detail', report['endpoints'])
+        for name, result in report['endpoints'].items():
+            self.assertEqual(result['status'], 200, name)
+            self.assertEqual(result['count'], 2)
+            self.assertLessEqual(result['p50'], result['p99'])
+            self.assertGreater(result['queries'], 0)
+            self.assertGreater(result['requests_per_second'], 0)
+
+    def test_benchmark_data_is_not_persisted(self):
+        call_command('benchmark_endpoints', properties=5, clients=1,
+                     deposits=5, iterations=1, stdout=StringIO())
+        self.assertFalse(Property.objects.exists())
+        self.assertFalse(Deposit.objects.exists())
+
+    def test_transactions_are_capped_at_one_per_buyer_and_property(self):
+        out = StringIO()
+        call_command('benchmark_endpoints', properties=2, clients=1,
+                     deposits=100, iterations=1, stdout=out)
+        self.assertEqual(json.loads(out.getvalue())['seed']['transactions'], 2)
+
+    def test_too_few_properties_are_refused(self):
+        with self.assertRaises(CommandError):
+            call_command('benchmark_endpoints', properties=1,
+                         stdout=StringIO())
@@ -0,0 +1,26 @@
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from property.models import Property
+from transactions.models import Deposit
+
+
+class BenchmarkRenderersTest(TestCase):
+    """Test the renderer benchmark command"""
+
+    def test_benchmark_reports_every_page_and_renderer(self):
+        out = StringIO()
+        call_command('benchmark_renderers', properties=10, deposits=20,
+                     iterations=2, stdout=out)
+        report = json.loads(out.getvalue())
+
+        self.assertEqual(set(report), {'properties', 'deposits'})
+        for results in report.values():
+            self.assertEqual(set(results), {'json', 'drf', 'fast'})
+            for result in results.values():
+                self.assertEqual(result['count'], 2)
+        self.assertFalse(Property.objects.exists())
+        self.assertFalse(Deposit.objects.exists())
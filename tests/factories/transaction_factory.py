@@ -1,5 +1,4 @@
 import factory
-import json
 from faker import Faker
 from ..factories.property_factory import PropertyFactory
 from .authentication_factory import UserFactory, ClientFactory
@@ -9,17 +8,6 @@ from datetime import datetime
 fake = Faker()
 
 
-class JSONFactory(factory.DictFactory):
-    """
-    Use with factory.Dict to make JSON strings.
-    """
-
-    @classmethod
-    def _generate(cls, create, attrs):
-        obj = super()._generate(create, attrs)
-        return json.dumps(obj)
-
-
 class TransactionFactory(factory.DjangoModelFactory):
     """This class creates fake transactions"""
 
@@ -49,12 +37,11 @@ class DepositFactory(factory.DjangoModelFactory):
     transaction = factory.SubFactory(TransactionFactory)
     references = factory.Dict(
         {
-            'txRef': '{}_LAND{}'.format('TAX', datetime.now()),
+            'txRef': factory.Sequence(lambda n: '{}_LAND{}'.format('TAX', n)),
             'orderRef': '{}_LAND{}'.format('ORDER', datetime.now()),
             'flwRef': '{}_LAND{}'.format('FLW', datetime.now()),
             'raveRef': '{}_LAND{}'.format('RAV', datetime.now()),
-        },
-        dict_factory=JSONFactory)
+        })
     amount = 2453534.54
     description = fake.text()
 
@@ -1,4 +1,12 @@
+import gzip
+import json
+
+from django.core.cache import cache
+from django.test import override_settings
+
+from pages.models import Term
 from tests.pages.test_base import TermsTestBase
+from tests.utils.utils import LOCMEM_CACHES, QueryBudgetMixin
 from rest_framework import status
 
 
@@ -9,3 +17,79 @@ class TestViews(TermsTestBase):
         response = self.client.get(self.terms_url, format="json")
         self.assertEquals(response.status_code, status.HTTP_200_OK)
         self.assertIn("last_updated_at", str(response.data))
+
+
+class TestTermsQueryBudget(QueryBudgetMixin, TermsTestBase):
+    """Test the queries serving the terms cost"""
+
+    def test_compressed_terms_query_budget(self):
+        self.assertQueryBudget(
+            1, lambda n: Term.objects.bulk_create(
+                Term(details=f"Terms {i}") for i in range(n)),
+            lambda: self.client.get(
+                self.terms_url, HTTP_ACCEPT_ENCODING='gzip'))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TestCachedTerms(TermsTestBase):
+    """Test that the terms are served from the cache."""
+
+    def setUp(self):
+        super().setUp()
+        # terms saved on the same day tie, keep only ours
+        Term.objects.exclude(pk=self.terms.pk).delete()
+        cache.clear()
+
+    def test_terms_are_only_queried_once(self):
+        self.client.get(self.terms_url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.terms_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('ETag', response)
+
+    def test_conditional_get_is_not_modified(self):
+        etag = self.client.get(self.terms_url)['ETag']
+        response = self.client.get(self.terms_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_terms_are_served_compressed(self):
+        response = self.client.get(
+            self.terms_url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        terms = json.loads(gzip.decompress(response.content))
+        self.assertEqual(
+            terms['details'], "You are not allowed to masquarade")
+
+    def test_terms_are_not_compressed_for_refused_gzip(self):
+        for encodings in ('gzip;q=0, deflate', 'deflate', '*;q=0',
+                          'gzip; q=0.0'):
+            response = self.client.get(
+                self.terms_url, HTTP_ACCEPT_ENCODING=encodings)
+            self.assertFalse(response.has_header('Content-Encoding'))
+            self.assertEqual(
+                response.data['details'],
+                "You are not allowed to masquarade")
+
+    def test_terms_are_compressed_for_any_encoding(self):
+        response = self.client.get(
+            self.terms_url, HTTP_ACCEPT_ENCODING='deflate;q=1, *;q=0.5')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+    def test_saving_the_terms_invalidates_the_cache(self):
+        etag = self.client.get(self.terms_url)['ETag']
+        self.terms.details = "You may masquarade"
+        self.terms.save()
+        response = self.client.get(self.terms_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['details'], "You may masquarade")
+
+    def test_compressed_terms_have_their_own_etag(self):
+        plain = self.client.get(self.terms_url)
+        compressed = self.client.get(
+            self.terms_url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertNotEqual(plain['ETag'], compressed['ETag'])
+        self.assertEqual(gzip.decompress(compressed.content), plain.content)
+        response = self.client.get(
+            self.terms_url, HTTP_ACCEPT_ENCODING='gzip',
+            HTTP_IF_NONE_MATCH=compressed['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
@@ -0,0 +1,23 @@
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from property.models import Property
+
+
+class BenchmarkPropertySerializersTest(TestCase):
+    """Test the property serializer benchmark command"""
+
+    def test_benchmark_reports_both_serializers(self):
+        out = StringIO()
+        call_command('benchmark_property_serializers', rows=20,
+                     iterations=2, stdout=out)
+        report = json.loads(out.getvalue())
+
+        self.assertEqual(set(report), {'model', 'values'})
+        for result in report.values():
+            self.assertEqual(result['count'], 2)
+            self.assertGreater(result['ms_per_1000_rows'], 0)
+        self.assertFalse(Property.objects.exists())
@@ -0,0 +1,22 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from property.models import SimilarProperty
+from tests.factories.authentication_factory import ClientFactory
+from tests.factories.property_factory import PropertyFactory
+
+
+class BuildSimilarPropertiesTest(TestCase):
+    """Test the command rebuilding the similar property"""
+
+    def test_command_rebuilds_the_similar_property(self):
+        client = ClientFactory.create()
+        for slug in ('first', 'second'):
+            PropertyFactory.create(
+                client=client, slug=slug, is_published=True)
+        out = StringIO()
+        call_command('build_similar_properties', stdout=out)
+        self.assertIn('Wrote 2 similar property', out.getvalue())
+        self.assertEqual(SimilarProperty.objects.count(), 2)
@@ -0,0 +1,92 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from property import clusters
+from property.models import Property
+from tests.factories.authentication_factory import ClientFactory
+from tests.factories.property_factory import PropertyFactory
+from tests.utils.utils import LOCMEM_CACHES
+
+
+class GridTest(TestCase):
+    """Test the map cluster grid"""
+
+    def test_cells_get_smaller_as_we_zoom_in(self):
+        self.assertEqual(clusters.cell_size(0), 90)
+        self.assertEqual(clusters.cell_size(2), 22.5)
+        self.assertEqual(clusters.grid(0), (4, 2))
+
+    def test_points_on_the_edge_of_the_world_are_in_the_last_cell(self):
+        self.assertEqual(clusters.cell_of(180, 90, 0), (3, 1))
+        self.assertEqual(clusters.cell_of(-180, -90, 0), (0, 0))
+
+    def test_viewports_crossing_the_antimeridian(self):
+        cells = clusters.viewport_cells((170, -10, -170, 10), 2)
+        self.assertEqual([column for column, _ in cells[::2]], [15, 0])
+
+    def test_viewport_spans_are_counted_without_listing_cells(self):
+        for box in ((2, 6, 5, 8), (170, -10, -170, 10),
+                    (-180, -90, 180, 90)):
+            columns, rows = clusters.viewport_span(box, 4)
+            self.assertEqual(columns * rows,
+                             len(clusters.viewport_cells(box, 4)))
+
+    def test_large_viewports_are_zoomed_out(self):
+        world = (-180, -90, 180, 90)
+        zoom = clusters.fitting_zoom(world, 18)
+        self.assertLessEqual(
+            len(clusters.viewport_cells(world, zoom)), clusters.MAX_CELLS)
+        self.assertGreater(
+            len(clusters.viewport_cells(world, zoom + 1)),
+            clusters.MAX_CELLS)
+
+
+class ClustersTest(TestCase):
+    """Test aggregating property into map clusters"""
+
+    def setUp(self):
+        client = ClientFactory.create()
+        for lat, lon, price in ((6.45, 3.39, 100), (6.60, 3.35, 300),
+                                (7.37, 3.94, 50), (-33.9, 151.2, 10)):
+            PropertyFactory.create(
+                client=client, is_published=True, price=price,
+                coordinates={'lat': lat, 'lon': lon})
+        PropertyFactory.create(
+            client=client, coordinates={'lat': 6.5, 'lon': 3.4})
+        self.queryset = Property.active_objects.all_published()
+
+    def test_property_are_aggregated_per_cell(self):
+        zoom, cells = clusters.clusters(self.queryset, (2, 6, 5, 8), 7)
+        self.assertEqual(zoom, 7)
+        self.assertEqual(len(cells), 2)
+        lagos = max(cells, key=lambda cell: cell['count'])
+        self.assertEqual(lagos['count'], 2)
+        self.assertAlmostEqual(lagos['latitude'], 6.525)
+        self.assertAlmostEqual(lagos['longitude'], 3.37)
+        self.assertEqual(lagos['min_price'], 100)
+        self.assertEqual(lagos['max_price'], 300)
+        self.assertEqual(lagos['average_price'], 200)
+
+    def test_viewports_aggregate_with_one_query(self):
+        with self.assertNumQueries(1):
+            clusters.clusters(self.queryset, (-180, -90, 180, 90), 3)
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_clusters_are_cached_per_cell(self):
+        cache.clear()
+        clusters.clusters(self.queryset, (2, 6, 5, 8), 7)
+        with self.assertNumQueries(0):
+            _, cells = clusters.clusters(self.queryset, (3, 6, 4, 7), 7)
+        self.assertEqual(sum(cell['count'] for cell in cells), 2)
+
+        # a viewport reaching cells we haven't seen only aggregates those
+        with self.assertNumQueries(1):
+            _, cells = clusters.clusters(self.queryset, (2, 6, 152, 8), 7)
+
+        # it was too large to cache
+        with self.assertNumQueries(1):
+            clusters.clusters(self.queryset, (2, 6, 152, 8), 7)
+
+        Property.objects.filter(price=50).first().soft_delete()
+        _, cells = clusters.clusters(self.queryset, (2, 6, 5, 8), 7)
+        self.assertEqual([cell['count'] for cell in cells], [2])
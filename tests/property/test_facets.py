@@ -0,0 +1,68 @@
+from django.core.cache import cache
+from django.http import QueryDict
+from django.test import TestCase, override_settings
+
+from property import facets
+from property.models import Property
+from tests.factories.authentication_factory import ClientFactory
+from tests.factories.property_factory import PropertyFactory
+from tests.utils.utils import LOCMEM_CACHES
+
+
+class FacetCountsTest(TestCase):
+    """Test counting property per facet"""
+
+    def setUp(self):
+        client = ClientFactory.create()
+        for city, property_type, plan, bedrooms, price in (
+                ('Lagos', 'B', 'I', 3, 500000),
+                ('Lagos', 'B', 'F', 7, 2000000),
+                ('Abuja', 'E', 'F', 3, 75000000),
+                (None, 'B', 'I', 1, 20000000)):
+            PropertyFactory.create(
+                client=client, is_published=True, property_type=property_type,
+                purchase_plan=plan, bedrooms=bedrooms, price=price,
+                address={'City': city} if city else {'Street': 'Broad'})
+        PropertyFactory.create(client=client, address={'City': 'Lagos'})
+        self.queryset = Property.active_objects.all_published()
+
+    def test_every_facet_is_counted_with_one_query(self):
+        with self.assertNumQueries(1):
+            counts = facets.facet_counts(self.queryset)
+        self.assertEqual(counts['property_type'], {'B': 3, 'E': 1})
+        self.assertEqual(counts['purchase_plan'], {'F': 2, 'I': 2})
+        self.assertEqual(counts['bedrooms'], {'1': 1, '3': 2, '5+': 1})
+        # property without a number of bathrooms aren't counted either
+        self.assertEqual(counts['bathrooms'], {})
+        self.assertEqual(list(counts['price']), [
+            '0-1000000', '1000000-5000000', '10000000-50000000',
+            '50000000-'])
+        # property without a city are left out of the city facet
+        self.assertEqual(counts['city'], {'Lagos': 2, 'Abuja': 1})
+
+    def test_counts_follow_the_filters(self):
+        counts = facets.facet_counts(self.queryset.filter(purchase_plan='F'))
+        self.assertEqual(counts['purchase_plan'], {'F': 2})
+        self.assertEqual(counts['city'], {'Abuja': 1, 'Lagos': 1})
+
+    def test_paging_doesnt_change_the_signature(self):
+        first = facets.filter_signature(
+            'published', QueryDict('city=Lagos&limit=10&facets=true'))
+        second = facets.filter_signature(
+            'published', QueryDict('offset=10&city=Lagos&limit=10'))
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, facets.filter_signature(
+            'all', QueryDict('city=Lagos')))
+        self.assertNotEqual(first, facets.filter_signature(
+            'published', QueryDict('city=Abuja')))
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_counts_are_cached_until_property_changes(self):
+        cache.clear()
+        facets.cached_facet_counts(self.queryset, 'signature')
+        with self.assertNumQueries(0):
+            facets.cached_facet_counts(self.queryset, 'signature')
+
+        Property.objects.filter(property_type='E').first().soft_delete()
+        counts = facets.cached_facet_counts(self.queryset, 'signature')
+        self.assertEqual(counts['property_type'], {'B': 3})
@@ -0,0 +1,62 @@
+from django.test import TestCase
+
+from property.geo import (
+    distance_km, parse_location, within_radius, wrap_longitude)
+from property.models import Property
+from tests.factories.authentication_factory import ClientFactory
+from tests.factories.property_factory import PropertyFactory
+
+
+class ParseLocationTest(TestCase):
+    """Test reading a location from JSON coordinates"""
+
+    def test_numbers_and_strings_are_read(self):
+        self.assertEqual(parse_location({'lat': '6.45', 'lon': 3.39}),
+                         (6.45, 3.39))
+        self.assertEqual(parse_location('{"lat": -33.9, "lon": 151.2}'),
+                         (-33.9, 151.2))
+
+    def test_invalid_coordinates_are_no_location(self):
+        for coordinates in ({'lat': '25354.231', 'lon': '45235.0343'},
+                            {'lat': '6.45'}, {'lat': 'north', 'lon': '3'},
+                            'not json', ['6.45', '3.39'], None):
+            self.assertEqual(parse_location(coordinates), (None, None))
+
+    def test_longitudes_wrap_around(self):
+        self.assertEqual(wrap_longitude(190), -170)
+        self.assertEqual(wrap_longitude(-181), 179)
+
+
+class DistanceTest(TestCase):
+    """Test the radius search expressions"""
+
+    def setUp(self):
+        client = ClientFactory.create()
+        # Lagos, Ikeja (~17km), Ibadan (~120km) and a place across the
+        # antimeridian from Fiji
+        for slug, lat, lon in (('lagos', 6.4541, 3.3947),
+                               ('ikeja', 6.6018, 3.3515),
+                               ('ibadan', 7.3775, 3.9470),
+                               ('taveuni', -16.85, -179.95)):
+            PropertyFactory.create(
+                client=client, slug=slug,
+                coordinates={'lat': lat, 'lon': lon})
+
+    def test_distance_is_the_great_circle_distance(self):
+        distances = dict(Property.objects.annotate(
+            distance=distance_km(6.4541, 3.3947)
+        ).values_list('slug', 'distance'))
+        self.assertAlmostEqual(distances['lagos'], 0, places=3)
+        self.assertAlmostEqual(distances['ikeja'], 17, delta=1)
+        self.assertAlmostEqual(distances['ibadan'], 120, delta=3)
+
+    def test_radius_box_holds_the_circle(self):
+        within = Property.objects.filter(
+            within_radius(6.4541, 3.3947, 20)).values_list('slug', flat=True)
+        self.assertEqual(set(within), {'lagos', 'ikeja'})
+
+    def test_radius_box_crosses_the_antimeridian(self):
+        # Suva, Fiji is at 178.44
+        within = Property.objects.filter(
+            within_radius(-16.85, 179.9, 30)).values_list('slug', flat=True)
+        self.assertEqual(list(within), ['taveuni'])
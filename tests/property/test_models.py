@@ -22,6 +22,17 @@ class PropertyModelTest(BaseTest):
         expected_slug = f'wall-street-{property_slug.title.lower()}'
         self.assertEqual(expected_slug, property_slug.slug)
 
+    def test_location_is_kept_in_sync_with_the_coordinates(self):
+        listing = PropertyFactory.create(
+            client=self.client1, coordinates={'lat': '6.45', 'lon': '3.39'})
+        self.assertEqual((listing.latitude, listing.longitude), (6.45, 3.39))
+
+        listing.coordinates = {'lat': '95', 'lon': '3.39'}
+        listing.save()
+        listing.refresh_from_db()
+        self.assertIsNone(listing.latitude)
+        self.assertIsNone(listing.longitude)
+
 
 class PropertyReviewTest(BaseTest):
     """This class defines tests for property reviews"""
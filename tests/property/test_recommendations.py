@@ -0,0 +1,105 @@
+from unittest.mock import patch
+
+import numpy as np
+from django.db import connection
+from django.test import TestCase
+
+from property import recommendations
+from property.models import SimilarProperty
+from tests.factories.authentication_factory import ClientFactory, UserFactory
+from tests.factories.property_factory import (
+    BuyerPropertyListFactory, PropertyEnquiryFactory, PropertyFactory)
+
+
+class FeatureMatrixTest(TestCase):
+    """Test the feature matrix of the similar property"""
+
+    def test_features_are_standardized(self):
+        features = recommendations.feature_matrix(np.array([
+            [100, 10, 1, 2, np.nan],
+            [10000, 10, 3, np.nan, np.nan]]))
+        self.assertEqual(features.dtype, np.float32)
+        np.testing.assert_allclose(features[:, :3], [[-1, 0, -1], [1, 0, 1]])
+        # unknown numbers take the mean, so they don't count
+        np.testing.assert_allclose(features[:, 3:], 0)
+
+
+class SimilarPropertyTest(TestCase):
+    """Test building the similar property"""
+
+    def setUp(self):
+        client = ClientFactory.create()
+
+        def create(slug, price, city='Lagos', **fields):
+            fields.setdefault('is_published', True)
+            return PropertyFactory.create(
+                client=client, slug=slug, price=price, bedrooms=3,
+                address={'City': city}, **fields)
+
+        self.cheap = create('cheap', 100000 / 1.5)
+        self.middle = create('middle', 100000)
+        self.dear = create('dear', 100000 * 1.5)
+        self.mansion = create('mansion', 90000000)
+        create('abuja', 100000, city='Abuja')
+        create('lot', 100000, property_type='E')
+        create('draft', 100000, is_published=False)
+
+    def similar(self, slug):
+        return list(SimilarProperty.objects.filter(
+            target_property__slug=slug
+        ).values_list('similar_property__slug', flat=True))
+
+    def test_similar_property_are_close_in_price(self):
+        count = recommendations.build_similar_properties()
+        self.assertEqual(count, 12)
+        self.assertEqual(self.similar('mansion')[0], 'dear')
+        self.assertEqual(self.similar('cheap'), ['middle', 'dear', 'mansion'])
+        # only published property of the same type and city are compared
+        self.assertEqual(self.similar('abuja'), [])
+        self.assertEqual(self.similar('lot'), [])
+        self.assertEqual(self.similar('draft'), [])
+
+    def test_shared_buyers_make_property_similar(self):
+        for _ in range(2):
+            buyer = UserFactory.create(role='BY')
+            BuyerPropertyListFactory.create(
+                buyer=buyer, listed_property=self.middle)
+            PropertyEnquiryFactory.create(
+                requester=buyer, target_property=self.dear,
+                enquiry_id=buyer.email)
+        recommendations.build_similar_properties()
+        self.assertEqual(self.similar('middle')[0], 'dear')
+        self.assertEqual(self.similar('dear')[0], 'middle')
+
+        # the cheap one is as close in price to the middle one
+        scores = dict(SimilarProperty.objects.filter(
+            target_property=self.middle
+        ).values_list('similar_property__slug', 'score'))
+        self.assertGreater(scores['dear'], scores['cheap'])
+
+    def test_the_table_is_rebuilt(self):
+        recommendations.build_similar_properties()
+        self.mansion.soft_delete()
+        recommendations.build_similar_properties()
+        self.assertFalse(SimilarProperty.objects.filter(
+            similar_property=self.mansion).exists())
+        self.assertEqual(SimilarProperty.objects.count(), 6)
+
+    @patch.object(recommendations, 'MAX_CANDIDATES', 3)
+    def test_candidates_are_the_closest_in_price(self):
+        recommendations.build_similar_properties()
+        self.assertEqual(self.similar('cheap'), ['middle', 'dear'])
+        self.assertNotIn('cheap', self.similar('mansion'))
+
+    def test_one_rebuild_runs_at_a_time(self):
+        # once taken, the lock is held until the test transaction ends, so
+        # another session takes it first
+        other = connection.copy()
+        try:
+            with other.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_lock(%s)',
+                               [recommendations.REBUILD_LOCK])
+            self.assertIsNone(recommendations.build_similar_properties())
+            self.assertFalse(SimilarProperty.objects.exists())
+        finally:
+            other.close()
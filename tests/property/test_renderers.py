@@ -2,8 +2,10 @@ from collections import OrderedDict
 import json
 
 from rest_framework.exceptions import ErrorDetail
+from rest_framework.response import Response
 
 from tests.property import BaseTest
+from property.models import Property
 from property.serializers import PropertySerializer
 from property.renderers import PropertyJSONRenderer
 
@@ -19,11 +21,28 @@ class PropertyJSONRendererTest(BaseTest):
         payload = serializer.data
         payload['id'] = self.property2.pk
         response = {"data": {"property": payload}}
-        rendered_property = self.property_renderer.render(response)
+        rendered_property = self.property_renderer.render(response).decode()
         self.assertIn("property", rendered_property)
         # the fields with choices are rendered with human-readable values
         self.assertIn("Building", rendered_property)
 
+    def test_serialized_property_is_rendered_without_refetching_it(self):
+        # the factory's list date is a datetime, load the saved date
+        self.property2.refresh_from_db()
+        payload = PropertySerializer(self.property2).data
+        with self.assertNumQueries(1) as queries:
+            rendered = json.loads(self.property_renderer.render(
+                {"data": {"property": payload}}))
+        # only the client and its admin are fetched
+        self.assertNotIn(
+            Property._meta.db_table, queries.captured_queries[0]['sql'])
+        rendered_property = rendered['data']['property']
+        self.assertEqual(
+            rendered_property['client']['id'], self.property2.client.pk)
+        self.assertEqual(
+            rendered_property['client']['admin_email'],
+            self.property2.client.client_admin.email)
+
     def test_that_errors_are_rendered_as_expected(self):
         dict_data = {"errors": "This error should be properly rendered"
                      }
@@ -62,7 +81,7 @@ class PropertyJSONRendererTest(BaseTest):
         ordered = OrderedDict(data)
         list_data = [ordered]
         payload = OrderedDict({'results': list_data})
-        rendered_data = self.property_renderer.render(payload)
+        rendered_data = self.property_renderer.render(payload).decode()
         self.assertIn("properties", rendered_data)
         # choices are properly rendered as human-readable values
         self.assertIn("Installments", rendered_data)
@@ -77,7 +96,7 @@ class TestPropertyEnquiryRender(BaseTest):
         enquiry_data = {"message": "hello there"}
         rendered_data = self.enquiry_renderer.render(enquiry_data)
 
-        expected_data = '{"data": {"enquiry": {"message": "hello there"}}}'
+        expected_data = b'{"data":{"enquiry":{"message":"hello there"}}}'
         self.assertEqual(rendered_data, expected_data)
 
     def test_data_as_list_is_rendered_correctly(self):
@@ -85,7 +104,8 @@ class TestPropertyEnquiryRender(BaseTest):
         data_in_list_format = ["this", "might", "get", "a", "list"]
         rendered_data = self.enquiry_renderer.render(data_in_list_format)
 
-        expected_data = '{"data": {"enquiry": ["this", "might", "get", "a", "list"]}}'
+        expected_data = (
+            b'{"data":{"enquiry":["this","might","get","a","list"]}}')
         self.assertEqual(rendered_data, expected_data)
 
     def test_that_an_error_is_rendered_correctly(self):
@@ -97,11 +117,22 @@ class TestPropertyEnquiryRender(BaseTest):
             {"ErrorDetail": [{
                 "phone": "this field is required"}
             ]}]}
-        rendered_data = self.enquiry_renderer.render(Error_detail)
-
-        expected_data = '{"errors": {"message": [{"ErrorDetail": [{"phone": "this field is required"}]}]}}'
+        response = Response(Error_detail, status=400)
+        response.exception = True
+        rendered_data = self.enquiry_renderer.render(
+            Error_detail, renderer_context={'response': response})
+
+        expected_data = (
+            b'{"errors":{"message":[{"ErrorDetail":'
+            b'[{"phone":"this field is required"}]}]}}')
         self.assertEqual(rendered_data, expected_data)
 
+    def test_enquiries_that_mention_errors_are_not_errors(self):
+        enquiry_data = {"message": "I got an ErrorDetail when paying"}
+        rendered_data = json.loads(
+            self.enquiry_renderer.render(enquiry_data))
+        self.assertEqual(rendered_data, {"data": {"enquiry": enquiry_data}})
+
     def test_that_errors_are_rendered_as_expected(self):
         dict_data = {"errors": "This error should be properly rendered"
                      }
@@ -114,5 +145,5 @@ class TestPropertyEnquiryRender(BaseTest):
         data = "Not dictionary"
         renderer = PropertyJSONRenderer()
         rendered_data = renderer.render(data=data)
-        expected_data = '{"data": {"property": "Not dictionary"}}'
+        expected_data = b'{"data":{"property":"Not dictionary"}}'
         self.assertEqual(rendered_data, expected_data)
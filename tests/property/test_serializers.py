@@ -1,7 +1,11 @@
+import json
+from datetime import date
+
 from rest_framework.serializers import ValidationError
 
 from tests.property import BaseTest
-from property.serializers import PropertySerializer
+from property.serializers import (
+    PropertySerializer, PropertyValuesSerializer)
 from property.models import Property
 
 
@@ -132,3 +136,21 @@ class PropertySerializerTest(BaseTest):
         self.assertEqual(len(self.property_no_images.image_others), 2)
         self.assertEqual(self.property_no_images.video,
                          'http://www.videos.com')
+
+
+class PropertyValuesSerializerTest(BaseTest):
+    """Test the `.values()` based property listing serializer"""
+
+    def test_output_is_the_same_as_the_property_serializer(self):
+        self.property2.list_date = date(2019, 5, 1)
+        self.property2.video = None
+        self.property2.image_others = []
+        self.property2.save()
+        queryset = Property.objects.order_by('pk')
+
+        expected = PropertySerializer(list(queryset), many=True).data
+        rows = PropertyValuesSerializer.values(queryset)
+        data = PropertyValuesSerializer(rows).data
+
+        self.assertGreater(len(data), 1)
+        self.assertEqual(json.dumps(data), json.dumps(expected))
@@ -1,8 +1,11 @@
 from tempfile import NamedTemporaryFile
 from unittest.mock import patch, Mock
 import json
+import uuid
 
+from django.core.cache import cache
 from django.urls import reverse
+from django.test import override_settings
 from django.test.client import encode_multipart
 from rest_framework import status
 from rest_framework.test import force_authenticate
@@ -17,8 +20,11 @@ from property.views import (CreateAndListPropertyView,
                             ListCreateEnquiryAPIView,
                             PropertyEnquiryDetailView
                             )
-from property.models import Property, MAX_PROPERTY_IMAGE_COUNT
-from tests.factories.property_factory import PropertyFactory
+from property.models import (
+    BuyerPropertyList, Property, SimilarProperty, MAX_PROPERTY_IMAGE_COUNT)
+from tests.factories.property_factory import (
+    PropertyFactory, PropertyEnquiryFactory)
+from tests.utils.utils import LOCMEM_CACHES, QueryBudgetMixin
 
 
 def get_one_enquiry(enquiry_id):
@@ -939,6 +945,55 @@ class BuyerPropertyListTest(BaseTest):
         self.assertEqual(response.data.get('errors'),
                          self.property4.title + ' is not in your buy list')
 
+    def test_buyer_list_is_paginated(self):
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {self.buyer1.token}')
+        response = self.client.get(self.get_buyer_list_url, {'limit': 5})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        properties = response.json()['data']['properties']
+        self.assertEqual(properties['count'], 1)
+        self.assertEqual(
+            properties['results'][0]['slug'], self.property2.slug)
+        self.assertEqual(properties['results'][0]['client']['id'],
+                         self.client2.pk)
+
+    def test_buyers_can_add_many_property_at_once(self):
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {self.buyer1.token}')
+        new_property = PropertyFactory.create(
+            client=self.client2, is_published=True)
+        slugs = [self.property2.slug, new_property.slug, 'no-such-property',
+                 new_property.slug]
+        response = self.client.post(
+            self.get_buyer_list_url, {'slugs': slugs}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data'], {
+            'slugs': [self.property2.slug, new_property.slug],
+            'not_found': ['no-such-property']})
+        self.assertEqual(
+            self.buyer1.property_of_interest.count(), 2)
+
+    def test_buyers_can_remove_many_property_at_once(self):
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {self.buyer1.token}')
+        response = self.client.delete(
+            self.get_buyer_list_url,
+            {'slugs': [self.property2.slug, self.property4.slug]},
+            format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data'], {
+            'slugs': [self.property2.slug],
+            'not_found': [self.property4.slug]})
+        self.assertFalse(self.buyer1.property_of_interest.exists())
+
+    def test_bulk_requests_need_slugs(self):
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {self.buyer1.token}')
+        response = self.client.post(
+            self.get_buyer_list_url, {'slugs': []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('slugs', response.data['errors'])
+
 
 class TestEnquiryViews(BaseTest):
 
@@ -1197,3 +1252,346 @@ class TestEnquiryViews(BaseTest):
         self.assertIn('we-love-landville-we-love-landville',
                       str(get_response.data))
         self.assertEqual(get_response.status_code, status.HTTP_200_OK)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PropertyResponseCacheTests(BaseTest):
+    """Test the cached property detail, listing and trending responses"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def test_anonymous_listing_is_served_from_the_cache(self):
+        """ a repeated anonymous listing doesn't touch the database """
+
+        first = self.client.get(self.create_list_url)
+        with self.assertNumQueries(0):
+            second = self.client.get(self.create_list_url)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(first['ETag'], second['ETag'])
+
+    def test_conditional_get_is_not_modified(self):
+        """ a client with the current ETag gets a 304 """
+
+        etag = self.client.get(self.create_list_url)['ETag']
+        response = self.client.get(
+            self.create_list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_filters_and_scopes_are_cached_separately(self):
+        """ query params and the user's role are part of the key """
+
+        everything = self.client.get(self.create_list_url)
+        filtered = self.client.get(
+            self.create_list_url, {'title': 'HardCoded Title Block'})
+        self.assertNotEqual(everything.content, filtered.content)
+
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {self.admin.token}')
+        admin = self.client.get(self.create_list_url)
+        self.assertNotEqual(everything['ETag'], admin['ETag'])
+        self.assertGreater(
+            json.loads(admin.content)['data']['properties']['count'],
+            json.loads(everything.content)['data']['properties']['count'])
+
+    def test_saving_a_property_invalidates_the_cache(self):
+        """ the ETag follows the property's updated_at """
+
+        etag = self.client.get(self.create_list_url)['ETag']
+        self.property2.title = 'A New Title'
+        self.property2.save()
+        response = self.client.get(
+            self.create_list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertIn('A New Title', response.content.decode())
+
+    def test_soft_deleting_a_property_invalidates_the_cache(self):
+        """ soft deleted property disappear from cached responses """
+
+        url = reverse('property:single_property', args=[self.property2.slug])
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+        self.property2.soft_delete()
+        self.assertEqual(
+            self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cached_detail_still_counts_views(self):
+        """ every view is counted, even when served from the cache """
+
+        url = reverse('property:single_property', args=[self.property2.slug])
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response['ETag'], etag)
+        self.property2.refresh_from_db()
+        self.assertEqual(self.property2.view_count, 2)
+
+    def test_trending_property_is_cached(self):
+        """ trending property are served from the cache """
+
+        url = reverse('property:trending_property')
+        first = self.client.get(url)
+        with self.assertNumQueries(0):
+            second = self.client.get(url)
+        self.assertEqual(first.content, second.content)
+
+    def test_trending_property_expires(self):
+        """ trending moves with views, which don't invalidate the cache """
+
+        with patch.object(cache, 'set', wraps=cache.set) as cache_set:
+            self.client.get(reverse('property:trending_property'))
+        self.assertEqual(
+            cache_set.call_args[0][2], TrendingPropertyView.cache_timeout)
+        self.assertLessEqual(TrendingPropertyView.cache_timeout, 5 * 60)
+
+    def test_hosts_are_cached_separately(self):
+        """ absolute links of a cached response name the host asked """
+
+        self.client.get(
+            self.create_list_url, {'limit': 1}, HTTP_HOST='one.example')
+        response = self.client.get(
+            self.create_list_url, {'limit': 1}, HTTP_HOST='two.example')
+        next_link = json.loads(
+            response.content)['data']['properties']['next']
+        self.assertTrue(next_link.startswith('http://two.example/'))
+
+    def test_a_cached_response_is_finalized_once(self):
+        """ a miss is rendered without finalizing the response twice """
+
+        finalize_response = CreateAndListPropertyView.finalize_response
+        with patch.object(CreateAndListPropertyView, 'finalize_response',
+                          autospec=True,
+                          side_effect=finalize_response) as finalize:
+            response = self.client.get(self.create_list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(finalize.call_count, 1)
+
+
+class PropertyQueryBudgetTests(QueryBudgetMixin, BaseTest):
+    """Test that property reads don't run a query per property"""
+
+    def add_published_property(self, count):
+        PropertyFactory.create_batch(
+            count, client=self.client2, is_published=True, view_count=1)
+
+    def test_anonymous_listing_query_budget(self):
+        self.assertQueryBudget(
+            3, self.add_published_property,
+            lambda: self.client.get(self.create_list_url))
+
+    def test_client_admin_listing_query_budget(self):
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {self.user2.token}')
+        self.assertQueryBudget(
+            8, self.add_published_property,
+            lambda: self.client.get(self.create_list_url))
+
+    def test_admin_listing_query_budget(self):
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {self.admin.token}')
+        self.assertQueryBudget(
+            5, self.add_published_property,
+            lambda: self.client.get(self.create_list_url))
+
+    def test_trending_property_query_budget(self):
+        self.assertQueryBudget(
+            1, self.add_published_property,
+            lambda: self.client.get(reverse('property:trending_property')))
+
+    def test_enquiries_query_budget(self):
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {self.buyer1.token}')
+
+        def add_enquiries(count):
+            for _ in range(count):
+                PropertyEnquiryFactory.create(
+                    enquiry_id=uuid.uuid4().hex, requester=self.buyer1,
+                    client=self.client2, target_property=self.property2)
+
+        self.assertQueryBudget(
+            3, add_enquiries, lambda: self.client.get(GET_ALL_ENQURIES_URL))
+
+
+class BuyerPropertyListQueryBudgetTests(QueryBudgetMixin, BaseTest):
+    """Test that buyer list requests don't run a query per property"""
+
+    def setUp(self):
+        super().setUp()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {self.buyer1.token}')
+        self.slugs = []
+
+    def add_published_property(self, count):
+        self.slugs.extend(listing.slug for listing in
+                          PropertyFactory.create_batch(
+                              count, client=self.client2, is_published=True))
+
+    def add_listed_property(self, count):
+        self.add_published_property(count)
+        BuyerPropertyList.objects.bulk_create([
+            BuyerPropertyList(buyer=self.buyer1, listed_property=listing)
+            for listing in Property.objects.filter(slug__in=self.slugs)
+        ], ignore_conflicts=True)
+
+    def test_buyer_list_query_budget(self):
+        self.assertQueryBudget(
+            4, self.add_listed_property,
+            lambda: self.client.get(self.get_buyer_list_url))
+
+    def test_bulk_add_query_budget(self):
+        self.assertQueryBudget(
+            3, self.add_published_property,
+            lambda: self.client.post(
+                self.get_buyer_list_url, {'slugs': self.slugs},
+                format='json'))
+
+    def test_bulk_remove_query_budget(self):
+        self.assertQueryBudget(
+            3, self.add_listed_property,
+            lambda: self.client.delete(
+                self.get_buyer_list_url, {'slugs': self.slugs},
+                format='json'))
+
+
+class PropertyLocationSearchTests(BaseTest):
+    """Test searching property by location"""
+
+    def setUp(self):
+        super().setUp()
+        for slug, lat, lon in (('lagos-island', 6.4541, 3.3947),
+                               ('ikeja-gra', 6.6018, 3.3515),
+                               ('ibadan-bodija', 7.3775, 3.9470)):
+            PropertyFactory.create(
+                client=self.client2, slug=slug, is_published=True,
+                coordinates={'lat': lat, 'lon': lon})
+
+    def search(self, **params):
+        response = self.client.get(self.create_list_url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.json()['data']['properties']['results']
+        return [result['slug'] for result in results]
+
+    def test_radius_search_is_ordered_by_distance(self):
+        self.assertEqual(self.search(near='6.60,3.35', radius=20),
+                         ['ikeja-gra', 'lagos-island'])
+        self.assertEqual(self.search(near='6.60,3.35'), ['ikeja-gra'])
+
+    def test_location_search_composes_with_the_other_filters(self):
+        PropertyFactory.create(
+            client=self.client2, slug='ikeja-flat', is_published=True,
+            coordinates={'lat': 6.6, 'lon': 3.35}, price=1)
+        self.assertEqual(
+            self.search(near='6.60,3.35', price_max=10), ['ikeja-flat'])
+
+    def test_bounding_box_search(self):
+        self.assertEqual(
+            set(self.search(bbox='3.3,6.4,3.4,6.7')),
+            {'lagos-island', 'ikeja-gra'})
+
+    def test_invalid_locations_are_rejected(self):
+        for params in ({'near': '6.60'}, {'near': '96,3.35'},
+                       {'bbox': '3.3,6.4,3.4'}, {'bbox': '3.3,6.7,3.4,6.4'},
+                       {'near': '6.60,3.35', 'radius': -1}):
+            response = self.client.get(self.create_list_url, params)
+            self.assertEqual(
+                response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+
+class PropertyClusterViewTests(BaseTest):
+    """Test the map cluster endpoint"""
+
+    def setUp(self):
+        super().setUp()
+        self.clusters_url = reverse('property:property_clusters')
+        PropertyFactory.create(
+            client=self.client2, is_published=True,
+            coordinates={'lat': 6.45, 'lon': 3.39})
+
+    def test_clusters_of_a_viewport(self):
+        response = self.client.get(
+            self.clusters_url, {'bbox': '2,6,5,8', 'zoom': 7})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()['data']
+        self.assertEqual(data['zoom'], 7)
+        self.assertEqual([cell['count'] for cell in data['clusters']], [1])
+
+    def test_invalid_viewports_are_rejected(self):
+        for params in ({'bbox': '2,6,5', 'zoom': 7},
+                       {'bbox': '2,6,5,8', 'zoom': 40}, {'zoom': 7}):
+            response = self.client.get(self.clusters_url, params)
+            self.assertEqual(
+                response.status_code, status.HTTP_400_BAD_REQUEST, params)
+            self.assertIn('errors', response.json())
+
+
+class PropertyFacetsTests(BaseTest):
+    """Test the facet counts of property searches"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def test_facets_are_only_counted_when_asked_for(self):
+        response = self.client.get(self.create_list_url)
+        self.assertNotIn('facets', response.json()['data']['properties'])
+
+        response = self.client.get(self.create_list_url, {'facets': 'true'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        properties = response.json()['data']['properties']
+        self.assertEqual(
+            sum(properties['facets']['property_type'].values()),
+            properties['count'])
+
+    def test_facets_follow_the_filters(self):
+        response = self.client.get(
+            self.create_list_url, {'facets': 'true', 'purchase_plan': 'I'})
+        facets = response.json()['data']['properties']['facets']
+        self.assertEqual(list(facets['purchase_plan']), ['I'])
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_pages_of_a_search_share_its_facets(self):
+        cache.clear()
+        first = self.client.get(
+            self.create_list_url, {'facets': 'true', 'limit': 1})
+        with self.assertNumQueries(3):
+            # the count, the page and its clients, the facets are cached
+            second = self.client.get(
+                self.create_list_url,
+                {'facets': 'true', 'limit': 1, 'offset': 1})
+        self.assertEqual(first.json()['data']['properties']['facets'],
+                         second.json()['data']['properties']['facets'])
+
+
+class SimilarPropertyViewTests(BaseTest):
+    """Test listing the property similar to a property"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.similar_property = PropertyFactory.create(
+            client=self.client2, is_published=True)
+        self.draft = PropertyFactory.create(client=self.client2)
+        for rank, similar in enumerate(
+                (self.draft, self.similar_property, self.property2), 1):
+            SimilarProperty.objects.create(
+                target_property=self.property4, similar_property=similar,
+                rank=rank, score=1 / rank)
+
+    def similar_url(self, slug):
+        return reverse('property:similar_property', args=[slug])
+
+    def test_similar_property_are_listed_best_first(self):
+        response = self.client.get(self.similar_url(self.property4.slug))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # unpublished property are left out
+        self.assertEqual(
+            [item['slug'] for item in response.json()['data']['property']],
+            [self.similar_property.slug, self.property2.slug])
+
+    def test_similar_property_of_unpublished_property_are_not_found(self):
+        for slug in (self.draft.slug, 'no-such-property'):
+            response = self.client.get(self.similar_url(slug))
+            self.assertEqual(
+                response.status_code, status.HTTP_404_NOT_FOUND, slug)
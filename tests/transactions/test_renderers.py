@@ -14,7 +14,9 @@ class PropertyJSONRendererTest(TestCase):
         account_details = {"account_number": "2324342342323242"}
         rendered_data = self.renderer.render(account_details)
 
-        expected_data = '{"data": {"account_detail(s)": {"account_number": "2324342342323242"}}}'
+        expected_data = (
+            b'{"data":{"account_detail(s)":'
+            b'{"account_number":"2324342342323242"}}}')
         self.assertEqual(rendered_data, expected_data)
 
     def test_that_errors_are_rendered_as_expected(self):
@@ -32,5 +34,7 @@ class PropertyJSONRendererTest(TestCase):
         data_in_list_format = ["this", "might", "get", "a", "list"]
         rendered_data = self.renderer.render(data_in_list_format)
 
-        expected_data = '{"data": {"account_detail(s)": ["this", "might", "get", "a", "list"]}}'
+        expected_data = (
+            b'{"data":{"account_detail(s)":'
+            b'["this","might","get","a","list"]}}')
         self.assertEqual(rendered_data, expected_data)
@@ -1,6 +1,15 @@
 from datetime import datetime
+from itertools import count
+from threading import Barrier, Thread
+
+from django.db import connection
+from django.test import TransactionTestCase
+
 from tests.transactions.test_models import TransactionTest, SavingsTest
+from transactions.models import Deposit, Savings, Transaction
 from transactions.transaction_utils import (save_deposit,)
+from ..factories.authentication_factory import ClientFactory, UserFactory
+from ..factories.property_factory import PropertyFactory
 from ..factories.transaction_factory import TransactionFactory, SavingsFactory
 
 references = {
@@ -11,6 +20,11 @@ references = {
 }
 
 
+def payment_references(number):
+    """Return the references of another payment"""
+    return dict(references, txRef='{}_LAND{}'.format('TAX', number))
+
+
 class TestDepositSavingUtils(SavingsTest):
     amount = 1000
 
@@ -38,6 +52,20 @@ class TestDepositSavingUtils(SavingsTest):
         self.assertIsNotNone(deposit)
         self.assertEqual(new_savings.balance, self.amount)
 
+    def test_depositing_into_deleted_savings_restores_them(self):
+        """
+        test if a deposit into soft deleted savings makes them visible again
+        """
+        old_saving = SavingsFactory(owner=self.user1, balance=500)
+        old_saving.soft_delete()
+        deposit, new_savings = save_deposit('Saving', references,
+                                            self.amount, self.user1)
+        self.assertFalse(new_savings.is_deleted)
+        self.assertEqual(new_savings.balance, 500 + self.amount)
+        self.assertEqual(
+            Savings.active_objects.all_objects().get(owner=self.user1).pk,
+            old_saving.pk)
+
 
 class TestDepositTransactionUtils(TransactionTest):
     amount = 1000
@@ -70,3 +98,107 @@ class TestDepositTransactionUtils(TransactionTest):
                                                 self.property1, 'test test')
         self.assertIsNotNone(deposit)
         self.assertEqual(new_transaction.amount_paid, self.amount)
+
+    def test_posting_a_deposit_is_one_statement(self):
+        """
+        test if the parent is incremented and the deposit inserted with one
+        query, which returns the new balance
+        """
+        save_deposit('Buying', references, 100, self.buyer1, self.property1)
+        with self.assertNumQueries(1):
+            deposit, transaction = save_deposit(
+                'Buying', payment_references(2), 50, self.buyer1,
+                self.property1)
+        self.assertEqual(transaction.amount_paid, 150)
+        self.assertEqual(deposit.transaction_id, transaction.pk)
+        self.assertEqual(Transaction.objects.get().amount_paid, 150)
+
+    def test_references_are_stored_as_json(self):
+        """
+        test if the references are stored as a JSON object, and their txRef
+        in its own column
+        """
+        save_deposit('Buying', references, 100, self.buyer1, self.property1)
+        deposit = Deposit.objects.get()
+        self.assertEqual(deposit.references, references)
+        self.assertEqual(deposit.tx_ref, references['txRef'])
+
+    def test_a_payment_is_deposited_once(self):
+        """
+        test if a repeated callback returns the deposit already made
+        instead of making another one
+        """
+        first, _ = save_deposit(
+            'Buying', references, 100, self.buyer1, self.property1)
+        # verification responses spell the reference txref
+        repeat = {'txref': references['txRef'], 'flwref': 'FLW'}
+        deposit, transaction = save_deposit(
+            'Buying', repeat, 100, self.buyer1, self.property1)
+        self.assertEqual(deposit.pk, first.pk)
+        self.assertEqual(transaction.amount_paid, 100)
+        self.assertEqual(Deposit.objects.count(), 1)
+        self.assertEqual(Transaction.objects.get().amount_paid, 100)
+
+
+class TestConcurrentDeposits(TransactionTestCase):
+    """Test that deposits posted at the same time don't lose updates"""
+    threads = 8
+    deposits_per_thread = 5
+
+    def post_in_parallel(self, post):
+        barrier = Barrier(self.threads)
+        errors = []
+        payments = count()
+
+        def run():
+            try:
+                barrier.wait()
+                for _ in range(self.deposits_per_thread):
+                    post(payment_references(next(payments)))
+            except Exception as error:  # pragma: no cover
+                errors.append(error)
+            finally:
+                connection.close()
+
+        threads = [Thread(target=run) for _ in range(self.threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+    def test_concurrent_savings_deposits(self):
+        """
+        test if concurrent deposits into a saving that doesn't exist yet
+        create it once and add up
+        """
+        user = UserFactory.create()
+        self.post_in_parallel(
+            lambda references: save_deposit('Saving', references, 10, user))
+        self.assertEqual(Savings.objects.get(owner=user).balance, 400)
+        self.assertEqual(Deposit.objects.count(), 40)
+
+    def test_concurrent_transaction_deposits(self):
+        """
+        test if concurrent deposits for the same property add up in one
+        transaction
+        """
+        buyer = UserFactory.create()
+        target_property = PropertyFactory.create(
+            client=ClientFactory.create(client_admin=UserFactory.create()))
+        self.post_in_parallel(lambda references: save_deposit(
+            'Buying', references, 10, buyer, target_property))
+        transaction = Transaction.objects.get()
+        self.assertEqual(transaction.amount_paid, 400)
+        self.assertEqual(transaction.deposits.count(), 40)
+
+    def test_concurrent_repeated_callbacks(self):
+        """
+        test if a payment posted by callbacks at the same time is deposited
+        once
+        """
+        user = UserFactory.create()
+        self.post_in_parallel(
+            lambda _: save_deposit('Saving', references, 10, user))
+        self.assertEqual(Savings.objects.get(owner=user).balance, 10)
+        self.assertEqual(Deposit.objects.count(), 1)
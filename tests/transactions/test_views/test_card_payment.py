@@ -493,6 +493,28 @@ class CardPaymentTest(BaseTest):
             resp = self.client.get(self.foreign_validate_url)
             self.assertEqual(resp.status_code, 302)
 
+    @patch('transactions.transaction_services'
+           '.TransactionServices.verify_payment')
+    def test_validate_foreign_payment_for_unknown_property(self, mock_verify):
+        """
+        Test validating an international payment for a property that doesn't
+        exist answers with a 404.
+        """
+        self.purpose_meta = [{'metaname': 'purpose', 'metavalue': 'Buying'},
+                             {'metaname': 'property_id', 'metavalue': 0}]
+        mock_verify.return_value = {
+            'status': 'success',
+            'data': {
+                'meta': [self.not_save_card_meta] + self.purpose_meta,
+                'vbvmessage': 'somemessage',
+                'status': 'successful',
+                'custemail': 'email@email.com',
+            }
+        }
+
+        resp = self.client.get(self.foreign_validate_url)
+        self.assertEqual(resp.status_code, 404)
+
     @patch('transactions.transaction_services'
            '.TransactionServices.verify_payment')
     def test_validate_foreign_payment_with_card_save_failed(self, mock_verify):
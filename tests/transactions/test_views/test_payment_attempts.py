@@ -0,0 +1,190 @@
+"""Module of tests for the asynchronous verification of card payments."""
+import uuid
+from unittest.mock import patch
+
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.views import status
+
+from tests.factories.authentication_factory import UserFactory
+from tests.factories.property_factory import PropertyFactory
+from tests.transactions import BaseTest
+from transactions.models import Deposit, PaymentAttempt
+from transactions.tasks import verify_payment_attempt
+
+
+def attempt_url(attempt_id):
+    return reverse('transactions:payment_attempt', args=[attempt_id])
+
+
+def verified_payment(meta=None, tx_ref='sampletxref'):
+    return {
+        'status': 'success',
+        'message': 'Payment verified',
+        'data': {
+            'txref': tx_ref,
+            'flwref': 'FLW-MOCK-ref',
+            'amount': 5000,
+            'meta': meta or [{'metaname': 'save_card', 'metavalue': 0}],
+            'vbvmessage': 'Approved',
+            'status': 'successful',
+            'custemail': 'email@email.com',
+        }
+    }
+
+
+@override_settings(PAYMENT_VERIFICATION_ASYNC=True)
+class PaymentAttemptTest(BaseTest):
+    def setUp(self):
+        super().setUp()
+        UserFactory.create(email='email@email.com')
+        self.property = PropertyFactory.create(client=self.client1)
+        self.card_validate_url = reverse('transactions:validate_card')
+        self.foreign_validate_url = reverse(
+            'transactions:validation_response'
+        ) + '?response={"txRef": "sometxref"}'  # noqa
+        self.validation_data = {
+            'flwRef': 'FLW-MOCK-c189daaf7570c7522adaccd9e2f752ce',
+            'otp': 12345,
+            'purpose': 'Buying',
+            'property_id': self.property.id,
+        }
+        self.validated_payment = {
+            'message': 'Charge Complete',
+            'status_code': 200,
+            'data': {
+                'tx': {
+                    'txRef': 'sampletxref',
+                    'flwRef': 'FLW-MOCK-ref',
+                    'amount': 5000
+                }
+            }
+        }
+
+    @patch('transactions.views.verify_payment_attempt.delay')
+    def test_validating_a_payment_enqueues_its_verification(self, mock_delay):
+        resp = self.client.post(self.card_validate_url, self.validation_data)
+
+        self.assertEqual(resp.status_code, status.HTTP_202_ACCEPTED)
+        attempt = PaymentAttempt.objects.get(
+            attempt_id=resp.json()['attempt_id'])
+        self.assertEqual(attempt.status, 'P')
+        self.assertEqual(attempt.purpose, 'Buying')
+        self.assertEqual(attempt.target_property, self.property)
+        self.assertEqual(attempt.otp, '12345')
+        # the OTP stays out of the broker
+        mock_delay.assert_called_once_with(attempt.pk)
+
+    @patch('transactions.views.verify_payment_attempt.delay')
+    def test_polling_a_pending_payment(self, mock_delay):
+        attempt_id = self.client.post(
+            self.card_validate_url, self.validation_data).json()['attempt_id']
+
+        resp = self.client.get(attempt_url(attempt_id))
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.json()['data']['status'], 'PENDING')
+        self.assertEqual(resp.json()['data']['attempt_id'], attempt_id)
+        self.assertEqual(resp['Retry-After'], '2')
+
+    @patch('transactions.transaction_services'
+           '.TransactionServices.verify_payment')
+    @patch('transactions.transaction_services'
+           '.TransactionServices.validate_card_payment')
+    def test_verifying_a_payment_deposits_it(self, mock_validate,
+                                             mock_verify):
+        mock_validate.return_value = self.validated_payment
+        mock_verify.return_value = verified_payment()
+        attempt = PaymentAttempt.objects.create(
+            purpose='Buying', target_property=self.property,
+            flw_ref='FLW-MOCK-ref', otp='12345')
+
+        self.assertTrue(verify_payment_attempt(attempt.pk))
+
+        mock_validate.assert_called_once_with('FLW-MOCK-ref', '12345')
+        attempt.refresh_from_db()
+        self.assertEqual(attempt.otp, '')
+        deposit = Deposit.objects.get(tx_ref='sampletxref')
+        self.assertEqual(deposit.transaction.target_property, self.property)
+        resp = self.client.get(attempt_url(attempt.attempt_id))
+        self.assertEqual(resp.json()['data']['status'], 'SUCCESSFUL')
+        self.assertEqual(resp.json()['data']['message'], 'Charge Complete')
+        self.assertNotIn('Retry-After', resp)
+
+    @patch('transactions.transaction_services'
+           '.TransactionServices.validate_card_payment')
+    def test_a_payment_failing_validation_fails(self, mock_validate):
+        mock_validate.return_value = {
+            'status': 'error', 'message': 'Wrong OTP'}
+        attempt = PaymentAttempt.objects.create(
+            purpose='Saving', flw_ref='FLW-MOCK-ref', otp='1')
+
+        self.assertFalse(verify_payment_attempt(attempt.pk))
+
+        attempt.refresh_from_db()
+        self.assertEqual(attempt.status, 'F')
+        self.assertEqual(attempt.message, 'Wrong OTP')
+        self.assertEqual(attempt.otp, '')
+        self.assertFalse(Deposit.objects.exists())
+
+    @patch('transactions.transaction_services'
+           '.TransactionServices.verify_payment')
+    def test_a_payment_failing_to_verify_is_marked_failed(self, mock_verify):
+        mock_verify.side_effect = ConnectionError
+        attempt = PaymentAttempt.objects.create(tx_ref='sometxref')
+
+        with self.assertRaises(ConnectionError):
+            verify_payment_attempt(attempt.pk)
+
+        attempt.refresh_from_db()
+        self.assertEqual(attempt.status, 'F')
+        self.assertTrue(attempt.message)
+
+    @patch('transactions.views.verify_payment_attempt.delay')
+    def test_foreign_card_response_redirects_with_the_attempt(
+            self, mock_delay):
+        resp = self.client.get(self.foreign_validate_url)
+
+        self.assertEqual(resp.status_code, status.HTTP_302_FOUND)
+        attempt = PaymentAttempt.objects.get(tx_ref='sometxref')
+        self.assertIn(f'attempt_id={attempt.attempt_id}', resp.url)
+        self.assertIn('status=pending', resp.url)
+        mock_delay.assert_called_once_with(attempt.pk)
+
+    @patch('transactions.transaction_services'
+           '.TransactionServices.verify_payment')
+    def test_verifying_a_foreign_card_payment(self, mock_verify):
+        mock_verify.return_value = verified_payment(meta=[
+            {'metaname': 'save_card', 'metavalue': 0},
+            {'metaname': 'purpose', 'metavalue': 'Saving'},
+            {'metaname': 'property_id', 'metavalue': None}])
+        attempt = PaymentAttempt.objects.create(tx_ref='sampletxref')
+
+        self.assertTrue(verify_payment_attempt(attempt.pk))
+
+        mock_verify.assert_called_once_with('sampletxref')
+        attempt.refresh_from_db()
+        self.assertEqual(attempt.status, 'S')
+        self.assertEqual(attempt.message, 'Approved')
+        self.assertTrue(Deposit.objects.filter(tx_ref='sampletxref').exists())
+
+    @patch('transactions.transaction_services'
+           '.TransactionServices.verify_payment')
+    def test_a_payment_for_an_unknown_property_fails(self, mock_verify):
+        mock_verify.return_value = verified_payment(meta=[
+            {'metaname': 'save_card', 'metavalue': 0},
+            {'metaname': 'purpose', 'metavalue': 'Buying'},
+            {'metaname': 'property_id', 'metavalue': 0}])
+        attempt = PaymentAttempt.objects.create(tx_ref='sampletxref')
+
+        self.assertFalse(verify_payment_attempt(attempt.pk))
+
+        attempt.refresh_from_db()
+        self.assertEqual(attempt.status, 'F')
+        self.assertEqual(attempt.message,
+                         'The property paid for does not exist')
+        self.assertFalse(Deposit.objects.exists())
+
+    def test_polling_an_unknown_payment(self):
+        resp = self.client.get(attempt_url(uuid.uuid4()))
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
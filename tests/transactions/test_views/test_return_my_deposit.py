@@ -1,5 +1,4 @@
 """Module of tests for views of transactions app."""
-import json
 from tests.transactions import BaseTest
 from django.urls import reverse
 from rest_framework.test import force_authenticate
@@ -7,7 +6,9 @@ from rest_framework.views import status
 from transactions.serializers import DepositSerializer
 from transactions.models import Deposit
 from transactions.views import RetrieveDepositsApiView
-from tests.factories.transaction_factory import SavingsFactory
+from tests.factories.transaction_factory import (
+    SavingsFactory, DepositFactory, TransactionFactory)
+from tests.utils.utils import QueryBudgetMixin
 from transactions.transaction_utils import save_deposit
 from ..test_utils import references
 from django.db.models import Q
@@ -43,8 +44,7 @@ class TestReturnAllMyDeposit(BaseTest):
                          float(deposit.amount))
         self.assertEqual(savings.owner.id, self.user4.id)
         self.assertIsInstance(results[0].get('references'), dict)
-        self.assertEqual(results[0].get('references'),
-                         json.loads(deposit.references))
+        self.assertEqual(results[0].get('references'), deposit.references)
         self.assertIsNotNone(results[0].get('created_at'))
         self.assertEqual(savings.balance + amount_to_save,
                          float(saving_updated.balance))
@@ -90,3 +90,33 @@ class TestReturnAllMyDeposit(BaseTest):
         results = response.data.get('results')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(results, serialized.data)
+
+
+class TestDepositsQueryBudget(QueryBudgetMixin, BaseTest):
+    """Test that listing deposits doesn't run queries per deposit"""
+
+    def get_deposits(self, user):
+        request = self.factory.get(reverse("transactions:my_deposit"))
+        force_authenticate(request, user=user)
+        return RetrieveDepositsApiView.as_view()(request)
+
+    def test_buyer_deposits_query_budget(self):
+        savings = SavingsFactory.create(owner=self.user4)
+        transaction = TransactionFactory.create(
+            target_property=self.property1, buyer=self.user4)
+
+        def add_deposits(count):
+            DepositFactory.create_batch(count, transaction=transaction)
+            DepositFactory.create_batch(
+                count, transaction=None, account=savings)
+
+        self.assertQueryBudget(
+            2, add_deposits, lambda: self.get_deposits(self.user4))
+
+    def test_client_deposits_query_budget(self):
+        transaction = TransactionFactory.create(
+            target_property=self.property1, buyer=self.user4)
+        self.assertQueryBudget(
+            3, lambda count: DepositFactory.create_batch(
+                count, transaction=transaction),
+            lambda: self.get_deposits(self.user1))
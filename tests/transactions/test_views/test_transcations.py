@@ -2,7 +2,9 @@
 from tests.transactions import BaseTest
 from transactions.views import RetreiveTransactionsAPIView
 from rest_framework.test import force_authenticate
+from tests.factories.property_factory import PropertyFactory
 from tests.factories.transaction_factory import TransactionFactory
+from tests.utils.utils import QueryBudgetMixin
 from . import USER_TRANSACTIONS_URL
 
 
@@ -91,3 +93,35 @@ class TestTransactions(BaseTest):
         response = view(request)
         self.assertEqual(response.data['errors'], "No transactions available")
         self.assertEqual(response.status_code, 404)
+
+
+class TestTransactionsQueryBudget(QueryBudgetMixin, BaseTest):
+    """Test that listing transactions doesn't run queries per property"""
+
+    def add_transactions(self, count):
+        for target_property in PropertyFactory.create_batch(
+                count, client=self.client1):
+            # a buyer has one transaction per property
+            TransactionFactory.create(
+                target_property=target_property, buyer=self.user4)
+            TransactionFactory.create(target_property=target_property)
+
+    def get_transactions(self, user):
+        request = self.factory.get(USER_TRANSACTIONS_URL)
+        force_authenticate(request, user=user)
+        return RetreiveTransactionsAPIView.as_view()(request)
+
+    def test_buyer_transactions_query_budget(self):
+        self.assertQueryBudget(
+            2, self.add_transactions,
+            lambda: self.get_transactions(self.user4))
+
+    def test_client_transactions_query_budget(self):
+        self.assertQueryBudget(
+            3, self.add_transactions,
+            lambda: self.get_transactions(self.user1))
+
+    def test_landville_transactions_query_budget(self):
+        self.assertQueryBudget(
+            2, self.add_transactions,
+            lambda: self.get_transactions(self.user5))
@@ -0,0 +1,32 @@
+from django.test import SimpleTestCase
+
+from utils.benchmark import (
+    percentile, requests_per_second, summarise, time_calls)
+
+
+class BenchmarkHelpersTest(SimpleTestCase):
+    """Test the helpers shared by the benchmark commands"""
+
+    def test_percentile_uses_nearest_rank(self):
+        samples = list(range(1, 101))
+        self.assertEqual(percentile(samples, 50), 50)
+        self.assertEqual(percentile(samples, 99), 99)
+        self.assertEqual(percentile([7], 99), 7)
+        self.assertIsNone(percentile([], 50))
+
+    def test_summarise_reports_latency_percentiles(self):
+        summary = summarise([3, 1, 2])
+        self.assertEqual(summary['count'], 3)
+        self.assertEqual(summary['p50'], 2)
+        self.assertEqual(summary['p99'], 3)
+        self.assertEqual(summarise([]), {'count': 0})
+
+    def test_time_calls_returns_one_sample_per_call(self):
+        calls = []
+        samples = time_calls(lambda: calls.append(1), 4)
+        self.assertEqual(len(samples), 4)
+        self.assertEqual(len(calls), 4)
+
+    def test_requests_per_second_is_derived_from_the_samples(self):
+        self.assertEqual(requests_per_second([250, 250]), 4)
+        self.assertIsNone(requests_per_second([]))
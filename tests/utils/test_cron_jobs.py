@@ -0,0 +1,19 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from tests.utils.utils import LOCMEM_CACHES
+from utils.cron_jobs import enqueue_similar_properties
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CronJobsTest(SimpleTestCase):
+    """Test the jobs every process schedules"""
+
+    @patch('utils.cron_jobs.build_similar_properties.delay')
+    def test_the_nightly_rebuild_is_enqueued_once(self, mock_delay):
+        cache.clear()
+        for _ in range(3):
+            enqueue_similar_properties()
+        mock_delay.assert_called_once_with()
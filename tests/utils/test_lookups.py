@@ -0,0 +1,32 @@
+from django.test import SimpleTestCase
+
+from authentication.models import UserProfile
+from property.models import Property
+from utils.lookups import (
+    APPROVAL_STATUS_LABELS, PROPERTY_TYPE_LABELS, PURCHASE_PLAN_LABELS,
+    ROLE_LABELS, ROLES, SECURITY_QUESTION_LABELS, display)
+
+
+class LookupsTest(SimpleTestCase):
+    """Test the reference data built from the model choices"""
+
+    def test_labels_match_the_model_display_values(self):
+        for code, _ in Property.PURCHASE_CHOICES:
+            listing = Property(purchase_plan=code)
+            self.assertEqual(display(PURCHASE_PLAN_LABELS, code),
+                             listing.get_purchase_plan_display().title())
+        self.assertEqual(display(PROPERTY_TYPE_LABELS, 'E'), 'Empty Lot')
+        self.assertEqual(display(APPROVAL_STATUS_LABELS, 'revoked'),
+                         'Revoked')
+        for question, _ in UserProfile.QUESTION_CHOICES:
+            profile = UserProfile(security_question=question)
+            self.assertEqual(display(SECURITY_QUESTION_LABELS, question),
+                             profile.get_security_question_display())
+
+    def test_unknown_codes_are_returned_as_they_are(self):
+        self.assertEqual(display(PURCHASE_PLAN_LABELS, 'X'), 'X')
+
+    def test_maps_are_read_only(self):
+        with self.assertRaises(TypeError):
+            ROLE_LABELS['XX'] = 'Someone'
+        self.assertEqual(ROLES, {'LA', 'CA', 'BY'})
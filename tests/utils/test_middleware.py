@@ -0,0 +1,101 @@
+import os
+import shutil
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest.mock import patch
+
+import requests
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY
+from prometheus_client.values import MultiProcessValue
+
+from pages.models import Term
+from utils import middleware
+
+
+class QuietHandler(BaseHTTPRequestHandler):
+    """Answers every GET with an empty 200"""
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@override_settings(REQUEST_METRICS_SERVER_TIMING=True)
+class RequestMetricsMiddlewareTest(TestCase):
+    """Test the request instrumentation middleware"""
+
+    def setUp(self):
+        self.terms_url = reverse('terms:terms')
+        Term.objects.create(details='Be nice')
+
+    def test_server_timing_reports_the_queries(self):
+        response = self.client.get(self.terms_url)
+        timing = response['Server-Timing']
+        self.assertIn('desc="1 queries"', timing)
+        for metric in ('db;dur=', 'render;dur=', 'external;dur=',
+                       'total;dur='):
+            self.assertIn(metric, timing)
+
+    def test_metrics_are_exported_per_view(self):
+        labels = {'view': 'terms:terms'}
+        before = REGISTRY.get_sample_value(
+            'landville_requests_total', labels) or 0
+        self.client.get(self.terms_url)
+        self.assertEqual(REGISTRY.get_sample_value(
+            'landville_requests_total', labels), before + 1)
+        self.assertIsNotNone(REGISTRY.get_sample_value(
+            'landville_request_db_queries_sum', labels))
+
+    @override_settings(REQUEST_METRICS_SAMPLE_RATE=0)
+    def test_requests_that_are_not_sampled_are_not_instrumented(self):
+        response = self.client.get(self.terms_url)
+        self.assertNotIn('Server-Timing', response)
+
+    @override_settings(REQUEST_METRICS_SERVER_TIMING=False)
+    def test_server_timing_header_can_be_turned_off(self):
+        response = self.client.get(self.terms_url)
+        self.assertNotIn('Server-Timing', response)
+
+    def test_external_http_time_is_attributed_to_the_request(self):
+        server = HTTPServer(('127.0.0.1', 0), QuietHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        middleware._instrument_urllib3()
+        metrics = middleware._local.metrics = middleware.RequestMetrics()
+        self.addCleanup(setattr, middleware._local, 'metrics', None)
+        requests.get(f'http://127.0.0.1:{server.server_port}/')
+        self.assertGreater(metrics.external_seconds['127.0.0.1'], 0)
+
+    def test_metrics_endpoint_needs_the_token(self):
+        url = reverse('metrics')
+        self.assertEqual(self.client.get(url).status_code, 404)
+        with override_settings(METRICS_TOKEN='scrape'):
+            self.assertEqual(self.client.get(url).status_code, 404)
+            response = self.client.get(
+                url, HTTP_AUTHORIZATION='Bearer scrape')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'landville_request_seconds', response.content)
+
+    def test_metrics_of_every_worker_are_added_up(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        with patch.dict(os.environ, {'prometheus_multiproc_dir': directory}):
+            for pid in (101, 102):
+                value = MultiProcessValue(lambda: pid)(
+                    'counter', 'landville_requests_total',
+                    'landville_requests_total', ('view',), ('home',))
+                value.inc(1)
+            with override_settings(METRICS_TOKEN='scrape'):
+                response = self.client.get(
+                    reverse('metrics'), HTTP_AUTHORIZATION='Bearer scrape')
+        self.assertIn(b'landville_requests_total{view="home"} 2.0',
+                      response.content)
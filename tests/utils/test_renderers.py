@@ -0,0 +1,70 @@
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ErrorDetail
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from utils.renderers import FastJSONRenderer
+
+
+class FastJSONRendererTest(SimpleTestCase):
+    """Test the orjson based renderer"""
+
+    def setUp(self):
+        self.renderer = FastJSONRenderer()
+
+    def test_output_is_the_same_as_the_drf_renderer(self):
+        data = {
+            'price': Decimal('1250.50'),
+            'created_at': datetime(2019, 5, 1, 8, 30, 15, 120000,
+                                   tzinfo=timezone.utc),
+            'naive': datetime(2019, 5, 1, 8, 30),
+            'list_date': date(2019, 5, 1),
+            'id': uuid.UUID('9b7f6c2e-5d4f-4a1b-8a3c-2e1f0d9c8b7a'),
+            'title': 'Maison à Lagos',
+            'label': gettext_lazy('Building'),
+            'errors': [ErrorDetail('This field is required.', 'required')],
+            'address': {'City': 'Lagos'},
+            'sold': False,
+            'images': None,
+        }
+        self.assertEqual(
+            self.renderer.render(data), JSONRenderer().render(data))
+
+    def test_keys_that_are_not_strings_are_turned_into_strings(self):
+        data = {1: 'one', 2.5: 'two and a half', None: 'none'}
+        self.assertEqual(
+            self.renderer.render(data), JSONRenderer().render(data))
+
+    def test_nan_is_encoded_as_null(self):
+        self.assertEqual(self.renderer.render([float('nan')]), b'[null]')
+
+    def test_none_renders_an_empty_body(self):
+        self.assertEqual(self.renderer.render(None), b'')
+
+    def test_indent_is_honoured(self):
+        rendered = self.renderer.render(
+            {'a': 1}, 'application/json; indent=4')
+        self.assertEqual(rendered, b'{\n  "a": 1\n}')
+
+    def test_errors_are_told_apart_by_the_response_flag(self):
+        response = Response({'detail': 'Not found.'}, status=404)
+        self.assertFalse(self.renderer.is_error(
+            response.data, {'response': response}))
+        response.exception = True
+        self.assertTrue(self.renderer.is_error(
+            response.data, {'response': response}))
+        self.assertEqual(self.renderer.render_error(response.data),
+                         b'{"errors":{"detail":"Not found."}}')
+
+    def test_errors_are_told_apart_by_their_envelope(self):
+        self.assertTrue(self.renderer.is_error({'errors': 'Bad request'}))
+        self.assertFalse(self.renderer.is_error({'message': 'errors'}))
+        self.assertFalse(self.renderer.is_error(['errors']))
+        self.assertEqual(self.renderer.render_error({'errors': 'Bad'}),
+                         b'{"errors":"Bad"}')
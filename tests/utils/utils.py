@@ -1,9 +1,60 @@
 from unittest.mock import patch
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
 from authentication.models import User
 from tests.authentication.client.test_base import BaseTest
 
 
+# manage.py disables caching for tests, override CACHES with this to test it
+LOCMEM_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+
+class QueryBudgetMixin:
+    """
+    Assert that an endpoint runs a bounded number of queries however many
+    rows it serves, eg
+
+        self.assertQueryBudget(
+            3, lambda n: PropertyFactory.create_batch(n, is_published=True),
+            lambda: self.client.get(url))
+    """
+
+    # the fixture sizes the request is made at
+    query_budget_sizes = (1, 10)
+
+    def assertQueryBudget(self, budget, add_rows, request, sizes=None):
+        """
+        Grow the fixture to each of `sizes` rows with `add_rows(n)`, which
+        adds n rows, and make the request at each size. Fail if a request
+        runs more than `budget` queries or if the count grows with the
+        number of rows.
+        """
+        counts = {}
+        created = 0
+        for size in sizes or self.query_budget_sizes:
+            add_rows(size - created)
+            created = size
+            with CaptureQueriesContext(connection) as queries:
+                response = request()
+            self.assertEqual(
+                response.status_code, 200,
+                response.data if hasattr(response, 'data')
+                else response.content)
+            counts[size] = len(queries)
+            if len(queries) > budget:
+                self.fail('{} queries with {} rows, the budget is {}:\n{}'
+                          .format(len(queries), size, budget, '\n'.join(
+                              query['sql'] for query in queries)))
+        if len(set(counts.values())) > 1:
+            self.fail(f'The number of queries grows with the rows: {counts}')
+
+
 class TestUtils(BaseTest):
 
     @patch('utils.tasks.send_email_notification.delay')
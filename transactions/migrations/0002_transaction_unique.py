@@ -0,0 +1,44 @@
+# Generated by Django 2.2.1 on 2026-10-19 14:05
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def merge_duplicates(apps, schema_editor):
+    """
+    Merge the transactions of a buyer for the same property into the
+    oldest one, which gets their deposits and the sum of their payments
+    """
+    Transaction = apps.get_model('transactions', 'Transaction')
+    Deposit = apps.get_model('transactions', 'Deposit')
+    duplicates = Transaction.objects.order_by().values(
+        'target_property', 'buyer'
+    ).annotate(
+        count=Count('id'), keep=Min('id'), total_paid=Sum('amount_paid')
+    ).filter(count__gt=1)
+    for duplicate in duplicates:
+        others = Transaction.objects.filter(
+            target_property=duplicate['target_property'],
+            buyer=duplicate['buyer']).exclude(id=duplicate['keep'])
+        Deposit.objects.filter(transaction__in=others).update(
+            transaction_id=duplicate['keep'])
+        others.delete()
+        Transaction.objects.filter(id=duplicate['keep']).update(
+            amount_paid=duplicate['total_paid'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='transaction',
+            constraint=models.UniqueConstraint(
+                fields=('target_property', 'buyer'),
+                name='unique_transaction_property_buyer'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 2.2.1 on 2026-10-19 13:23
+
+from django.db import migrations, models
+
+
+# deposits used to store their references as a JSON string of the JSON
+DECODE_REFERENCES = """
+UPDATE transactions_deposit
+SET "references" = ("references" #>> '{}')::jsonb
+WHERE jsonb_typeof("references") = 'string'
+"""
+ENCODE_REFERENCES = """
+UPDATE transactions_deposit
+SET "references" = to_jsonb("references"::text)
+WHERE jsonb_typeof("references") <> 'string'
+"""
+# duplicate callbacks may already have deposited a payment more than once,
+# only the first deposit of a payment gets its txRef
+BACKFILL_TX_REF = """
+UPDATE transactions_deposit
+SET tx_ref = first.tx_ref
+FROM (
+    SELECT DISTINCT ON (tx_ref) id, tx_ref
+    FROM (
+        SELECT id, COALESCE("references" ->> 'txRef',
+                            "references" ->> 'txref') AS tx_ref
+        FROM transactions_deposit
+        WHERE jsonb_typeof("references") = 'object'
+    ) AS refs
+    WHERE tx_ref IS NOT NULL
+    ORDER BY tx_ref, id
+) AS first
+WHERE transactions_deposit.id = first.id
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0002_transaction_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deposit',
+            name='tx_ref',
+            field=models.CharField(blank=True, editable=False, max_length=100, null=True),
+        ),
+        migrations.RunSQL(DECODE_REFERENCES, ENCODE_REFERENCES),
+        migrations.RunSQL(BACKFILL_TX_REF, migrations.RunSQL.noop),
+        migrations.AlterField(
+            model_name='deposit',
+            name='tx_ref',
+            field=models.CharField(blank=True, editable=False, max_length=100, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 2.2.1 on 2026-10-19 13:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('property', '0001_initial'),
+        ('transactions', '0003_deposit_tx_ref'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentAttempt',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('attempt_id', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('purpose', models.CharField(blank=True, max_length=10)),
+                ('flw_ref', models.CharField(blank=True, max_length=100)),
+                ('tx_ref', models.CharField(blank=True, max_length=100)),
+                ('status', models.CharField(choices=[('S', 'SUCCESSFUL'), ('P', 'PENDING'), ('F', 'FAILED')], default='P', max_length=1)),
+                ('message', models.TextField(blank=True)),
+                ('target_property', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='payment_attempts', to='property.Property')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'abstract': False,
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 2.2.1 on 2026-10-19 13:49
+
+from django.db import migrations
+import fernet_fields.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0004_paymentattempt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='paymentattempt',
+            name='otp',
+            field=fernet_fields.fields.EncryptedTextField(blank=True),
+        ),
+    ]
@@ -1,5 +1,8 @@
+import uuid
+
 from django.db import models
 from django.contrib.postgres.fields import JSONField
+from fernet_fields import EncryptedTextField
 from utils.models import BaseAbstractModel
 from utils.managers import CustomQuerySet, ClientAccountQuery, TransactionQuery
 from property.models import Property
@@ -26,10 +29,29 @@ class Transaction(BaseAbstractModel):
     objects = models.Manager()
     active_objects = TransactionQuery.as_manager()
 
+    class Meta(BaseAbstractModel.Meta):
+        # a buyer pays for a property through one transaction, which
+        # deposits are added to, see `save_deposit`
+        constraints = [
+            models.UniqueConstraint(
+                fields=['target_property', 'buyer'],
+                name='unique_transaction_property_buyer'),
+        ]
+
     def __str__(self):
         return f'{self.status} transaction for {self.target_property}'
 
 
+def tx_ref_of(references):
+    """
+    Return the Rave transaction reference of a deposit's references, which
+    the validation responses call `txRef` and the verification ones `txref`
+    """
+    if not isinstance(references, dict):
+        return None
+    return references.get('txRef') or references.get('txref')
+
+
 class Deposit(BaseAbstractModel):
     """This class defines the Deposit model for all Savings and transaction"""
 
@@ -47,6 +69,10 @@ class Deposit(BaseAbstractModel):
                                     null=True)
     amount = models.DecimalField(decimal_places=2, max_digits=12)
     references = JSONField(default=None, blank=False, null=False)
+    # the txRef of `references`, a payment is deposited once. It is kept in
+    # sync on save
+    tx_ref = models.CharField(
+        max_length=100, unique=True, null=True, blank=True, editable=False)
     description = models.TextField(max_length=500)
     objects = models.Manager()
     active_objects = CustomQuerySet.as_manager()
@@ -54,6 +80,10 @@ class Deposit(BaseAbstractModel):
     def __str__(self):
         return f"{self.amount} amount deposit for {self.account}"
 
+    def save(self, *args, **kwargs):
+        self.tx_ref = tx_ref_of(self.references)
+        super().save(*args, **kwargs)
+
 
 class Savings(BaseAbstractModel):
     """This class defines the Savings model"""
@@ -91,3 +121,38 @@ class ClientAccount(BaseAbstractModel):
 
     def __str__(self):
         return f'{self.owner}\'s account for {self.bank_name}'
+
+
+class PaymentAttempt(BaseAbstractModel):
+    """
+    A card payment verified with Rave by a worker rather than in the
+    request, see `transactions.tasks.verify_payment_attempt`. Clients poll
+    its status with its `attempt_id`, which is hard to guess.
+    """
+
+    attempt_id = models.UUIDField(
+        default=uuid.uuid4, unique=True, editable=False)
+    purpose = models.CharField(max_length=10, blank=True)
+    target_property = models.ForeignKey(
+        Property, on_delete=models.CASCADE, null=True, blank=True,
+        related_name='payment_attempts')
+    # the reference of a local card payment to validate with its OTP
+    flw_ref = models.CharField(max_length=100, blank=True)
+    # the OTP, kept out of the task message and cleared once it is used
+    otp = EncryptedTextField(blank=True)
+    # the reference of a foreign card payment to verify
+    tx_ref = models.CharField(max_length=100, blank=True)
+    status = models.CharField(
+        max_length=1, choices=Transaction.STATUS_CHOICES, default='P')
+    message = models.TextField(blank=True)
+
+    objects = models.Manager()
+
+    def __str__(self):
+        return f'Payment attempt {self.attempt_id}'
+
+    def finish(self, succeeded, message):
+        """Record the outcome of the verification"""
+        self.status = 'S' if succeeded else 'F'
+        self.message = message or ''
+        self.save(update_fields=['status', 'message', 'updated_at'])
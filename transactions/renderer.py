@@ -1,19 +1,11 @@
-import json
+from utils.renderers import FastJSONRenderer
 
-from rest_framework.renderers import JSONRenderer
-
-
-class AccountDetailsJSONRenderer(JSONRenderer):
-    charset = 'utf-8'
 
+class AccountDetailsJSONRenderer(FastJSONRenderer):
     def render(self, data, media_type=None, renderer_context=None):
+        if self.is_error(data, renderer_context):
+            return self.render_error(data)
 
-        if isinstance(data, dict):
-            errors = data.get('errors', None)
-
-            if errors:
-                return super().render(data)
-
-        return json.dumps({
+        return self.dumps({
             'data': {"account_detail(s)": data}
         })
@@ -1,11 +1,13 @@
 """A module of serializer classes for the payment system"""
-import json
+from decimal import Decimal
+
+from django.db.models import Prefetch
 from rest_framework import serializers
-from transactions.models import ClientAccount, Deposit, Transaction, Savings
+from transactions.models import (
+    ClientAccount, Deposit, PaymentAttempt, Transaction, Savings)
 from rest_framework.exceptions import ValidationError
 from property.models import Property
 from property.serializers import PropertySerializer
-from authentication.models import User
 
 
 class ClientAccountSerializer(serializers.ModelSerializer):
@@ -64,29 +66,40 @@ class TransactionsSerializer(PropertySerializer):
                   'image_main',
                   'address']
 
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Fetch the transactions of every property, with their buyer"""
+        return queryset.prefetch_related(Prefetch(
+            'transactions',
+            queryset=Transaction.objects.select_related('buyer')))
+
+    def amount_paid(self, obj):
+        """
+        Return the total amount so far paid for a property, by the user if
+        they are a buyer
+        """
+        request = self.context.get('request')
+        return sum(
+            (transaction.amount_paid
+             for transaction in obj.transactions.all()
+             if not transaction.is_deleted and (
+                 request.user.role != 'BY' or
+                 transaction.buyer_id == request.user.pk)),
+            Decimal(0))
+
     def get_percentage_completion(self, obj):
         """
         Return the total percentage a user has so far paid for a
         property
         """
-        request = self.context.get('request')
-        price = obj.price
-        if request.user.role == 'BY':
-            total_amount = Transaction.active_objects.total_amount(
-                request.user, obj)
-        else:
-            total_amount = Transaction.active_objects.client_total_amount(obj)
-
-        percentage = total_amount/price * 100
+        percentage = self.amount_paid(obj)/obj.price * 100
         # return a percentage as a 2 decimals value
         return "{:0.2f}".format(percentage)
 
     def get_deposits(self, obj):
         """Return all the deposits a user has made for a property"""
-        transactions = Transaction.objects.filter(
-            target_property__slug=obj.slug)
         deposits = []
-        for transaction in transactions:
+        for transaction in obj.transactions.all():
             data = {
                 "date": transaction.created_at,
                 "amount": transaction.amount_paid
@@ -96,32 +109,16 @@ class TransactionsSerializer(PropertySerializer):
 
     def get_buyer(self, obj):
         """Return the name of the user/buyer"""
-        user = User.objects.get(pk=obj.transactions.first().buyer.pk)
-        return user.email
+        return obj.transactions.all()[0].buyer.email
 
     def get_total_amount_paid(self, obj):
         """Return the total amount paid by user for property so far"""
-        request = self.context.get('request')
-        if request.user.role == 'BY':
-            total_amount = Transaction.active_objects.total_amount(
-                request.user, obj)
-        else:
-            total_amount = Transaction.active_objects.client_total_amount(obj)
-        return total_amount
+        return self.amount_paid(obj)
 
     def get_balance(self, obj):
         """Return the balance the user is remaining with
         to complete payment"""
-        request = self.context.get('request')
-        price = obj.price
-        if request.user.role == 'BY':
-            total_amount = Transaction.active_objects.total_amount(
-                request.user, obj)
-        else:
-            total_amount = Transaction.active_objects.client_total_amount(obj)
-
-        balance = price - total_amount
-        return balance
+        return obj.price - self.amount_paid(obj)
 
 
 class PurposePropertySerializer(serializers.Serializer):
@@ -186,6 +183,15 @@ class CardlessPaymentSerializer(serializers.Serializer):
     amount = serializers.FloatField(min_value=0.00)
 
 
+class PaymentAttemptSerializer(serializers.ModelSerializer):
+    """The serializer class for polling the status of a card payment"""
+    status = serializers.CharField(source='get_status_display')
+
+    class Meta:
+        model = PaymentAttempt
+        fields = ['attempt_id', 'status', 'message', 'updated_at']
+
+
 class SavingSerializer(serializers.ModelSerializer):
     """
     Saving serializer inherit from modelSerializer
@@ -214,15 +220,6 @@ class DepositSerializer(serializers.ModelSerializer):
     """
     saving_account = SavingSerializer(read_only=True, source='account')
     transaction = TransactionSerializer(read_only=True)
-    references = serializers.SerializerMethodField(method_name='ref_to_dict')
-
-    def ref_to_dict(self, deposit):
-        """
-        convert json references to python objects
-        Args:
-         deposit ([type]): the deposit object
-        """
-        return json.loads(deposit.references)
 
     class Meta:
         model = Deposit
@@ -0,0 +1,38 @@
+from celery import shared_task
+
+from property.models import Property
+from transactions.models import PaymentAttempt
+from transactions.transaction_utils import (
+    complete_card_payment, complete_foreign_card_payment)
+
+
+@shared_task
+def verify_payment_attempt(attempt_id):
+    """
+    Verify the card payment of an attempt with Rave and record the outcome
+    on it. Local card payments are validated with their OTP first, which
+    is read from the attempt and cleared before Rave is called.
+    """
+    attempt = PaymentAttempt.objects.select_related(
+        'target_property').get(pk=attempt_id)
+    otp, attempt.otp = attempt.otp, ''
+    if otp:
+        attempt.save(update_fields=['otp', 'updated_at'])
+    try:
+        if attempt.flw_ref:
+            status_code, message = complete_card_payment(
+                attempt.flw_ref, otp, attempt.purpose,
+                attempt.target_property)
+            succeeded = status_code < 400
+        else:
+            succeeded, message = complete_foreign_card_payment(
+                attempt.tx_ref)
+    except Property.DoesNotExist:
+        # retrying won't make it exist
+        succeeded, message = False, 'The property paid for does not exist'
+    except Exception:
+        attempt.finish(
+            False, 'We could not verify your payment, please try again')
+        raise
+    attempt.finish(succeeded, message)
+    return succeeded
@@ -1,5 +1,111 @@
-import json
-from transactions.models import Deposit, Savings, Transaction
+"""
+Posting deposits.
+
+A deposit is posted with one statement: the saving or transaction it is
+paid into is inserted, or its balance incremented in the database when it
+already exists, and the deposit is inserted with it. The statement is its
+own transaction, so concurrent deposits can't lose each other's updates,
+and it returns both rows, with the new balance, in one round trip.
+
+Posting is idempotent: payment gateways repeat their callbacks, so the
+statement does nothing when a deposit with the same txRef exists, which
+the unique index on `Deposit.tx_ref` tells with one probe.
+
+A deposit into a soft deleted saving or transaction restores it, balance
+included. The rows are written without the ORM, so no `post_save` is
+sent for them.
+"""
+from django.db import IntegrityError, connection
+from django.utils import timezone
+from rest_framework import status
+
+from authentication.models import User
+from property.models import Property
+from transactions.models import Deposit, Savings, Transaction, tx_ref_of
+from transactions.transaction_services import TransactionServices
+
+
+POST_DEPOSIT_SQL = """
+WITH parent AS (
+    INSERT INTO {parent} ({parent_columns})
+    SELECT {parent_values}
+    WHERE NOT EXISTS (SELECT 1 FROM {deposit} WHERE {tx_ref} = %s)
+    ON CONFLICT ({conflict_columns}) DO UPDATE
+    SET {balance} = {parent}.{balance} + EXCLUDED.{balance},
+        {updated_at} = EXCLUDED.{updated_at},
+        {is_deleted} = false
+    RETURNING {parent_returning}
+), deposit AS (
+    INSERT INTO {deposit} ({deposit_columns})
+    SELECT {deposit_values}, {parent_id} FROM parent
+    RETURNING {deposit_returning}
+)
+SELECT * FROM parent, deposit
+"""
+
+
+def post_deposit(parent_model, parent_values, conflict_fields, balance_field,
+                 deposit_values, deposit_parent_field):
+    """
+    Insert or increment the parent of a deposit and insert the deposit,
+    returning both as model instances, or None when the payment was
+    already deposited. `parent_values` and `deposit_values` map field
+    names to values, the balance is incremented by the one in
+    `parent_values` when the parent already exists.
+    """
+    quote = connection.ops.quote_name
+    now = timezone.now()
+    timestamps = {'created_at': now, 'updated_at': now, 'is_deleted': False}
+
+    def columns(model, names):
+        return ', '.join(
+            quote(model._meta.get_field(name).column) for name in names)
+
+    def placeholders(model, names):
+        # values are selected rather than inserted, so they need a type
+        return ', '.join(
+            f'CAST(%s AS {model._meta.get_field(name).db_type(connection)})'
+            for name in names)
+
+    def prepared(model, values):
+        return [model._meta.get_field(name).get_db_prep_save(
+            value, connection) for name, value in values.items()]
+
+    parent_values = dict(parent_values, **timestamps)
+    deposit_values = dict(deposit_values, **timestamps)
+    parent_fields = [
+        field.attname for field in parent_model._meta.concrete_fields]
+    deposit_fields = [
+        field.attname for field in Deposit._meta.concrete_fields]
+    sql = POST_DEPOSIT_SQL.format(
+        parent=quote(parent_model._meta.db_table),
+        parent_columns=columns(parent_model, parent_values),
+        parent_values=placeholders(parent_model, parent_values),
+        conflict_columns=columns(parent_model, conflict_fields),
+        balance=quote(parent_model._meta.get_field(balance_field).column),
+        updated_at=quote(parent_model._meta.get_field('updated_at').column),
+        is_deleted=quote(parent_model._meta.get_field('is_deleted').column),
+        parent_returning=columns(parent_model, parent_fields),
+        parent_id=quote(parent_model._meta.pk.column),
+        deposit=quote(Deposit._meta.db_table),
+        deposit_columns=columns(
+            Deposit, list(deposit_values) + [deposit_parent_field]),
+        deposit_values=placeholders(Deposit, deposit_values),
+        tx_ref=quote(Deposit._meta.get_field('tx_ref').column),
+        deposit_returning=columns(Deposit, deposit_fields))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            sql, prepared(parent_model, parent_values) +
+            [deposit_values['tx_ref']] + prepared(Deposit, deposit_values))
+        row = cursor.fetchone()
+    if row is None:
+        return None
+
+    parent = parent_model.from_db(
+        connection.alias, parent_fields, row[:len(parent_fields)])
+    deposit = Deposit.from_db(
+        connection.alias, deposit_fields, row[len(parent_fields):])
+    return deposit, parent
 
 
 def save_deposit(purpose,
@@ -21,32 +127,93 @@ def save_deposit(purpose,
         Defaults to "LandVille trans".
     Returns:
         (tuple): deposit, transaction the deposit and
-        the saving or transaction according to the purpose
+        the saving or transaction according to the purpose, holding its
+        new balance. When the payment was already deposited, these are the
+        deposit made then and its saving or transaction
     """
+    tx_ref = tx_ref_of(references)
+    deposit_values = {
+        'references': references,
+        'tx_ref': tx_ref,
+        'amount': amount,
+        'description': description,
+    }
     if purpose == 'Saving':
-        defaults_val = {'balance': amount}
-        saving, created = Savings.objects.get_or_create(owner=user,
-                                                        defaults=defaults_val)
-        if not created:
-            saving.balance += amount
-        deposit = Deposit(account=saving,
-                          references=json.dumps(references),
-                          amount=amount,
-                          description=description)
-        saving.save()
-        deposit.save()
-        return deposit, saving
+        post = (Savings, {'owner': user.pk, 'balance': amount}, ['owner'],
+                'balance', deposit_values, 'account')
     else:
-        transaction, created = Transaction.objects.\
-            get_or_create(target_property=property,
-                          buyer=user,
-                          defaults={'amount_paid': amount})
-        if not created:
-            transaction.amount_paid += amount
-        deposit = Deposit(transaction=transaction,
-                          references=json.dumps(references),
-                          amount=amount,
-                          description=description)
-        transaction.save()
-        deposit.save()
-        return deposit, transaction
+        post = (Transaction,
+                {'target_property': property.pk, 'buyer': user.pk,
+                 'status': 'P', 'amount_paid': amount},
+                ['target_property', 'buyer'], 'amount_paid', deposit_values,
+                'transaction')
+    try:
+        posted = post_deposit(*post)
+    except IntegrityError:
+        # the same callback was being posted at the same time, when in a
+        # transaction we can't read what it posted
+        if tx_ref is None or connection.in_atomic_block:
+            raise
+        posted = None
+    if posted is not None:
+        return posted
+
+    deposit = Deposit.objects.select_related(
+        'account', 'transaction').get(tx_ref=tx_ref)
+    return deposit, deposit.account or deposit.transaction
+
+
+def complete_card_payment(flwref, otp, purpose, property=None):
+    """
+    Validate a local card payment with its OTP, verify it and deposit it.
+    Return the status code and message to answer with.
+    """
+    resp = TransactionServices.validate_card_payment(flwref, otp)
+    if resp.get('status') == 'error':
+        return status.HTTP_400_BAD_REQUEST, resp.get('message')
+
+    txRef = resp['data']['tx']['txRef']
+    verify_resp = TransactionServices.verify_payment(txRef)
+    email = verify_resp['data']['custemail']
+    user = User.objects.get(email=email)
+    if verify_resp.get('data').get('status') != 'successful':
+        return status.HTTP_400_BAD_REQUEST, verify_resp.get('message')
+
+    save_card = verify_resp['data']['meta'][0]['metavalue']
+    if int(save_card) == 1:
+        TransactionServices.save_card(verify_resp)
+    data = resp.get('data').get('tx')
+    references = {k: v for k, v in data.items() if k.endswith('Ref')}
+    amount = data.get('amount', 0)
+    save_deposit(purpose, references, amount, user, property)
+    return resp['status_code'], resp['message']
+
+
+def complete_foreign_card_payment(tx_ref):
+    """
+    Verify a foreign card payment and deposit it. The purpose and property
+    paid for come from the payment meta. Return whether it succeeded and
+    the message to show. Raise `Property.DoesNotExist` when the property
+    paid for doesn't exist.
+    """
+    verify_resp = TransactionServices.verify_payment(tx_ref)
+    email = verify_resp['data']['custemail']
+    user = User.objects.get(email=email)
+    if verify_resp.get('status') != 'success':
+        return False, verify_resp.get('message')
+
+    message = verify_resp['data']['vbvmessage']
+    meta_data = verify_resp.get('data').get('meta')
+    save_card = meta_data[0]['metavalue']
+    purpose = meta_data[1]['metavalue']
+    property = None
+    if purpose == 'Buying':
+        property_id = meta_data[2]['metavalue']
+        property = Property.objects.get(pk=property_id)
+    if int(save_card):
+        message += TransactionServices.save_card(verify_resp)
+    data = verify_resp.get('data')
+    references = {k: v for k, v in data.items() if k.endswith('ref')}
+    amount = data.get('amount', 0)
+    save_deposit(purpose, references, amount, user, property)
+    return True, message
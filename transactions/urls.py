@@ -9,7 +9,8 @@ from transactions.views import (
     RetreiveTransactionsAPIView,
     foreign_card_validation_response,
     tokenized_card_payment,
-    RetrieveDepositsApiView
+    RetrieveDepositsApiView,
+    PaymentAttemptAPIView
 )
 
 app_name = 'transactions'
@@ -29,5 +30,7 @@ urlpatterns = [
     path('rave-response/', foreign_card_validation_response,
          name='validation_response'),
     path('tokenized-card/', tokenized_card_payment, name='tokenized_card'),
-    path('my-deposit/', RetrieveDepositsApiView.as_view(), name='my_deposit')
+    path('my-deposit/', RetrieveDepositsApiView.as_view(), name='my_deposit'),
+    path('payments/<uuid:attempt_id>/', PaymentAttemptAPIView.as_view(),
+         name='payment_attempt')
 ]
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.shortcuts import get_object_or_404
 from drf_yasg.utils import swagger_auto_schema
 import json
@@ -6,7 +7,7 @@ from rest_framework import status
 from rest_framework.generics import (RetrieveUpdateDestroyAPIView,
                                      ListCreateAPIView, ListAPIView)
 from django.db.models import Q
-from django.http import HttpResponseRedirect
+from django.http import Http404, HttpResponseRedirect
 from rest_framework.response import Response
 from rest_framework import generics
 from rest_framework.permissions import (
@@ -17,7 +18,8 @@ from rest_framework.decorators import api_view, permission_classes
 from utils.client_permissions import IsownerOrReadOnly, IsClient
 from transactions.models import (ClientAccount,
                                  Client,
-                                 Deposit)
+                                 Deposit,
+                                 PaymentAttempt)
 from transactions.renderer import AccountDetailsJSONRenderer
 from transactions.serializers import (
     ClientAccountSerializer,
@@ -26,12 +28,15 @@ from transactions.serializers import (
     PinCardPaymentSerializer,
     ForeignCardPaymentSerializer,
     PaymentValidationSerializer,
-    CardlessPaymentSerializer
+    CardlessPaymentSerializer,
+    PaymentAttemptSerializer
 )
+from transactions.tasks import verify_payment_attempt
 from transactions.transaction_services import TransactionServices
 from property.models import Property
-from transactions.transaction_utils import save_deposit
-from authentication.models import User
+from transactions.transaction_utils import (
+    complete_card_payment, complete_foreign_card_payment)
+from utils.renderers import FastJSONRenderer
 
 
 class ClientAccountAPIView(ListCreateAPIView):
@@ -174,7 +179,7 @@ class RetreiveTransactionsAPIView(generics.GenericAPIView):
             # transactions with
             queryset = Property.active_objects.all_objects().filter(
                 transactions__buyer__pk=self.request.user.pk).distinct()
-        return queryset
+        return self.serializer_class.setup_eager_loading(queryset)
 
     def get(self, request):
         """
@@ -340,34 +345,18 @@ def validate_payment(request):
                         status=status.HTTP_400_BAD_REQUEST)
     if purpose == 'Buying':
         property = get_object_or_404(Property, pk=property_id)
-    resp = TransactionServices.validate_card_payment(flwref, otp)
-    if resp.get('status') == 'error':
+    if settings.PAYMENT_VERIFICATION_ASYNC:
+        attempt = PaymentAttempt.objects.create(
+            purpose=purpose, target_property=property, flw_ref=flwref,
+            otp=otp)
+        verify_payment_attempt.delay(attempt.pk)
         return Response(
-            {'message': resp.get('message')},
-            status=status.HTTP_400_BAD_REQUEST
-        )
-    else:
-        txRef = resp['data']['tx']['txRef']
-        verify_resp = TransactionServices.verify_payment(txRef)
-        email = verify_resp['data']['custemail']
-        user = User.objects.get(email=email)
-        if verify_resp.get('data').get('status') == 'successful':
-            save_card = verify_resp['data']['meta'][0]['metavalue']
-            message = verify_resp['data']['vbvmessage']
-            if int(save_card) == 1:
-                message += TransactionServices.save_card(verify_resp)
-            data = resp.get('data').get('tx')
-            references = {k: v for k, v in data.items() if k.endswith('Ref')}
-            amount = data.get('amount', 0)
-            save_deposit(purpose,
-                         references,
-                         amount,
-                         user,
-                         property)
-        else:
-            return Response({'message': verify_resp.get('message')},
-                            status=status.HTTP_400_BAD_REQUEST)
-    return Response({'message': resp['message']}, status=resp['status_code'])
+            {'message': 'Your payment is being verified',
+             'attempt_id': attempt.attempt_id},
+            status=status.HTTP_202_ACCEPTED)
+    status_code, message = complete_card_payment(
+        flwref, otp, purpose, property)
+    return Response({'message': message}, status=status_code)
 
 
 @api_view(['GET'])
@@ -381,38 +370,45 @@ def foreign_card_validation_response(request):
     domain = os.environ.get('FRONT_END_INTPAYMENT_URL')
 
     resp = json.loads(request.query_params['response'])
-    verify_resp = TransactionServices.verify_payment(resp['txRef'])
-    email = verify_resp['data']['custemail']
-    user = User.objects.get(email=email)
-    if verify_resp.get('status') == 'success':
-        message = verify_resp['data']['vbvmessage']
-        meta_data = verify_resp.get('data').get('meta')
-        save_card = meta_data[0]['metavalue']
-        purpose = meta_data[1]['metavalue']
-        property_id = None
-        property = None
-        if purpose == 'Buying':
-            property_id = meta_data[2]['metavalue']
-            property = get_object_or_404(Property, pk=property_id)
-        if int(save_card):
-            message += TransactionServices.save_card(verify_resp)
-        data = verify_resp.get('data')
-        references = {k: v for k, v in data.items() if k.endswith('ref')}
-        amount = data.get('amount', 0)
-        save_deposit(purpose, references, amount, user, property)
-
-    else:
+    if settings.PAYMENT_VERIFICATION_ASYNC:
+        attempt = PaymentAttempt.objects.create(tx_ref=resp['txRef'])
+        verify_payment_attempt.delay(attempt.pk)
         return HttpResponseRedirect(
-            f"{domain}" +
-            f"?message={verify_resp.get('message')}&status=failure"
+            f"{domain}"
+            + f"?attempt_id={attempt.attempt_id}&status=pending"
         )
-
+    try:
+        succeeded, message = complete_foreign_card_payment(resp['txRef'])
+    except Property.DoesNotExist:
+        raise Http404
     return HttpResponseRedirect(
         f"{domain}"
-        + f"?message={message}&status=success"
+        + f"?message={message}&status={'success' if succeeded else 'failure'}"
     )
 
 
+class PaymentAttemptAPIView(generics.RetrieveAPIView):
+    """
+    Poll the status of a card payment being verified. The attempt id is
+    only known to who made the payment, so no credentials are needed, and
+    the response is kept small as clients ask often.
+    """
+    authentication_classes = ()
+    renderer_classes = (FastJSONRenderer,)
+    serializer_class = PaymentAttemptSerializer
+    queryset = PaymentAttempt.objects.all()
+    lookup_field = 'attempt_id'
+    # how long clients should wait before asking again, in seconds
+    retry_after = 2
+
+    def retrieve(self, request, *args, **kwargs):
+        attempt = self.get_object()
+        response = Response({'data': self.get_serializer(attempt).data})
+        if attempt.status == 'P':
+            response['Retry-After'] = str(self.retry_after)
+        return response
+
+
 @swagger_auto_schema(method='post', request_body=CardlessPaymentSerializer)
 @api_view(['POST'])
 @permission_classes((IsAuthenticated, ))
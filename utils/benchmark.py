@@ -0,0 +1,106 @@
+import math
+import time
+
+from django.utils import timezone
+from faker import Faker
+
+from authentication.models import Client, User
+from property.models import Property
+
+
+fake = Faker()
+
+
+def percentile(samples, pct):
+    """
+    Return the nearest-rank percentile of a list of samples.
+    params:
+        samples - list of numbers, need not be sorted
+        pct - the percentile to return, between 0 and 100
+    """
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(int(math.ceil(pct / 100 * len(ordered))), 1)
+    return ordered[rank - 1]
+
+
+def summarise(samples):
+    """
+    Return the latency summary we report for every benchmark. Samples are
+    expected in milliseconds.
+    """
+    if not samples:
+        return {'count': 0}
+    return {
+        'count': len(samples),
+        'mean': round(sum(samples) / len(samples), 3),
+        'p50': round(percentile(samples, 50), 3),
+        'p95': round(percentile(samples, 95), 3),
+        'p99': round(percentile(samples, 99), 3),
+    }
+
+
+def time_calls(func, iterations):
+    """Call `func` `iterations` times and return each duration in ms"""
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def requests_per_second(samples):
+    """Return the throughput of back to back calls timed in ms"""
+    if not samples:
+        return None
+    return round(len(samples) / (sum(samples) / 1000), 3)
+
+
+def address():
+    """Return a fake address in the shape clients and property use"""
+    return {'City': fake.city(), 'Street': fake.street_name(),
+            'State': fake.state()}
+
+
+def location():
+    """Return the fields holding the location of a fake property"""
+    latitude, longitude = float(fake.latitude()), float(fake.longitude())
+    # bulk inserts skip `Property.save`, which copies the coordinates
+    return {'coordinates': {'lat': str(latitude), 'lon': str(longitude)},
+            'latitude': latitude, 'longitude': longitude}
+
+
+def build_user(role, suffix=''):
+    """
+    Return an unsaved, verified benchmark user with `role`. Its password is
+    unusable, which skips hashing.
+    """
+    name = f'benchmark-{role}{suffix}'
+    user = User(
+        email=f'{name}@landville.test', username=name,
+        first_name=fake.first_name(), last_name=fake.last_name(),
+        role=role, is_verified=True)
+    user.set_unusable_password()
+    return user
+
+
+def create_client():
+    """Create an approved benchmark client and its admin"""
+    admin = build_user('CA')
+    admin.save()
+    return Client.objects.create(
+        client_admin=admin, client_name=fake.company(), phone='0',
+        email='benchmark-client@landville.test', address=address(),
+        approval_status='approved')
+
+
+def build_property(client, i):
+    """Return an unsaved benchmark property of `client`"""
+    return Property(
+        client=client, title=fake.sentence(), slug=f'benchmark-{i}',
+        description=fake.text(), address=address(), **location(),
+        list_date=timezone.now().date(), price=fake.random_int(
+            10000, 10000000), lot_size=2345.435, image_main=fake.url(),
+        image_others=[fake.url()], purchase_plan='I')
@@ -0,0 +1,239 @@
+import gzip
+import hashlib
+import json
+import uuid
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.renderers import JSONRenderer
+
+
+# the longest a snapshot is served, should an invalidation be missed
+SNAPSHOT_TIMEOUT = 60 * 60
+
+
+class Snapshot:
+    """
+    A read-mostly value, eg a serialized listing, that is kept in the cache
+    until whatever it was built from changes and `invalidate` is called, or
+    for `timeout` seconds at most.
+
+    Each snapshot carries an ETag and a Last-Modified date so views can
+    answer conditional GETs without rebuilding it.
+    """
+
+    def __init__(self, key, timeout=SNAPSHOT_TIMEOUT):
+        self.key = key
+        self.timeout = timeout
+
+    def get(self, build):
+        """
+        Return the cached snapshot, calling `build` to make a new one when
+        there is none. The snapshot is a dictionary with `data`, `etag` and
+        `last_modified` keys.
+        """
+        snapshot = cache.get(self.key)
+        if snapshot is None:
+            snapshot = self.make(build())
+            cache.set(self.key, snapshot, self.timeout)
+        return snapshot
+
+    def make(self, data):
+        """Return the snapshot to cache for freshly built data"""
+        return {
+            'data': data,
+            'etag': etag_for(data),
+            'last_modified': timezone.now(),
+        }
+
+    def invalidate(self):
+        """Drop the snapshot so the next request rebuilds it"""
+        cache.delete(self.key)
+
+
+class CompressedSnapshot(Snapshot):
+    """
+    A snapshot that also keeps its data rendered as gzipped JSON, so it
+    can be served to clients that accept gzip without any work per request.
+
+    The gzipped body is rendered by `renderer_class`, the renderer of the
+    uncompressed responses, and is kept under `gzip` as a snapshot of its
+    own with a `-gzip` ETag, since its bytes differ from the other body's.
+    """
+
+    renderer_class = JSONRenderer
+
+    def make(self, data):
+        snapshot = super().make(data)
+        body = self.renderer_class().render(data)
+        etag = '{}-gzip"'.format(snapshot['etag'][:-1])
+        snapshot['gzip'] = {
+            'data': gzip.compress(body),
+            'etag': etag,
+            'last_modified': snapshot['last_modified'],
+        }
+        return snapshot
+
+    @staticmethod
+    def accepts_gzip(request):
+        """Tell if the Accept-Encoding of `request` takes gzip"""
+        qualities = {}
+        encodings = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        for encoding in encodings.lower().split(','):
+            coding, *params = encoding.split(';')
+            quality = 1.0
+            for param in params:
+                name, _, value = param.strip().partition('=')
+                if name == 'q':
+                    try:
+                        quality = float(value)
+                    except ValueError:
+                        quality = 0.0
+            qualities[coding.strip()] = quality
+        return qualities.get('gzip', qualities.get('*', 0.0)) > 0
+
+    def gzip_response(self, snapshot):
+        """Return the pre-compressed JSON body of `snapshot`"""
+        compressed = snapshot['gzip']
+        response = HttpResponse(
+            compressed['data'], content_type='application/json')
+        response['Content-Encoding'] = 'gzip'
+        response['Content-Length'] = str(len(compressed['data']))
+        return set_validators(response, compressed)
+
+
+def etag_for(data):
+    """Return a strong ETag for JSON serializable data"""
+    content = json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder)
+    return '"{}"'.format(hashlib.md5(content.encode('utf-8')).hexdigest())
+
+
+def not_modified(request, snapshot):
+    """
+    Return a 304 response when the client already has this snapshot,
+    otherwise None.
+    """
+    response = get_conditional_response(
+        request, etag=snapshot['etag'],
+        last_modified=int(snapshot['last_modified'].timestamp()))
+    if response is not None:
+        set_validators(response, snapshot)
+    return response
+
+
+def set_validators(response, snapshot):
+    """Add the snapshot's ETag and Last-Modified headers to `response`"""
+    response['ETag'] = snapshot['etag']
+    response['Last-Modified'] = http_date(
+        snapshot['last_modified'].timestamp())
+    return response
+
+
+class Generation:
+    """
+    A token that namespaces cache keys. Bumping it orphans every key made
+    with the old token, which is how a whole family of cached responses is
+    invalidated at once. Orphaned keys are left to expire, so keys made
+    with a generation need a timeout.
+    """
+
+    def __init__(self, key):
+        self.key = key
+
+    def value(self):
+        return cache.get_or_set(self.key, lambda: uuid.uuid4().hex, None)
+
+    def bump(self):
+        cache.set(self.key, uuid.uuid4().hex, None)
+
+
+class CachedResponseMixin:
+    """
+    Cache the rendered body of successful GET responses.
+
+    Authentication and permissions still run on every request. Views
+    return what their queryset depends on from `get_cache_scope`, eg the
+    user's role, or None to skip the cache. The scope, host, negotiated
+    media type, URL kwargs and query params make up the key, namespaced by
+    the view's `response_cache` generation. The ETag is derived from the
+    `updated_at` of the objects in the response.
+    """
+
+    response_cache = None
+    # responses are invalidated by their generation, this bounds how long
+    # the ones it orphans stay in the cache
+    cache_timeout = 60 * 60
+
+    def get_cache_scope(self, request):
+        return None
+
+    def cache_hit(self, request, *args, **kwargs):
+        """Called when a request is answered from the cache"""
+
+    def get_cache_digest(self, request, **kwargs):
+        """Return a digest of what the response depends on, or None"""
+        scope = self.get_cache_scope(request)
+        if scope is None:
+            return None
+        params = sorted(request.query_params.lists())
+        # links in the response, eg pagination, are absolute
+        host = request.build_absolute_uri('/')
+        return hashlib.md5(json.dumps(
+            [scope, host, request.accepted_media_type, kwargs, params],
+            sort_keys=True).encode('utf-8')
+        ).hexdigest()
+
+    def get(self, request, *args, **kwargs):
+        digest = self.get_cache_digest(request, **kwargs)
+        if digest is None:
+            return super().get(request, *args, **kwargs)
+
+        key = '{}:{}:{}'.format(
+            type(self).__name__, self.response_cache.value(), digest)
+        cached = cache.get(key)
+        response = None
+        if cached is None:
+            response = super().get(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            # render with what `finalize_response` will set again once
+            # `dispatch` gets the response
+            response.accepted_renderer = request.accepted_renderer
+            response.accepted_media_type = request.accepted_media_type
+            response.renderer_context = self.get_renderer_context()
+            response.render()
+            cached = {
+                'content': response.content,
+                'content_type': response['Content-Type'],
+                'etag': etag_for(
+                    [digest, updated_at_values(response.data)]),
+            }
+            cache.set(key, cached, self.cache_timeout)
+        else:
+            self.cache_hit(request, *args, **kwargs)
+
+        # a miss answers with the response it just rendered
+        response = get_conditional_response(
+            request, etag=cached['etag'], response=response)
+        if response is None:
+            response = HttpResponse(
+                cached['content'], content_type=cached['content_type'])
+        response['ETag'] = cached['etag']
+        return response
+
+
+def updated_at_values(data):
+    """Collect every `updated_at` value in serialized data"""
+    if isinstance(data, dict):
+        values = [data['updated_at']] if 'updated_at' in data else []
+        for value in data.values():
+            if isinstance(value, (dict, list)):
+                values.extend(updated_at_values(value))
+        return values
+    if isinstance(data, list):
+        return [value for item in data for value in updated_at_values(item)]
+    return []
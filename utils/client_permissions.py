@@ -1,5 +1,7 @@
 from rest_framework.permissions import BasePermission, SAFE_METHODS
 
+from utils.lookups import CLIENT_ADMIN, CLIENT_ROLES
+
 
 class IsownerOrReadOnly(BasePermission):
 
@@ -22,5 +24,5 @@ class IsClient(BasePermission):
     def has_permission(self, request, view):
 
         if request.method in SAFE_METHODS and request.user.is_authenticated:
-            return request.user.role == 'LA' or request.user.role == 'CA'
-        return request.user.role == 'CA'
+            return request.user.role in CLIENT_ROLES
+        return request.user.role == CLIENT_ADMIN
@@ -1,16 +1,35 @@
 from apscheduler.schedulers.background import BackgroundScheduler
+from django.core.cache import cache
+from django.utils import timezone
+
 from authentication.models import BlackList
+from property.tasks import build_similar_properties
+
+
+def enqueue_similar_properties():
+    """
+    Enqueue the nightly rebuild of the similar property. Every process
+    runs the scheduler, the first to claim the night in the shared cache
+    enqueues the task.
+    """
+    night = timezone.now().date().isoformat()
+    if cache.add(f'similar-property-rebuild:{night}', True, 24 * 60 * 60):
+        build_similar_properties.delay()
 
 
 def start():
     """
     Initialize cron job.(Task that will be run everyday at 1am)
     This will call the function that deletes user tokens older
-    than 24 hours
+    than 24 hours. At 2am the similar property are rebuilt by a worker.
     """
     scheduler = BackgroundScheduler()
     scheduler.add_job(
         BlackList.delete_tokens_older_than_a_day,
         'cron', hour=1, minute=0
     )
+    scheduler.add_job(
+        enqueue_similar_properties,
+        'cron', hour=2, minute=0
+    )
     scheduler.start()
@@ -1,5 +1,4 @@
 from rest_framework.views import exception_handler
-from rest_framework import status
 from django.http import Http404
 
 
@@ -11,6 +10,11 @@ def custom_exception_handler(exc, context):
     each exception name to the function that should handle it.
     Each function should return a response with a message
     and the actual error.
+    Responses we return are marked with `response.exception`, which our
+    renderers read from their context to tell errors apart, and carry
+    the error under an `errors` key.
+    Views can set `error_status_code` to answer errors with another
+    status code.
     """
 
     # We Call REST framework's default exception handler first
@@ -23,17 +27,19 @@ def custom_exception_handler(exc, context):
     }
 
     exception_class = exc.__class__.__name__
-    # Now we add the HTTP status code to the response when its in the context
-    # of the LoginAPIVIew.
+    # Now we mark the response as an error and add the HTTP status code the
+    # view asks for, eg the LoginAPIView.
     if response is not None:
+        response.exception = True
+        response = _handle_generic_error(exc, context, response)
         # Raising a NotAuthenticatedError should send a 401 response status
         # code, however due to the Authentication scheme used by our
-        # application it raises 403 instead. This calls for the need to
-        # write a custom exception handler and make it send a 401 in the
-        # context of login
-        response = _handle_generic_error(exc, context, response)
-        if "LoginAPIView" in str(context['view']):
-            response.status_code = status.HTTP_401_UNAUTHORIZED
+        # application it raises 403 instead. Views such as the login view
+        # set the status code they want instead
+        error_status_code = getattr(
+            context['view'], 'error_status_code', None)
+        if error_status_code is not None:
+            response.status_code = error_status_code
             return response
 
     if exception_class in handlers:
@@ -0,0 +1,48 @@
+"""
+Reference data built once, at import time, from the model choices.
+
+The maps are read only and shared by every request the process serves.
+Renderers and serializers use them to turn stored codes into labels
+without a model instance, eg on rows fetched with `.values()`, and
+permissions compare against the constants instead of string literals.
+"""
+from types import MappingProxyType
+
+from authentication.models import Client, User, UserProfile
+from property.models import Property
+
+
+def choice_labels(choices, transform=None):
+    """Return a read only map of the codes of model choices to labels"""
+    return MappingProxyType({
+        code: transform(label) if transform else label
+        for code, label in choices})
+
+
+def display(labels, code):
+    """
+    Return the label of a code. Like `get_FOO_display`, unknown codes are
+    returned as they are.
+    """
+    return labels.get(code, code)
+
+
+LANDVILLE_ADMIN = 'LA'
+CLIENT_ADMIN = 'CA'
+BUYER = 'BY'
+ROLE_LABELS = choice_labels(User.USER_ROLES)
+ROLES = frozenset(ROLE_LABELS)
+# the roles allowed to read client company data
+CLIENT_ROLES = frozenset((LANDVILLE_ADMIN, CLIENT_ADMIN))
+
+APPROVED = 'approved'
+REJECTED = 'rejected'
+REVOKED = 'revoked'
+APPROVAL_STATUS_LABELS = choice_labels(Client.APPROVAL_STATUS)
+
+# the questions are stored as they are shown
+SECURITY_QUESTION_LABELS = choice_labels(UserProfile.QUESTION_CHOICES)
+
+# property choices are shown title cased, eg `Installments`
+PROPERTY_TYPE_LABELS = choice_labels(Property.PROPERTY_TYPES, str.title)
+PURCHASE_PLAN_LABELS = choice_labels(Property.PURCHASE_CHOICES, str.title)
@@ -0,0 +1,158 @@
+"""
+Per request instrumentation.
+
+`RequestMetricsMiddleware` records how many SQL queries a request ran, how
+long they took, how long the response took to render and how long we
+waited on external HTTP calls such as Rave and Cloudinary. The numbers are
+exported as Prometheus metrics labelled by view and, optionally, sent back
+in a `Server-Timing` header.
+"""
+import random
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from prometheus_client import Counter, Histogram
+from urllib3 import connectionpool
+
+
+REQUESTS = Counter(
+    'landville_requests_total', 'Instrumented requests', ['view'])
+REQUEST_SECONDS = Histogram(
+    'landville_request_seconds', 'Time spent handling a request', ['view'])
+DB_QUERIES = Histogram(
+    'landville_request_db_queries', 'SQL queries run per request', ['view'],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500))
+DB_SECONDS = Histogram(
+    'landville_request_db_seconds', 'Time spent in SQL per request',
+    ['view'])
+RENDER_SECONDS = Histogram(
+    'landville_request_render_seconds',
+    'Time spent rendering the response', ['view'])
+EXTERNAL_SECONDS = Histogram(
+    'landville_request_external_http_seconds',
+    'Time spent waiting on external HTTP calls per request', ['view', 'host'])
+
+_local = threading.local()
+
+
+class RequestMetrics:
+    """What a single request cost"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.render_seconds = 0.0
+        self.external_seconds = {}
+
+    def record_query(self, execute, sql, params, many, context):
+        """`execute_wrapper` hook timing every query"""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_seconds += time.perf_counter() - start
+
+    def record_external(self, host, seconds):
+        self.external_seconds[host] = \
+            self.external_seconds.get(host, 0.0) + seconds
+
+    def server_timing(self):
+        """Return the value of the `Server-Timing` header"""
+        external = sum(self.external_seconds.values())
+        total = time.perf_counter() - self.started
+        return ', '.join([
+            f'db;dur={self.db_seconds * 1000:.1f};'
+            f'desc="{self.queries} queries"',
+            f'render;dur={self.render_seconds * 1000:.1f}',
+            f'external;dur={external * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ])
+
+
+def current_metrics():
+    """Return the metrics of the request being handled, if it is sampled"""
+    return getattr(_local, 'metrics', None)
+
+
+def _instrument_urllib3():
+    """
+    Time every request made through urllib3, which both `requests` (Rave,
+    social auth) and the Cloudinary SDK use, and attribute it to the
+    current request.
+    """
+    urlopen = connectionpool.HTTPConnectionPool.urlopen
+    if getattr(urlopen, 'instrumented', False):
+        return
+
+    def instrumented_urlopen(pool, *args, **kwargs):
+        metrics = current_metrics()
+        if metrics is None:
+            return urlopen(pool, *args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return urlopen(pool, *args, **kwargs)
+        finally:
+            metrics.record_external(pool.host, time.perf_counter() - start)
+
+    instrumented_urlopen.instrumented = True
+    connectionpool.HTTPConnectionPool.urlopen = instrumented_urlopen
+
+
+class RequestMetricsMiddleware:
+    """
+    Instrument a `REQUEST_METRICS_SAMPLE_RATE` share of requests. Requests
+    that aren't sampled run untouched.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        _instrument_urllib3()
+
+    def __call__(self, request):
+        if random.random() >= settings.REQUEST_METRICS_SAMPLE_RATE:
+            return self.get_response(request)
+
+        metrics = _local.metrics = RequestMetrics()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(metrics.record_query))
+                response = self.get_response(request)
+        finally:
+            _local.metrics = None
+
+        self.export(request, metrics)
+        if settings.REQUEST_METRICS_SERVER_TIMING:
+            response['Server-Timing'] = metrics.server_timing()
+        return response
+
+    def process_template_response(self, request, response):
+        """Time rendering, which happens after the view returns"""
+        metrics = current_metrics()
+        if metrics is None:
+            return response
+        start = time.perf_counter()
+
+        def rendered(response):
+            metrics.render_seconds += time.perf_counter() - start
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    def export(self, request, metrics):
+        match = request.resolver_match
+        view = match.view_name if match else '<unresolved>'
+        REQUESTS.labels(view).inc()
+        REQUEST_SECONDS.labels(view).observe(
+            time.perf_counter() - metrics.started)
+        DB_QUERIES.labels(view).observe(metrics.queries)
+        DB_SECONDS.labels(view).observe(metrics.db_seconds)
+        RENDER_SECONDS.labels(view).observe(metrics.render_seconds)
+        for host, seconds in metrics.external_seconds.items():
+            EXTERNAL_SECONDS.labels(view, host).observe(seconds)
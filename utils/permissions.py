@@ -1,5 +1,7 @@
 from rest_framework.permissions import BasePermission, SAFE_METHODS
 
+from utils.lookups import APPROVED, BUYER, CLIENT_ADMIN, LANDVILLE_ADMIN, ROLES
+
 
 class ReadOnly(BasePermission):
     """Allow ReadOnly permissions if the request is a safe method"""
@@ -16,9 +18,9 @@ class CanEditProperty(BasePermission):
         user = request.user
         if request.method in SAFE_METHODS:
             return True
-        if user.is_authenticated and user.role == 'CA':
+        if user.is_authenticated and user.role == CLIENT_ADMIN:
             return user == obj.client.client_admin
-        if user.is_authenticated and user.role == 'LA':
+        if user.is_authenticated and user.role == LANDVILLE_ADMIN:
             return True
         return False
 
@@ -30,8 +32,8 @@ class IsClientAdmin(BasePermission):
         user = request.user if request.user.is_authenticated else None
         if user:
             client = user.employer.first()
-            return client and user.role == 'CA' and \
-                client.approval_status == 'approved'
+            return client and user.role == CLIENT_ADMIN and \
+                client.approval_status == APPROVED
 
 
 class IsBuyer(BasePermission):
@@ -40,10 +42,8 @@ class IsBuyer(BasePermission):
     def has_permission(self, request, view):
 
         if request.method in SAFE_METHODS and request.user.is_authenticated:
-            return (
-                request.user.role == 'LA' or request.user.role == 'BY'
-                or request.user.role == 'CA')
-        return request.user.role == 'BY'
+            return request.user.role in ROLES
+        return request.user.role == BUYER
 
 
 class IsOwner(BasePermission):
@@ -79,7 +79,7 @@ class IsBuyerOrReadOnly(BasePermission):
             request.method in SAFE_METHODS or
             request.user and
             request.user.is_authenticated and
-            request.user.role == 'BY'
+            request.user.role == BUYER
         )
 
 class IsAdmin(BasePermission):
@@ -89,5 +89,5 @@ class IsAdmin(BasePermission):
 
         user = request.user
 
-        if request.method == 'DELETE' and user.role == 'LA':
+        if request.method == 'DELETE' and user.role == LANDVILLE_ADMIN:
             return True
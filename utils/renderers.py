@@ -0,0 +1,52 @@
+"""
+The base of our JSON renderers.
+
+`FastJSONRenderer` encodes with orjson instead of the stdlib `json`. Its
+output is what DRF's `JSONRenderer` gives with our settings: compact UTF-8,
+datetimes in ISO 8601 with `Z` for UTC, UUIDs as strings, keys that aren't
+strings turned into strings. The types orjson doesn't know, eg Decimal,
+lazy translations and querysets, are handed to DRF's encoder, so they come
+out as they always did. Unlike `json.dumps`, non-ASCII text isn't escaped
+and NaN and infinities are encoded as `null`.
+
+Renderers tell errors apart without looking into the payload: responses
+built by `custom_exception_handler` are marked with `response.exception`
+and errors returned by views come in an `errors` envelope.
+"""
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+_encoder = JSONEncoder()
+
+
+class FastJSONRenderer(JSONRenderer):
+    charset = 'utf-8'
+
+    def dumps(self, data, indent=None):
+        """Return `data` encoded as JSON bytes"""
+        option = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+        if indent:
+            # orjson only indents with two spaces
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=_encoder.default, option=option)
+
+    def is_error(self, data, renderer_context=None):
+        """Tell if `data` is an error, in constant time"""
+        response = (renderer_context or {}).get('response')
+        if getattr(response, 'exception', False):
+            return True
+        return isinstance(data, dict) and bool(data.get('errors'))
+
+    def render_error(self, data):
+        """Render an error in the `errors` envelope"""
+        if not isinstance(data, dict) or 'errors' not in data:
+            data = {'errors': data}
+        return self.dumps(data)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return self.dumps(
+            data, self.get_indent(accepted_media_type, renderer_context or {}))
@@ -1,17 +1,14 @@
 import os
-from datetime import (
-    datetime,
-    timedelta,
-)
+from datetime import timedelta
 
 import jwt
-from django.conf import settings
 from rest_framework import exceptions
 
 from authentication.models import (
     PasswordResetToken,
     User,
 )
+from authentication.tokens import TokenService
 from utils.tasks import send_email_notification
 
 
@@ -31,14 +28,8 @@ class ResetHandler:
         if not isinstance(payload, dict):
             raise TypeError('Payload must be a dictionary!')
 
-        token_expiry = datetime.now() + timedelta(hours=12)
-
-    
-        token = jwt.encode({
-            'email': payload['email'],
-            'exp': int(token_expiry.strftime('%s'))},
-            settings.SECRET_KEY, algorithm='HS256')
-        token = token.decode('utf-8')
+        token = TokenService.encode(
+            {'email': payload['email']}, timedelta(hours=12))
         
         """
         here we store the encoded token in our database 
@@ -56,8 +47,7 @@ class ResetHandler:
         """
 
         try:
-            decoded_token = jwt.decode(
-                token, settings.SECRET_KEY, algorithm='HS256')
+            decoded_token = TokenService.decode(token)
 
         except jwt.exceptions.ExpiredSignatureError:
             msg = 'Your token has expired. Make a new token and try again'
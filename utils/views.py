@@ -1,4 +1,11 @@
-from django.http import JsonResponse
+import hmac
+import os
+
+from django.conf import settings
+from django.http import Http404, HttpResponse, JsonResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest,
+    multiprocess)
 
 
 def error_500(response):
@@ -10,3 +17,25 @@ def error_500(response):
     response = JsonResponse(data={"errors": "Server Failure"})
     response.status_code = 500
     return response
+
+
+def metrics(request):
+    """
+    Expose the Prometheus metrics. Scrapers authenticate with the
+    `METRICS_TOKEN` bearer token, and the endpoint doesn't exist without one.
+    With several worker processes, each writes its metrics to files in
+    `prometheus_multiproc_dir` (see landville/gunicorn.py) and they are
+    added up here, otherwise the metrics are the answering process's own.
+    """
+    expected = f'Bearer {settings.METRICS_TOKEN}'
+    given = request.META.get('HTTP_AUTHORIZATION', '')
+    if not settings.METRICS_TOKEN or \
+            not hmac.compare_digest(given, expected):
+        raise Http404
+    registry = REGISTRY
+    if 'prometheus_multiproc_dir' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return HttpResponse(
+        generate_latest(registry),
+        content_type=CONTENT_TYPE_LATEST)